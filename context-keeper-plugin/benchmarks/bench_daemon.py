@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Daemon Benchmark: Hook wall time in-process vs. through the resident daemon.
+
+Starts a stand-in Messages API (from check_rate_limiter.py) and a daemon
+with its own CONTEXT_KEEPER_HOME, then alternates runs of each hook with
+the daemon in use and with CONTEXT_KEEPER_DAEMON=0. Every run spawns
+`python3 context_keeper hook <event>` with a payload on stdin, as Claude
+Code does, so the in-process numbers include interpreter startup and the
+anthropic import that the daemon saves.
+
+Requires the anthropic package (the hooks' own dependency).
+
+Usage:
+  python3 bench_daemon.py [--runs 10] [--size 1MB] [--json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+SCRIPTS_DIR = BENCH_DIR.parent / "scripts"
+sys.path.insert(0, str(BENCH_DIR))
+
+from check_rate_limiter import StandInState, make_handler  # noqa: E402
+from gen_transcript import SESSION_ID, generate_transcript, parse_size  # noqa: E402
+
+CLI = str(SCRIPTS_DIR / "context_keeper")
+
+
+def time_hook(event: str, payload: dict, env: dict) -> float:
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, CLI, "hook", event], input=json.dumps(payload).encode("utf-8"),
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=env, check=False,
+    )
+    return (time.perf_counter() - start) * 1000
+
+
+def summarize(hook: str, mode: str, timings: list[float]) -> dict:
+    timings = sorted(timings)
+    return {
+        "hook": hook,
+        "mode": mode,
+        "runs": len(timings),
+        "p50_ms": round(statistics.median(timings), 2),
+        "p99_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.99))], 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark hooks in-process vs. through the daemon")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--size", default="1MB", help="Transcript size for PreCompact/SessionEnd")
+    parser.add_argument("--json", action="store_true", help="Emit results as JSON")
+    args = parser.parse_args()
+
+    state = StandInState(rpm=100000, latency=0)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(state))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="ck-bench-daemon-") as tmp:
+        tmp = Path(tmp)
+        home = tmp / "home"
+        (home / ".claude").mkdir(parents=True)
+        (home / ".claude" / "settings.json").write_text(json.dumps({"env": {
+            "CLAUDE_SUMMARY_API_KEY": "sk-standin-key",
+            "CLAUDE_SUMMARY_API_URL": f"http://127.0.0.1:{server.server_address[1]}",
+        }}), encoding="utf-8")
+        env = {
+            **os.environ, "HOME": str(home), "CONTEXT_KEEPER_HOME": str(home / "context-keeper"),
+            "CONTEXT_KEEPER_RATE_RPM": "0", "CONTEXT_KEEPER_RATE_TPM": "0", "CONTEXT_KEEPER_METRICS": "0",
+        }
+        env.pop("CONTEXT_KEEPER_SOCKET", None)
+        project = tmp / "project"
+        project.mkdir()
+        transcript = tmp / "transcript.jsonl"
+        generate_transcript(transcript, parse_size(args.size), seed=1, compactions=0)
+
+        payloads = {
+            "PreCompact": {"session_id": SESSION_ID, "transcript_path": str(transcript), "cwd": str(project),
+                           "trigger": "auto", "hook_event_name": "PreCompact"},
+            "SessionEnd": {"session_id": SESSION_ID, "transcript_path": str(transcript), "cwd": str(project),
+                           "reason": "exit", "hook_event_name": "SessionEnd"},
+        }
+
+        subprocess.run([sys.executable, CLI, "daemon", "start"], env=env, check=True, stdout=subprocess.DEVNULL)
+        try:
+            for hook, payload in payloads.items():
+                timings = {"daemon": [], "in-process": []}
+                for _ in range(args.runs):
+                    timings["daemon"].append(time_hook(hook, payload, env))
+                    timings["in-process"].append(time_hook(hook, payload, {**env, "CONTEXT_KEEPER_DAEMON": "0"}))
+                results += [summarize(hook, mode, t) for mode, t in timings.items()]
+        finally:
+            subprocess.run([sys.executable, CLI, "daemon", "stop"], env=env, check=False, stdout=subprocess.DEVNULL)
+            server.shutdown()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print("| Hook | Mode | Runs | p50 ms | p99 ms |")
+    print("|------|------|------|--------|--------|")
+    for r in results:
+        print(f"| {r['hook']} | {r['mode']} | {r['runs']} | {r['p50_ms']:.2f} | {r['p99_ms']:.2f} |")
+
+
+if __name__ == "__main__":
+    main()
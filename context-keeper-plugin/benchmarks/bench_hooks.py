@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Hook Benchmark Suite: Scaling of the context-keeper hook stages.
+
+Generates deterministic transcripts (gen_transcript.py) and measures each
+stage in a fresh worker process, so peak RSS is per stage and runs do not
+share caches:
+
+  parse           - save_memory.parse_transcript() with an empty transcript cache
+  parse-cached    - save_memory.parse_transcript() with the transcript cached
+  parse-after     - get_last_compact_time() + parse_transcript(after=...) with
+                    the line index built (what the PreCompact hook decodes)
+  boundary        - get_last_compact_time() without a line index
+  extract         - extract_conversation_content() (timed after parsing; also
+                    reports the memory its result holds, measured untimed)
+  save            - save_memory() into a store seeded with 20 memories
+  index           - update_index() on the seeded store
+  precompact-hook - `context_keeper hook PreCompact` end to end, without an API key
+                    (parse + boundary + extract + the local extractive summary
+                    that replaces the LLM call + save)
+  sessionstart    - `context_keeper hook SessionStart`
+
+Reports throughput (transcript MB/s), peak RSS and p50/p99 wall time per
+stage and transcript size. With --output the results are written as JSON
+(with the git commit) so runs can be compared between commits.
+
+Usage:
+  python3 bench_hooks.py [--sizes 1MB,16MB,128MB] [--runs 5] [--stages parse,extract]
+                         [--output results.json] [--keep-transcripts DIR]
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+SCRIPTS_DIR = BENCH_DIR.parent / "scripts"
+sys.path.insert(0, str(SCRIPTS_DIR))
+sys.path.insert(0, str(BENCH_DIR))
+
+from context_keeper.hook_stats import percentile  # noqa: E402
+from gen_transcript import SESSION_ID, generate_transcript, parse_size  # noqa: E402
+
+STAGES = ("parse", "parse-cached", "parse-after", "boundary", "extract", "save", "index", "precompact-hook", "sessionstart")
+TRANSCRIPT_STAGES = {"parse", "parse-cached", "parse-after", "boundary", "extract", "precompact-hook"}
+SEED_MEMORIES = 20
+
+
+# ============================================================================
+# Worker (runs one stage once, in its own process)
+# ============================================================================
+
+def peak_rss_kb() -> int:
+    """Peak RSS of this process in KiB (ru_maxrss is bytes on macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def sample_memory(i: int) -> str:
+    return "\n\n".join([
+        "## Topics Discussed\n- request router refactor\n- token refresh",
+        f"## Code Changes\n- src/api/handlers.py: iteration {i}",
+        "## Architecture Changes\n- moved auth checks into middleware",
+        "## Tags\n#refactor #auth",
+    ])
+
+
+def seed_store(project: Path):
+    """Create a store with SEED_MEMORIES memories, a full index and a SessionStart payload."""
+    from context_keeper import save_memory
+    from context_keeper.memory_store import write_json, write_memory
+    from context_keeper.session_context import write_session_start
+
+    memories_dir = save_memory.get_memories_dir(str(project))
+    for i in range(SEED_MEMORIES):
+        session_id = SESSION_ID if i % 4 == 0 else f"seed-{i % 4}"
+        timestamp = f"20250101_{i:06d}"
+        metadata = {"session_id": session_id, "trigger": "auto", "cwd": str(project),
+                    "timestamp": datetime.now().astimezone().isoformat(), "message_count": 100 + i,
+                    "memory_timestamp": timestamp}
+        memory_dir = memories_dir / session_id / timestamp
+        memory_dir.mkdir(parents=True)
+        write_memory(memory_dir / "memory.json", {"content": sample_memory(i), "timestamp": timestamp, "session_id": session_id})
+        write_json(memory_dir / "metadata.json", metadata)
+        save_memory.update_index(memories_dir, session_id, timestamp, metadata)
+        latest = memories_dir / session_id / "latest"
+        if latest.is_symlink():
+            latest.unlink()
+        latest.symlink_to(timestamp)
+        write_session_start(memories_dir, session_id, sample_memory(i), metadata)
+
+
+def run_worker(stage: str, transcript: str, project: str) -> dict:
+    import logging
+
+    from context_keeper import save_memory
+    from context_keeper import transcript_cache
+    logging.disable(logging.CRITICAL)
+    transcript_cache.get_cache_path(Path(transcript)).unlink(missing_ok=True)
+    transcript_cache.get_index_path(Path(transcript)).unlink(missing_ok=True)
+    if stage in ("parse-cached", "parse-after"):
+        transcript_cache.read_transcript(transcript)  # Also builds the line index
+        transcript_cache._parsed.clear()
+    baseline_kb = peak_rss_kb()
+    records = 0
+
+    result_kb = None
+    if stage == "extract":
+        messages = save_memory.parse_transcript(transcript)
+        baseline_kb = peak_rss_kb()
+        start = time.perf_counter()
+        held = [save_memory.extract_conversation_content(messages)]
+        elapsed = time.perf_counter() - start
+        records = len(messages)
+        held.clear()  # Freed outside the timed section
+
+        # Untimed second pass: memory allocated by the extraction and still
+        # held by its result (tracemalloc slows the code it traces)
+        import tracemalloc
+        tracemalloc.start()
+        held = [save_memory.extract_conversation_content(messages)]
+        result_kb = tracemalloc.get_traced_memory()[0] // 1024
+        tracemalloc.stop()
+        held.clear()
+    else:
+        start = time.perf_counter()
+        if stage in ("parse", "parse-cached"):
+            records = len(save_memory.parse_transcript(transcript))
+        elif stage == "parse-after":
+            last_compact_time = save_memory.get_last_compact_time(SESSION_ID, project, transcript)
+            records = len(save_memory.parse_transcript(transcript, after=last_compact_time))
+        elif stage == "boundary":
+            save_memory.get_last_compact_time(SESSION_ID, project, transcript)
+        elif stage == "save":
+            metadata = {"session_id": SESSION_ID, "trigger": "auto", "cwd": project,
+                        "timestamp": datetime.now().astimezone().isoformat(), "message_count": 120}
+            save_memory.save_memory(SESSION_ID, sample_memory(0), metadata, project)
+        elif stage == "index":
+            memories_dir = save_memory.get_memories_dir(project)
+            metadata = {"session_id": SESSION_ID, "trigger": "auto", "cwd": project,
+                        "timestamp": datetime.now().astimezone().isoformat(), "message_count": 120}
+            save_memory.update_index(memories_dir, SESSION_ID, datetime.now().strftime("%Y%m%d_%H%M%S"), metadata)
+        else:
+            raise ValueError(f"Unknown worker stage: {stage}")
+        elapsed = time.perf_counter() - start
+
+    return {
+        "elapsed_ms": elapsed * 1000,
+        "records": records,
+        "baseline_rss_kb": baseline_kb,
+        "peak_rss_kb": peak_rss_kb(),
+        "result_kb": result_kb,
+    }
+
+
+# ============================================================================
+# Driver
+# ============================================================================
+
+def run_hook(event: str, payload: dict, env: dict) -> dict:
+    """Run a hook the way Claude Code does and time it."""
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, str(SCRIPTS_DIR / "context_keeper"), "hook", event],
+        stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=env,
+    )
+    proc.stdin.write(json.dumps(payload).encode("utf-8"))
+    proc.stdin.close()
+    # wait4 reaps the child and returns its own resource usage
+    _, status, usage = os.wait4(proc.pid, 0)
+    elapsed = time.perf_counter() - start
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    if proc.returncode != 0:
+        raise RuntimeError(f"{event} hook exited with status {proc.returncode}")
+    peak = usage.ru_maxrss // 1024 if sys.platform == "darwin" else usage.ru_maxrss
+    return {"elapsed_ms": elapsed * 1000, "records": 0, "baseline_rss_kb": 0, "peak_rss_kb": peak}
+
+
+def run_stage(stage: str, transcript: Path, project: Path, env: dict) -> dict:
+    if stage == "precompact-hook":
+        return run_hook("PreCompact", {
+            "session_id": SESSION_ID, "transcript_path": str(transcript), "cwd": str(project),
+            "trigger": "auto", "hook_event_name": "PreCompact",
+        }, env)
+    if stage == "sessionstart":
+        return run_hook("SessionStart", {
+            "session_id": SESSION_ID, "source": "resume", "cwd": str(project),
+            "permission_mode": "default", "hook_event_name": "SessionStart",
+        }, env)
+
+    proc = subprocess.run(
+        [sys.executable, str(Path(__file__).resolve()), "--worker", stage,
+         "--transcript", str(transcript), "--project", str(project)],
+        capture_output=True, text=True, env=env, check=False,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"{stage} worker failed: {proc.stderr.strip()[-500:]}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark context-keeper hook stages")
+    parser.add_argument("--sizes", default="1MB,16MB,128MB", help="Comma-separated transcript sizes (up to 2GB)")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--stages", default=",".join(STAGES), help="Comma-separated stages to run")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--keep-transcripts", help="Generate (and reuse) transcripts in this directory")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--transcript", help=argparse.SUPPRESS)
+    parser.add_argument("--project", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(args.worker, args.transcript, args.project)))
+        return
+
+    stages = [s for s in args.stages.split(",") if s]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(sorted(unknown))}")
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="ck-bench-hooks-") as tmp:
+        tmp = Path(tmp)
+        transcript_dir = Path(args.keep_transcripts) if args.keep_transcripts else tmp
+        transcript_dir.mkdir(parents=True, exist_ok=True)
+
+        # Isolated HOME: no API key (the extractive fallback summarizes instead) and no user settings
+        home = tmp / "home"
+        home.mkdir()
+        env = {**os.environ, "HOME": str(home), "CONTEXT_KEEPER_HOME": str(home / "context-keeper")}
+        env.pop("CLAUDE_SUMMARY_API_KEY", None)
+        os.environ.update({"HOME": env["HOME"], "CONTEXT_KEEPER_HOME": env["CONTEXT_KEEPER_HOME"]})
+
+        project = tmp / "project"
+        project.mkdir()
+        import logging
+        logging.disable(logging.CRITICAL)
+        seed_store(project)
+
+        for size_label in args.sizes.split(","):
+            size = parse_size(size_label)
+            transcript = transcript_dir / f"transcript-{size_label.strip()}-seed{args.seed}.jsonl"
+            if not transcript.exists():
+                print(f"Generating {transcript.name}...", file=sys.stderr)
+                generate_transcript(transcript, size, seed=args.seed)
+            actual_bytes = transcript.stat().st_size
+
+            for stage in stages:
+                # Store-only stages do not depend on the transcript; run them once
+                if stage not in TRANSCRIPT_STAGES and size_label != args.sizes.split(",")[0]:
+                    continue
+                runs = [run_stage(stage, transcript, project, env) for _ in range(args.runs)]
+                timings = [r["elapsed_ms"] for r in runs]
+                p50 = percentile(timings, 0.50)
+                result = {
+                    "stage": stage,
+                    "transcript_bytes": actual_bytes if stage in TRANSCRIPT_STAGES else None,
+                    "runs": len(runs),
+                    "p50_ms": round(p50, 2),
+                    "p99_ms": round(percentile(timings, 0.99), 2),
+                    "peak_rss_mb": round(max(r["peak_rss_kb"] for r in runs) / 1024, 1),
+                    "records": runs[0]["records"],
+                }
+                if runs[0].get("result_kb") is not None:
+                    result["result_mb"] = round(runs[0]["result_kb"] / 1024, 1)
+                if stage in TRANSCRIPT_STAGES and p50 > 0:
+                    result["throughput_mb_s"] = round(actual_bytes / 1024 ** 2 / (p50 / 1000), 1)
+                results.append(result)
+                print(f"{stage} @ {size_label}: p50 {p50:.1f} ms", file=sys.stderr)
+
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created_at": datetime.now().astimezone().isoformat(),
+        "seed": args.seed,
+        "results": results,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    print("| Stage | Transcript MiB | p50 ms | p99 ms | MB/s | Peak RSS MiB | Result MiB |")
+    print("|-------|----------------|--------|--------|------|--------------|------------|")
+    for r in results:
+        size_mib = f"{r['transcript_bytes'] / 1024 ** 2:.1f}" if r["transcript_bytes"] else "-"
+        throughput = r.get("throughput_mb_s", "-")
+        result_mib = r.get("result_mb", "-")
+        print(f"| {r['stage']} | {size_mib} | {r['p50_ms']:.2f} | {r['p99_ms']:.2f} | {throughput} | {r['peak_rss_mb']} | {result_mib} |")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Index Reader Benchmark: In-process incremental reader vs jq vs full parse.
+
+Builds index.json files with 0, 100 and 100k entries (written the way
+update_index() writes them) and times:
+
+  jq-first     - `jq .memories[0]` subprocess (the previous approach), if jq is installed
+  json-full    - json.loads of the whole file, then memories[0]
+  head-1       - read_index_head(path, 1)
+  head-20      - read_index_head(path, 20)
+  iter-all     - iterate every entry with iter_index_entries()
+
+Usage:
+  python3 bench_index_reader.py [--runs 20] [--sizes 0,100,100000] [--json]
+"""
+
+import argparse
+import json
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+from context_keeper.memory_store import iter_index_entries, read_index_head  # noqa: E402
+
+
+def build_index(path: Path, count: int):
+    """Write an index.json with `count` realistic entries."""
+    memories = []
+    for i in range(count):
+        session_id = f"{i % 500:08x}-4b1e-4c2a-9d7f-{i:012x}"
+        memories.append({
+            "session_id": session_id,
+            "timestamp": f"20251124_{i % 240000:06d}",
+            "created_at": "2025-11-24T19:04:48.123456-08:00",
+            "trigger": "auto" if i % 3 else "manual",
+            "project": "/home/user/projects/example-service",
+            "message_count": i % 400,
+            "memory_path": f"{session_id}/20251124_{i % 240000:06d}/memory.json",
+        })
+    index = {"memories": memories, "last_session": memories[0]["session_id"] if memories else None}
+    path.write_text(json.dumps(index, indent=2, ensure_ascii=False), encoding="utf-8")
+
+
+def jq_first(path: Path):
+    with open(path, "r") as f:
+        result = subprocess.run(["jq", "-r", ".memories[0]"], stdin=f, capture_output=True, text=True, timeout=60)
+    return json.loads(result.stdout) if result.stdout.strip() not in ("", "null") else None
+
+
+def json_full(path: Path):
+    memories = json.loads(path.read_text(encoding="utf-8")).get("memories", [])
+    return memories[0] if memories else None
+
+
+def iter_all(path: Path):
+    count = 0
+    for _ in iter_index_entries(path):
+        count += 1
+    return count
+
+
+def time_method(fn, path: Path, runs: int) -> list[float]:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn(path)
+        timings.append((time.perf_counter() - start) * 1000)
+    return sorted(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark index.json readers")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--sizes", default="0,100,100000", help="Comma-separated entry counts")
+    parser.add_argument("--json", action="store_true", help="Emit results as JSON")
+    args = parser.parse_args()
+
+    methods = []
+    if shutil.which("jq"):
+        methods.append(("jq-first", jq_first))
+    methods += [
+        ("json-full", json_full),
+        ("head-1", lambda p: read_index_head(p, 1)),
+        ("head-20", lambda p: read_index_head(p, 20)),
+        ("iter-all", iter_all),
+    ]
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="ck-bench-index-") as tmp:
+        for size in (int(s) for s in args.sizes.split(",")):
+            path = Path(tmp) / f"index-{size}.json"
+            build_index(path, size)
+            file_kb = path.stat().st_size / 1024
+            # Slow methods on huge files get fewer runs
+            runs = args.runs if size <= 1000 else max(3, args.runs // 4)
+            for name, fn in methods:
+                timings = time_method(fn, path, runs)
+                results.append({
+                    "entries": size,
+                    "file_kb": round(file_kb, 1),
+                    "method": name,
+                    "runs": runs,
+                    "p50_ms": round(statistics.median(timings), 3),
+                    "max_ms": round(timings[-1], 3),
+                })
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print("| Entries | File KiB | Method | p50 ms | max ms |")
+    print("|---------|----------|--------|--------|--------|")
+    for r in results:
+        print(f"| {r['entries']} | {r['file_kb']} | {r['method']} | {r['p50_ms']:.3f} | {r['max_ms']:.3f} |")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+SessionStart Benchmark: Wall time of the SessionStart hook.
+
+Each run spawns `python3 context_keeper hook SessionStart` with a hook payload on
+stdin, exactly as Claude Code does, so interpreter startup and imports are
+included. Scenarios:
+
+  interpreter  - `python3 -c pass`, the floor for any hook
+  prerendered  - session_start.txt present (single read, no JSON work)
+  session-dir  - no pre-rendered payload, resume of a known session
+  index        - no pre-rendered payload, unknown session (index.json lookup)
+
+Usage:
+  python3 bench_session_start.py [--runs 30] [--json]
+"""
+
+import argparse
+import json
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent / "scripts"
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+from context_keeper.memory_store import write_json, write_memory  # noqa: E402
+from context_keeper.session_context import SESSION_START_FILE, write_session_start  # noqa: E402
+
+SESSION_ID = "bench-session-0000-1111-2222"
+
+
+def build_store(project: Path, memory_kb: int) -> Path:
+    """Create a one-memory store the way save_memory.py lays it out."""
+    memories_dir = project / ".claude" / "memories"
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    memory_dir = memories_dir / SESSION_ID / timestamp
+    memory_dir.mkdir(parents=True)
+
+    section = "## Code Changes\n" + "- updated handler and tests for the request router\n" * 20
+    content = (section * max(1, memory_kb * 1024 // len(section)))[: memory_kb * 1024]
+    metadata = {
+        "session_id": SESSION_ID,
+        "trigger": "auto",
+        "cwd": str(project),
+        "timestamp": datetime.now().astimezone().isoformat(),
+        "message_count": 120,
+        "memory_timestamp": timestamp,
+    }
+    write_memory(memory_dir / "memory.json", {"content": content, "timestamp": timestamp, "session_id": SESSION_ID})
+    write_json(memory_dir / "metadata.json", metadata)
+    (memories_dir / SESSION_ID / "latest").symlink_to(timestamp)
+    write_session_start(memories_dir, SESSION_ID, content, metadata)
+
+    index = {
+        "memories": [{
+            "session_id": SESSION_ID,
+            "timestamp": timestamp,
+            "created_at": metadata["timestamp"],
+            "trigger": "auto",
+            "project": str(project),
+            "message_count": 120,
+            "memory_path": f"{SESSION_ID}/{timestamp}/memory.json",
+        }],
+        "last_session": SESSION_ID,
+    }
+    (memories_dir / "index.json").write_text(json.dumps(index, indent=2), encoding="utf-8")
+    return memories_dir
+
+
+def time_runs(cmd: list[str], stdin: bytes, runs: int) -> list[float]:
+    """Run a command repeatedly and return wall times in ms."""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(cmd, input=stdin, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+        timings.append((time.perf_counter() - start) * 1000)
+    return sorted(timings)
+
+
+def summarize(name: str, timings: list[float]) -> dict:
+    return {
+        "scenario": name,
+        "runs": len(timings),
+        "p50_ms": round(statistics.median(timings), 2),
+        "p99_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.99))], 2),
+        "min_ms": round(timings[0], 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SessionStart hook wall time")
+    parser.add_argument("--runs", type=int, default=30)
+    parser.add_argument("--memory-kb", type=int, default=16, help="Size of the stored memory")
+    parser.add_argument("--json", action="store_true", help="Emit results as JSON")
+    args = parser.parse_args()
+
+    load_command = [sys.executable, str(SCRIPTS_DIR / "context_keeper"), "hook", "SessionStart"]
+    results = []
+
+    with tempfile.TemporaryDirectory(prefix="ck-bench-start-") as tmp:
+        project = Path(tmp)
+        memories_dir = build_store(project, args.memory_kb)
+
+        def hook_input(session_id: str) -> bytes:
+            return json.dumps({
+                "session_id": session_id,
+                "source": "resume",
+                "cwd": str(project),
+                "permission_mode": "default",
+                "hook_event_name": "SessionStart",
+            }).encode("utf-8")
+
+        results.append(summarize("interpreter", time_runs([sys.executable, "-c", "pass"], b"", args.runs)))
+        results.append(summarize(
+            "prerendered", time_runs(load_command, hook_input(SESSION_ID), args.runs)
+        ))
+
+        # Drop the pre-rendered payloads to measure the JSON paths
+        (memories_dir / SESSION_START_FILE).unlink()
+        (memories_dir / SESSION_ID / SESSION_START_FILE).unlink()
+        results.append(summarize(
+            "session-dir", time_runs(load_command, hook_input(SESSION_ID), args.runs)
+        ))
+        results.append(summarize(
+            "index", time_runs(load_command, hook_input("other-session"), args.runs)
+        ))
+        shutil.rmtree(memories_dir)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print("| Scenario | Runs | p50 ms | p99 ms | min ms |")
+    print("|----------|------|--------|--------|--------|")
+    for r in results:
+        print(f"| {r['scenario']} | {r['runs']} | {r['p50_ms']:.2f} | {r['p99_ms']:.2f} | {r['min_ms']:.2f} |")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Storage Benchmark: Disk usage and read latency of memory storage formats.
+
+Writes the same synthetic memory store in every available format (json,
+gzip, zstd) into a temporary directory and reports apparent size, allocated
+size and per-memory read latency (memory.json + metadata.json).
+
+Usage:
+  python3 bench_storage.py [--memories 200] [--json]
+"""
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+from context_keeper.memory_store import load_memory_content, read_json, write_json, zstd_available  # noqa: E402
+
+SECTIONS = [
+    "Topics Discussed", "Architecture Changes", "UI/UX Changes", "Specification Changes",
+    "Code Changes", "Decisions Made", "Key Outcomes", "Context for Continuation", "Tags",
+]
+WORDS = (
+    "index memory session compaction hook transcript summary parser cache latency token "
+    "budget request handler router config schema migration refactor endpoint validation"
+).split()
+
+
+def make_memory(rng: random.Random, session_id: str, timestamp: str) -> tuple[dict, dict]:
+    """Build a synthetic memory/metadata pair resembling real compactions."""
+    body = []
+    for section in SECTIONS:
+        body.append(f"## {section}")
+        for _ in range(rng.randint(3, 8)):
+            body.append("- " + " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 20))))
+        body.append("")
+    files = [f"src/{rng.choice(WORDS)}/{rng.choice(WORDS)}_{i}.py" for i in range(rng.randint(5, 40))]
+    memory = {"content": "\n".join(body), "timestamp": timestamp, "session_id": session_id}
+    metadata = {
+        "session_id": session_id,
+        "trigger": rng.choice(["auto", "manual"]),
+        "cwd": "/home/user/projects/example",
+        "timestamp": "2025-11-24T19:04:48.000000-08:00",
+        "permission_mode": "default",
+        "hook_event_name": "PreCompact",
+        "custom_instructions": "",
+        "topics": rng.sample(WORDS, 5),
+        "files_modified": files,
+        "message_count": rng.randint(10, 400),
+        "tool_call_count": rng.randint(10, 200),
+        "event_start": "2025-11-24T18:00:00.000Z",
+        "event_end": "2025-11-24T19:04:00.000Z",
+        "memory_timestamp": timestamp,
+    }
+    return memory, metadata
+
+
+def disk_usage(root: Path) -> tuple[int, int]:
+    """Return (apparent bytes, allocated bytes) for all files under root."""
+    apparent = allocated = 0
+    for path in root.rglob("*"):
+        if path.is_file():
+            st = path.stat()
+            apparent += st.st_size
+            allocated += st.st_blocks * 512
+    return apparent, allocated
+
+
+def bench_format(fmt: str, count: int, seed: int) -> dict:
+    """Write and read back `count` memories in one storage format."""
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory(prefix=f"ck-bench-{fmt}-") as tmp:
+        root = Path(tmp)
+        dirs = []
+        write_start = time.perf_counter()
+        for i in range(count):
+            session_id = f"session-{i % 10:04d}"
+            timestamp = f"20251124_{i:06d}"
+            memory, metadata = make_memory(rng, session_id, timestamp)
+            memory_dir = root / session_id / timestamp
+            memory_dir.mkdir(parents=True)
+            write_json(memory_dir / "memory.json", memory, fmt)
+            write_json(memory_dir / "metadata.json", metadata, fmt)
+            dirs.append(memory_dir)
+        write_seconds = time.perf_counter() - write_start
+
+        apparent, allocated = disk_usage(root)
+
+        latencies = []
+        for memory_dir in dirs:
+            start = time.perf_counter()
+            load_memory_content(memory_dir / "memory.json")
+            read_json(memory_dir / "metadata.json")
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    latencies.sort()
+    return {
+        "format": fmt,
+        "memories": count,
+        "apparent_bytes": apparent,
+        "allocated_bytes": allocated,
+        "write_seconds": round(write_seconds, 4),
+        "read_p50_ms": round(statistics.median(latencies), 4),
+        "read_p99_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))], 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark memory storage formats")
+    parser.add_argument("--memories", type=int, default=200, help="Number of memories to write")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", action="store_true", help="Emit results as JSON")
+    args = parser.parse_args()
+
+    formats = ["json", "gzip"] + (["zstd"] if zstd_available() else [])
+    results = [bench_format(fmt, args.memories, args.seed) for fmt in formats]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    baseline = results[0]["apparent_bytes"] or 1
+    print("| Format | Apparent KiB | Allocated KiB | Ratio | Read p50 ms | Read p99 ms |")
+    print("|--------|--------------|---------------|-------|-------------|-------------|")
+    for r in results:
+        print(
+            f"| {r['format']} | {r['apparent_bytes'] / 1024:.1f} | {r['allocated_bytes'] / 1024:.1f} "
+            f"| {r['apparent_bytes'] / baseline:.2f} | {r['read_p50_ms']:.3f} | {r['read_p99_ms']:.3f} |"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Import-Time Check: Import budget of the fast paths of the context_keeper CLI.
+
+Runs the SessionStart hook and the `list` / `sessions` commands under
+`python3 -X importtime` against a small temporary project, sums the
+self-time of every module imported beyond a bare interpreter, and fails if
+that exceeds the budget or if any module that only the summarization path
+needs (anthropic, urllib, sqlite3, zstd, gzip) was imported.
+
+Import times vary between machines; the budgets are generous on purpose
+and meant to catch a heavy import slipping onto a fast path, not small
+regressions. Exits 1 on any failure.
+
+Usage:
+  python3 check_import_time.py [--budget-ms 40] [--runs 5]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent / "scripts"
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+from context_keeper.memory_store import write_json, write_memory  # noqa: E402
+
+SESSION_ID = "import-check-0000-1111-2222"
+
+# Modules no fast path may import (prefix match on the dotted name)
+FORBIDDEN = (
+    "anthropic", "httpx", "urllib.request", "http.client", "sqlite3", "_sqlite3",
+    "zstandard", "compression.zstd", "gzip", "hashlib",
+)
+
+
+def build_project(project: Path):
+    """Create a one-memory store without a pre-rendered SessionStart payload."""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    memory_dir = project / ".claude" / "memories" / SESSION_ID / timestamp
+    memory_dir.mkdir(parents=True)
+    write_memory(memory_dir / "memory.json", {
+        "content": "## Topics Discussed\n- import budgets",
+        "timestamp": timestamp,
+        "session_id": SESSION_ID,
+    })
+    write_json(memory_dir / "metadata.json", {
+        "session_id": SESSION_ID,
+        "trigger": "auto",
+        "cwd": str(project),
+        "timestamp": datetime.now().astimezone().isoformat(),
+        "message_count": 10,
+        "memory_timestamp": timestamp,
+    })
+    (memory_dir.parent / "latest").symlink_to(timestamp)
+
+
+def import_times(args: list[str], stdin: bytes, cwd: Path) -> dict[str, int]:
+    """Run python3 -X importtime and return {module: self µs}."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        input=stdin, cwd=cwd, capture_output=True, check=False,
+    )
+    times = {}
+    for line in proc.stderr.decode("utf-8", "replace").splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|", 2)
+        times[name.strip()] = times.get(name.strip(), 0) + int(self_us)
+    return times
+
+
+def check(name: str, args: list[str], stdin: bytes, cwd: Path, baseline: set[str], budget_ms: float, runs: int) -> bool:
+    totals = []
+    forbidden = set()
+    for _ in range(runs):
+        times = import_times(args, stdin, cwd)
+        totals.append(sum(us for module, us in times.items() if module not in baseline) / 1000)
+        forbidden |= {m for m in times if any(m == f or m.startswith(f + ".") for f in FORBIDDEN)}
+
+    median = statistics.median(totals)
+    ok = median <= budget_ms and not forbidden
+    print(f"| {name} | {median:.1f} | {budget_ms:.0f} | {', '.join(sorted(forbidden)) or '-'} | {'ok' if ok else 'FAIL'} |")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check import time of the context_keeper fast paths")
+    parser.add_argument("--budget-ms", type=float, default=40, help="Import self-time budget beyond the interpreter")
+    parser.add_argument("--runs", type=int, default=5, help="Runs per path (the median is checked)")
+    args = parser.parse_args()
+
+    cli = str(SCRIPTS_DIR / "context_keeper")
+    baseline = set(import_times(["-c", "pass"], b"", Path.cwd()))
+
+    print("| Path | Import ms (p50) | Budget ms | Forbidden imports | Result |")
+    print("|------|-----------------|-----------|-------------------|--------|")
+    with tempfile.TemporaryDirectory(prefix="ck-import-check-") as tmp:
+        project = Path(tmp)
+        build_project(project)
+        payload = json.dumps({
+            "session_id": SESSION_ID,
+            "source": "resume",
+            "cwd": str(project),
+            "hook_event_name": "SessionStart",
+        }).encode("utf-8")
+
+        results = [
+            check("hook SessionStart", [cli, "hook", "SessionStart"], payload, project, baseline, args.budget_ms, args.runs),
+            check("list", [cli, "list"], b"", project, baseline, args.budget_ms, args.runs),
+            check("sessions", [cli, "sessions"], b"", project, baseline, args.budget_ms, args.runs),
+        ]
+
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
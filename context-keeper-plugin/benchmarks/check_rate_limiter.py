@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Rate Limiter Check: Many concurrent PreCompact hooks against a stand-in API.
+
+Starts a local stand-in for the Messages API (streaming responses) that
+enforces its own requests/min token bucket and answers 429 when it is
+exceeded, then runs --processes PreCompact hooks at once, all
+pointed at it through CLAUDE_SUMMARY_API_URL and sharing one
+CONTEXT_KEEPER_HOME (and so one rate limiter).
+
+Reports the peak number of concurrent requests the server saw, the 429s it
+returned, and from the LLM ledger how long hooks waited for capacity and
+how many gave up at their deadline. With the limiter working there are no
+429s, and hooks that cannot be served in time give up instead of calling.
+Exits 1 if the server returned any 429.
+
+Requires the anthropic package (the hooks' own dependency).
+
+Usage:
+  python3 check_rate_limiter.py [--processes 30] [--rpm 20] [--latency 0.5] [--no-limiter]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+SCRIPTS_DIR = BENCH_DIR.parent / "scripts"
+sys.path.insert(0, str(BENCH_DIR))
+
+from gen_transcript import SESSION_ID, generate_transcript  # noqa: E402
+
+MEMORY_TEXT = json.dumps({
+    "nowledge_summary": "## Topics Discussed\n- rate limiting",
+    "full_memory": "## Topics Discussed\n- rate limiting\n\n## Tags\n#check",
+})
+
+
+# ============================================================================
+# Stand-in API Server
+# ============================================================================
+
+class StandInState:
+    """Counters shared by the server threads."""
+
+    def __init__(self, rpm: int, latency: float):
+        self.lock = threading.Lock()
+        self.rpm = rpm
+        self.latency = latency
+        self.allowance = float(rpm)
+        self.updated = time.monotonic()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.requests = 0
+        self.rejected = 0
+
+    def admit(self) -> bool:
+        """Server-side requests/min token bucket, like the real API's."""
+        with self.lock:
+            now = time.monotonic()
+            self.allowance = min(self.rpm, self.allowance + (now - self.updated) * self.rpm / 60)
+            self.updated = now
+            self.requests += 1
+            if self.allowance < 1:
+                self.rejected += 1
+                return False
+            self.allowance -= 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            return True
+
+    def done(self):
+        with self.lock:
+            self.in_flight -= 1
+
+
+def make_handler(state: StandInState):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            if not state.admit():
+                payload = json.dumps({"type": "error", "error": {"type": "rate_limit_error", "message": "slow down"}})
+                self.send_response(429)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload.encode("utf-8"))
+                return
+
+            try:
+                time.sleep(state.latency)
+                prompt = json.dumps(body.get("messages", []))
+                events = [
+                    ("message_start", {"type": "message_start", "message": {
+                        "id": "msg_standin", "type": "message", "role": "assistant", "model": body.get("model"),
+                        "content": [], "stop_reason": None, "stop_sequence": None,
+                        "usage": {"input_tokens": len(prompt) // 4, "output_tokens": 1}}}),
+                    ("content_block_start", {"type": "content_block_start", "index": 0,
+                                             "content_block": {"type": "text", "text": ""}}),
+                    ("content_block_delta", {"type": "content_block_delta", "index": 0,
+                                             "delta": {"type": "text_delta", "text": MEMORY_TEXT}}),
+                    ("content_block_stop", {"type": "content_block_stop", "index": 0}),
+                    ("message_delta", {"type": "message_delta", "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                                       "usage": {"output_tokens": len(MEMORY_TEXT) // 4}}),
+                    ("message_stop", {"type": "message_stop"}),
+                ]
+                stream = "".join(f"event: {name}\ndata: {json.dumps(data)}\n\n" for name, data in events).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Content-Length", str(len(stream)))
+                self.end_headers()
+                self.wfile.write(stream)
+            finally:
+                state.done()
+
+    return Handler
+
+
+# ============================================================================
+# Driver
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the shared LLM rate limiter with concurrent hooks")
+    parser.add_argument("--processes", type=int, default=30, help="Concurrent PreCompact hooks")
+    parser.add_argument("--rpm", type=int, default=20, help="Requests/min of both the limiter and the stand-in API")
+    parser.add_argument("--latency", type=float, default=0.5, help="Seconds the stand-in API takes per request")
+    parser.add_argument("--no-limiter", action="store_true", help="Disable the limiter (baseline: expect 429s)")
+    args = parser.parse_args()
+
+    state = StandInState(args.rpm, args.latency)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(state))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    with tempfile.TemporaryDirectory(prefix="ck-rate-check-") as tmp:
+        tmp = Path(tmp)
+        home = tmp / "home"
+        (home / ".claude").mkdir(parents=True)
+        (home / ".claude" / "settings.json").write_text(json.dumps({"env": {
+            "CLAUDE_SUMMARY_API_KEY": "sk-standin-key",
+            "CLAUDE_SUMMARY_API_URL": f"http://127.0.0.1:{server.server_address[1]}",
+        }}), encoding="utf-8")
+        state_dir = home / "context-keeper"
+        env = {
+            **os.environ, "HOME": str(home), "CONTEXT_KEEPER_HOME": str(state_dir),
+            "CONTEXT_KEEPER_RATE_RPM": "0" if args.no_limiter else str(args.rpm), "CONTEXT_KEEPER_RATE_TPM": "0",
+            "CONTEXT_KEEPER_METRICS": "0",
+        }
+        transcript = tmp / "transcript.jsonl"
+        generate_transcript(transcript, 256 * 1024, seed=1, compactions=0)
+
+        procs = []
+        started = time.perf_counter()
+        for i in range(args.processes):
+            project = tmp / f"project-{i}"
+            project.mkdir()
+            proc = subprocess.Popen(
+                [sys.executable, str(SCRIPTS_DIR / "context_keeper"), "hook", "PreCompact"],
+                stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=env,
+            )
+            proc.stdin.write(json.dumps({
+                "session_id": SESSION_ID, "transcript_path": str(transcript), "cwd": str(project),
+                "trigger": "auto", "hook_event_name": "PreCompact",
+            }).encode("utf-8"))
+            proc.stdin.close()
+            procs.append(proc)
+        for proc in procs:
+            proc.wait()
+        elapsed = time.perf_counter() - started
+        server.shutdown()
+
+        ledger = []
+        ledger_path = state_dir / "llm_ledger.jsonl"
+        if ledger_path.exists():
+            ledger = [json.loads(line) for line in ledger_path.read_text(encoding="utf-8").splitlines() if line]
+
+    served = [e for e in ledger if e.get("status") == "ok"]
+    waits = sorted(e.get("rate_wait_ms", 0) / 1000 for e in served)
+    print(f"Hooks:             {args.processes} ({sum(p.returncode == 0 for p in procs)} exited 0) in {elapsed:.1f}s")
+    print(f"Limit:             {args.rpm} requests/min")
+    print(f"Server requests:   {state.requests} ({state.rejected} answered 429)")
+    print(f"Peak concurrency:  {state.max_in_flight}")
+    print(f"Summaries served:  {len(served)}")
+    print(f"Failed or gave up: {len(ledger) - len(served)}")
+    if waits:
+        print(f"Rate-limit wait:   p50 {statistics.median(waits):.1f}s, max {waits[-1]:.1f}s")
+    sys.exit(1 if state.rejected else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Synthetic Transcript Generator: Deterministic Claude Code JSONL transcripts.
+
+Writes transcripts shaped like the ones Claude Code passes to the hooks:
+user/assistant records with nested `message` objects, assistant tool_use
+blocks (Edit, Write, Read, Bash, Grep), user tool_result records, system
+reminders, `compact_boundary` system records, and occasional huge tool
+results (build logs, file dumps). The same seed and size always produce
+the same file, so benchmark runs are comparable between commits.
+
+Usage:
+  python3 gen_transcript.py OUT.jsonl [--size 64MB] [--seed 1] [--compactions 3]
+                                     [--huge-every 200] [--huge-size 2MB]
+
+Sizes accept B, KB, MB and GB suffixes (1MB up to 2GB is the intended range).
+"""
+
+import argparse
+import json
+import random
+import re
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+SESSION_ID = "5f0c6a1e-bench-4c2a-9d7f-000000000001"
+PROJECT_DIR = "/home/user/projects/example-service"
+START_TIME = datetime(2025, 11, 24, 9, 0, 0, tzinfo=timezone.utc)
+
+WORDS = (
+    "request handler router middleware token session cache index query schema migration test "
+    "fixture config deploy build error retry timeout worker queue payload response client server "
+    "auth jwt refresh user account billing invoice report export import parser lexer memory "
+    "summary context hook compaction transcript boundary latency throughput budget"
+).split()
+FILES = [f"src/{area}/{name}.py" for area in ("api", "core", "db", "auth", "jobs") for name in
+         ("handlers", "models", "service", "utils", "schema", "tasks")]
+TOOLS = ("Edit", "Write", "Read", "Bash", "Grep", "MultiEdit")
+LOG_LEVELS = ("INFO", "DEBUG", "WARNING", "ERROR")
+
+SIZE_RE = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*([KMG]?B?)\s*$', re.IGNORECASE)
+SIZE_UNITS = {"": 1, "B": 1, "K": 1024, "KB": 1024, "M": 1024 ** 2, "MB": 1024 ** 2, "G": 1024 ** 3, "GB": 1024 ** 3}
+
+
+def parse_size(value: str) -> int:
+    """Parse '64MB', '2GB', '512KB' or a byte count."""
+    match = SIZE_RE.match(value)
+    if not match:
+        raise ValueError(f"Invalid size: {value!r}")
+    return int(float(match.group(1)) * SIZE_UNITS[match.group(2).upper()])
+
+
+class TranscriptWriter:
+    """Streams records to a JSONL file, tracking size and uuid chaining."""
+
+    def __init__(self, out, rng: random.Random):
+        self.out = out
+        self.rng = rng
+        self.bytes_written = 0
+        self.records = 0
+        self.clock = START_TIME
+        self.parent = None
+
+    def _uuid(self) -> str:
+        return "%08x-%04x-4%03x-%04x-%012x" % (
+            self.rng.getrandbits(32), self.rng.getrandbits(16), self.rng.getrandbits(12),
+            self.rng.getrandbits(16), self.rng.getrandbits(48),
+        )
+
+    def write(self, record: dict):
+        self.clock += timedelta(milliseconds=self.rng.randint(200, 20000))
+        uuid = self._uuid()
+        record = {
+            "parentUuid": self.parent,
+            "isSidechain": False,
+            "userType": "external",
+            "cwd": PROJECT_DIR,
+            "sessionId": SESSION_ID,
+            "version": "2.0.50",
+            **record,
+            "uuid": uuid,
+            "timestamp": self.clock.isoformat(timespec="milliseconds").replace("+00:00", "Z"),
+        }
+        self.parent = uuid
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+        self.out.write(line)
+        self.bytes_written += len(line.encode("utf-8"))
+        self.records += 1
+
+    # ------------------------------------------------------------------
+    # Content
+    # ------------------------------------------------------------------
+
+    def sentence(self, low: int = 6, high: int = 30) -> str:
+        words = [self.rng.choice(WORDS) for _ in range(self.rng.randint(low, high))]
+        return " ".join(words).capitalize() + "."
+
+    def paragraph(self, sentences: int) -> str:
+        return " ".join(self.sentence() for _ in range(sentences))
+
+    def code(self, lines: int) -> str:
+        out = []
+        for i in range(lines):
+            name = self.rng.choice(WORDS)
+            out.append(f"    {name}_{i} = {self.rng.choice(WORDS)}({self.rng.randint(0, 999)})")
+        return "\n".join(out)
+
+    def log_dump(self, size: int) -> str:
+        lines = []
+        total = 0
+        ts = self.clock
+        while total < size:
+            ts += timedelta(milliseconds=self.rng.randint(1, 50))
+            line = f"{ts:%H:%M:%S.%f} {self.rng.choice(LOG_LEVELS)} {self.rng.choice(FILES)}: {self.sentence(4, 14)}"
+            if self.rng.random() < 0.02:
+                line += "\nTraceback (most recent call last):\n" + "\n".join(
+                    f'  File "{self.rng.choice(FILES)}", line {self.rng.randint(1, 900)}, in {self.rng.choice(WORDS)}'
+                    for _ in range(self.rng.randint(3, 12))
+                ) + f"\nValueError: {self.sentence(3, 8)}"
+            lines.append(line)
+            total += len(line) + 1
+        return "\n".join(lines)
+
+    # ------------------------------------------------------------------
+    # Records
+    # ------------------------------------------------------------------
+
+    def user_prompt(self):
+        content = self.paragraph(self.rng.randint(1, 6))
+        if self.rng.random() < 0.15:
+            content = f"<system-reminder>\n{self.paragraph(3)}\n</system-reminder>"
+        elif self.rng.random() < 0.3:
+            # Newer transcripts carry user text as content blocks
+            self.write({"type": "user", "message": {"role": "user", "content": [{"type": "text", "text": content}]}})
+            return
+        self.write({"type": "user", "message": {"role": "user", "content": content}})
+
+    def assistant_turn(self, huge_result_size: int = 0):
+        blocks = [{"type": "text", "text": self.paragraph(self.rng.randint(1, 4))}]
+        tool_uses = []
+        for _ in range(self.rng.choice((0, 1, 1, 2, 3))):
+            tool = self.rng.choice(TOOLS)
+            tool_id = "toolu_" + "%024x" % self.rng.getrandbits(96)
+            path = f"{PROJECT_DIR}/{self.rng.choice(FILES)}"
+            if tool in ("Edit", "MultiEdit"):
+                tool_input = {"file_path": path, "old_string": self.code(4), "new_string": self.code(6)}
+            elif tool == "Write":
+                tool_input = {"file_path": path, "content": self.code(self.rng.randint(20, 120))}
+            elif tool == "Bash":
+                tool_input = {"command": f"pytest -q tests/test_{self.rng.choice(WORDS)}.py", "description": self.sentence(3, 6)}
+            elif tool == "Grep":
+                tool_input = {"pattern": self.rng.choice(WORDS), "path": PROJECT_DIR}
+            else:
+                tool_input = {"file_path": path}
+            blocks.append({"type": "tool_use", "id": tool_id, "name": tool, "input": tool_input})
+            tool_uses.append((tool_id, tool))
+
+        self.write({
+            "type": "assistant",
+            "requestId": "req_" + "%024x" % self.rng.getrandbits(96),
+            "message": {
+                "id": "msg_" + "%024x" % self.rng.getrandbits(96),
+                "type": "message",
+                "role": "assistant",
+                "model": "claude-sonnet-4-5-20250929",
+                "content": blocks,
+                "stop_reason": "tool_use" if tool_uses else "end_turn",
+                "usage": {
+                    "input_tokens": self.rng.randint(10, 4000),
+                    "cache_read_input_tokens": self.rng.randint(0, 90000),
+                    "output_tokens": self.rng.randint(20, 2000),
+                },
+            },
+        })
+
+        for i, (tool_id, tool) in enumerate(tool_uses):
+            if huge_result_size and i == 0:
+                result = self.log_dump(huge_result_size)
+            elif tool == "Read":
+                result = self.code(self.rng.randint(30, 300))
+            elif tool == "Bash":
+                result = self.log_dump(self.rng.randint(200, 6000))
+            else:
+                result = f"The file {self.rng.choice(FILES)} has been updated."
+            self.write({
+                "type": "user",
+                "message": {"role": "user", "content": [
+                    {"type": "tool_result", "tool_use_id": tool_id, "content": result},
+                ]},
+                "toolUseResult": {"stdout": result[:200], "stderr": "", "interrupted": False},
+            })
+
+    def compact_boundary(self):
+        self.write({
+            "type": "system",
+            "subtype": "compact_boundary",
+            "content": "Conversation compacted",
+            "level": "info",
+            "compactMetadata": {"trigger": self.rng.choice(("auto", "manual")), "preTokens": self.rng.randint(90000, 160000)},
+        })
+        self.write({
+            "type": "user",
+            "isCompactSummary": True,
+            "message": {"role": "user", "content": "This session is being continued from a previous conversation. " + self.paragraph(12)},
+        })
+
+
+def generate_transcript(
+    path: Path,
+    target_bytes: int,
+    seed: int = 1,
+    compactions: int = 3,
+    huge_every: int = 200,
+    huge_size: int = 2 * 1024 ** 2,
+) -> dict:
+    """
+    Write a transcript of roughly target_bytes (stops at the first record past it).
+
+    compact_boundary records are spread evenly; every huge_every-th assistant
+    turn carries a tool result of huge_size bytes (0 disables them). Returns
+    {"bytes", "records", "compactions"}.
+    """
+    rng = random.Random(seed)
+    boundaries = [target_bytes * (i + 1) // (compactions + 1) for i in range(compactions)]
+    # Huge results never exceed a quarter of the transcript
+    huge_size = min(huge_size, target_bytes // 4)
+
+    with open(path, "w", encoding="utf-8", newline="\n") as out:
+        writer = TranscriptWriter(out, rng)
+        turn = 0
+        while writer.bytes_written < target_bytes:
+            if boundaries and writer.bytes_written >= boundaries[0]:
+                boundaries.pop(0)
+                writer.compact_boundary()
+            writer.user_prompt()
+            turn += 1
+            huge = huge_size if huge_every and turn % huge_every == 0 else 0
+            writer.assistant_turn(huge)
+
+    return {"bytes": writer.bytes_written, "records": writer.records, "compactions": compactions - len(boundaries)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic Claude Code transcript")
+    parser.add_argument("output", help="Path of the JSONL file to write")
+    parser.add_argument("--size", default="64MB", help="Target size (e.g. 1MB, 512MB, 2GB)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--compactions", type=int, default=3, help="Number of compact_boundary records")
+    parser.add_argument("--huge-every", type=int, default=200, help="Huge tool result every N turns (0 = never)")
+    parser.add_argument("--huge-size", default="2MB", help="Size of each huge tool result")
+    args = parser.parse_args()
+
+    try:
+        target = parse_size(args.size)
+        huge_size = parse_size(args.huge_size)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(2)
+
+    stats = generate_transcript(Path(args.output), target, args.seed, args.compactions, args.huge_every, huge_size)
+    print(json.dumps(stats))
+
+
+if __name__ == "__main__":
+    main()
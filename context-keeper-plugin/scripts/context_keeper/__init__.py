@@ -0,0 +1,15 @@
+"""
+context_keeper: Session memories for Claude Code.
+
+Hooks and commands run through one dispatcher (cli.py):
+
+  python3 ${CLAUDE_PLUGIN_ROOT}/scripts/context_keeper hook PreCompact
+  python3 ${CLAUDE_PLUGIN_ROOT}/scripts/context_keeper list --limit 20
+
+The modules keep their heavy dependencies (anthropic, urllib, sqlite3,
+compression) out of import time, so the SessionStart hook and the list
+commands only pay for what they use. The scripts next to this package are
+thin shims kept for existing hook and command paths.
+"""
+
+__version__ = "1.0.0"
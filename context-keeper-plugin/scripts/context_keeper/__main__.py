@@ -0,0 +1,15 @@
+#!/usr/bin/env python3
+"""Entry point for `python3 scripts/context_keeper ...` and `python3 -m context_keeper ...`."""
+
+import sys
+
+if __package__ in (None, ""):
+    # Run as a directory: make the package importable from its parent
+    from pathlib import Path
+    sys.path[0] = str(Path(__file__).resolve().parent.parent)
+    from context_keeper.cli import main
+else:
+    from .cli import main
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
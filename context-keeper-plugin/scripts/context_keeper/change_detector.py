@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Change Detector: Compactions that add too little to summarize with the LLM.
+
+A session compacted again soon after its last compaction often has little
+new in it: acknowledgements, a question answered in a line or two.
+measure_delta() scores what the delta adds to the session's latest memory:
+
+  messages    user and assistant messages left after the noise filter
+  tool_calls  tool calls
+  new_files   modified files the latest memory does not mention
+  errors      messages with an error, exception or failure line
+
+  score = messages + tool_calls + NEW_FILE_WEIGHT * new_files + ERROR_WEIGHT * errors
+
+In rolling mode, save_memory.main() then handles the delta without the LLM
+(unless the compaction has custom instructions, pre-summarized chunks or
+interrupted jobs to finish):
+
+  score 0                  the latest memory is kept; its metadata records the
+                           compaction and its SessionStart payload is
+                           re-rendered with a fresh expiry (no new memory)
+  score <= threshold       the latest memory is saved again with a short
+                           delta note (delta_note()) before its Tags; with
+                           deduplicated sections only the new one is stored
+  score above, or more     summarized by the LLM as usual, which folds the
+  than NOTE_MAX_TOKENS     notes into the consolidated memory
+
+Neither path calls the LLM or pushes to Nowledge. Memories saved with a note
+carry "summary_source": "delta-note".
+
+Environment variables:
+  CONTEXT_KEEPER_TRIVIAL_SCORE - highest score handled without the LLM (default 4, 0 = always summarize)
+"""
+
+import re
+from datetime import datetime
+
+from .memory_store import get_setting
+from .session_context import estimate_tokens
+
+# ============================================================================
+# Configuration
+# ============================================================================
+
+SUMMARY_SOURCE = "delta-note"
+DEFAULT_THRESHOLD = 4
+
+NEW_FILE_WEIGHT = 3
+ERROR_WEIGHT = 5
+# A delta with more message tokens than this goes to the LLM whatever its score
+NOTE_MAX_TOKENS = 800
+NOTE_MESSAGE_CHARS = 200
+
+# Like the noise filter's error lines: TypeError, ConnectionException, "tests failed"
+_ERROR_RE = re.compile(r"error|exception|traceback|\bfail|fatal|panic", re.IGNORECASE)
+_TAGS_RE = re.compile(r"^## Tags\s*$", re.MULTILINE)
+
+
+def trivial_threshold() -> int:
+    try:
+        return max(0, int(get_setting("CONTEXT_KEEPER_TRIVIAL_SCORE", "") or DEFAULT_THRESHOLD))
+    except ValueError:
+        return DEFAULT_THRESHOLD
+
+
+# ============================================================================
+# Delta
+# ============================================================================
+
+def _messages(content: dict) -> list[str]:
+    return [
+        text for key in ("user_messages", "assistant_messages")
+        for text in content.get(key) or [] if isinstance(text, str) and text.strip()
+    ]
+
+
+def measure_delta(content: dict, previous_memory: str, previous_files: list[str] = ()) -> dict:
+    """Information the (noise-filtered) delta adds to previous_memory; see the module docstring."""
+    messages = _messages(content)
+    known = set(previous_files)
+    new_files = [
+        path for path in content.get("files_modified") or []
+        if path not in known and path.rsplit("/", 1)[-1] not in previous_memory
+    ]
+    delta = {
+        "messages": len(messages),
+        "tool_calls": len(content.get("tool_calls") or []),
+        "new_files": len(new_files),
+        "errors": sum(1 for text in messages if _ERROR_RE.search(text)),
+        "tokens": sum(estimate_tokens(text) for text in messages),
+    }
+    delta["score"] = (delta["messages"] + delta["tool_calls"]
+                      + NEW_FILE_WEIGHT * delta["new_files"] + ERROR_WEIGHT * delta["errors"])
+    return delta
+
+
+def is_trivial(delta: dict, threshold: int = None) -> bool:
+    threshold = trivial_threshold() if threshold is None else threshold
+    return threshold > 0 and delta["score"] <= threshold and delta["tokens"] <= NOTE_MAX_TOKENS
+
+
+# ============================================================================
+# Delta Note
+# ============================================================================
+
+def _shorten(text: str) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= NOTE_MESSAGE_CHARS else text[:NOTE_MESSAGE_CHARS - 3].rstrip() + "..."
+
+
+def delta_note(content: dict, when: datetime = None) -> str:
+    """Markdown section listing a trivial delta's messages, tool calls and files."""
+    when = when or datetime.now()
+    lines = [f"## Update {when.strftime('%Y-%m-%d %H:%M')}"]
+    for role, key in (("User", "user_messages"), ("Assistant", "assistant_messages")):
+        lines.extend(f"- {role}: {_shorten(text)}" for text in content.get(key) or [] if isinstance(text, str) and text.strip())
+    lines.extend(f"- Tool: {call.tool}" for call in content.get("tool_calls") or [])
+    if content.get("files_modified"):
+        lines.append("- Files modified: " + ", ".join(content["files_modified"]))
+    if len(lines) == 1:
+        lines.append("- No new messages")
+    return "\n".join(lines)
+
+
+def append_note(memory: str, note: str) -> str:
+    """memory with note inserted before its Tags section (rolling consolidation trims trailing sections first)."""
+    match = _TAGS_RE.search(memory)
+    if match is None:
+        return f"{memory.rstrip()}\n\n{note}"
+    return f"{memory[:match.start()].rstrip()}\n\n{note}\n\n{memory[match.start():]}"
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+CLI: Dispatcher for the context-keeper hooks and commands.
+
+Each command names the module and function that implement it; the module
+is imported only when the command runs, so `hook SessionStart` never loads
+the summarization code and `list` never loads the catalog. Commands parse
+their own arguments (sys.argv is rewritten to the command's view).
+
+Usage:
+  context_keeper hook <PreCompact|SessionStart|SessionEnd> [args]
+  context_keeper <command> [args]
+
+If the resident server (`context_keeper daemon start`) is running, main()
+forwards the other hooks and commands to it; see daemon.py.
+"""
+
+import importlib
+import sys
+
+# Hook event -> (module, function)
+HOOKS = {
+    "PreCompact": ("save_memory", "run_hook"),
+    "SessionStart": ("load_memory", "run_hook"),
+    "SessionEnd": ("save_thread", "run_hook"),
+}
+
+# Command -> (module, function, description)
+COMMANDS = {
+    "load": ("load_memory", "main", "Show a memory (latest, or by session id / timestamp)"),
+    "list": ("list_memories", "main", "List memories of the current project"),
+    "sessions": ("list_memory_sessions", "main", "List sessions of the current project"),
+    "migrate": ("migrate_memories", "main", "Convert stored memories between storage formats"),
+    "catalog": ("memory_catalog", "main", "Scan, list and search memories across projects"),
+    "stats": ("hook_stats", "main", "Summarize hook stage timings"),
+    "llm-usage": ("llm_ledger", "main", "Report LLM token usage and estimated spend"),
+    "resume": ("save_memory", "resume_main", "Continue summaries a killed or failed compaction left"),
+    "daemon": ("daemon", "main", "Start, stop or inspect the resident hook server"),
+    "watch": ("presummarizer", "main", "Start, stop or inspect the transcript pre-summarizer"),
+}
+
+# Run in-process even when the daemon is up: the daemon and watch commands
+# (long-running processes of their own), and SessionStart and the list
+# commands, which start close to bare interpreter startup, so forwarding them
+# costs more (client imports, fork) than it saves
+LOCAL_COMMANDS = ("daemon", "watch", "list", "sessions", "-h", "--help")
+
+
+def usage() -> str:
+    lines = [
+        "usage: context_keeper hook <event> [args]",
+        "       context_keeper <command> [args]",
+        "",
+        "hook events: " + ", ".join(HOOKS),
+        "",
+        "commands:",
+    ]
+    lines += [f"  {name:<10} {description}" for name, (_, _, description) in COMMANDS.items()]
+    return "\n".join(lines)
+
+
+def run(module: str, function: str, prog: str, args: list[str]):
+    """Import module lazily and call function with sys.argv set to [prog, *args]."""
+    sys.argv = [prog, *args]
+    return getattr(importlib.import_module(f"{__package__}.{module}"), function)()
+
+
+def main(argv: list[str] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] not in LOCAL_COMMANDS and argv[:2] != ["hook", "SessionStart"]:
+        # Hand the command to the resident server when one is running
+        from .daemon import forward
+        code = forward(argv)
+        if code is not None:
+            return code
+    return dispatch(argv)
+
+
+def dispatch(argv: list[str]) -> int:
+    """Run a command in this process."""
+    if not argv or argv[0] in ("-h", "--help"):
+        print(usage())
+        return 0 if argv else 2
+
+    command, args = argv[0], argv[1:]
+    if command == "hook":
+        if not args or args[0] not in HOOKS:
+            print(f"context_keeper: unknown hook event {args[0] if args else ''!r}\n\n{usage()}", file=sys.stderr)
+            return 2
+        module, function = HOOKS[args[0]]
+        run(module, function, f"context_keeper hook {args[0]}", args[1:])
+        return 0
+
+    if command not in COMMANDS:
+        print(f"context_keeper: unknown command {command!r}\n\n{usage()}", file=sys.stderr)
+        return 2
+    module, function, _ = COMMANDS[command]
+    run(module, function, f"context_keeper {command}", args)
+    return 0
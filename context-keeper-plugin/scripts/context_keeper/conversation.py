@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Conversation: Typed records of the conversation content of a transcript.
+
+iter_conversation() walks parsed transcript messages and yields one record
+per piece of content the summarizer uses, in transcript order:
+
+  Message(role, text, timestamp)   - a user or assistant text (<= 2000 chars)
+  ToolCall(tool, input, timestamp) - a tool_use block
+  FileEdit(path, tool)             - the file a Edit/Write/MultiEdit/NotebookEdit
+                                     call changed (follows its ToolCall)
+
+The records use __slots__, and roles and tool names are interned, so large
+sessions do not pay for a dict per record or a copy of every tool name.
+Records reference the strings of the parsed messages instead of copying
+them. save_memory.extract_conversation_content() collects them into the
+lists the prompt is built from.
+"""
+
+import os
+import sys
+
+USER = "user"
+ASSISTANT = "assistant"
+
+MAX_TEXT_CHARS = 2000
+EDIT_TOOLS = frozenset(("Edit", "Write", "MultiEdit", "NotebookEdit"))
+SYSTEM_REMINDER = "<system-reminder>"
+
+
+# ============================================================================
+# Records
+# ============================================================================
+
+class Message:
+    """A user or assistant text."""
+
+    __slots__ = ("role", "text", "timestamp")
+
+    def __init__(self, role: str, text: str, timestamp: str | None):
+        self.role = role
+        self.text = text
+        self.timestamp = timestamp
+
+    def __repr__(self):
+        return f"Message({self.role!r}, {self.text[:40]!r}, {self.timestamp!r})"
+
+
+class ToolCall:
+    """A tool_use block (its input as kept by the transcript cache)."""
+
+    __slots__ = ("tool", "input", "timestamp")
+
+    def __init__(self, tool: str, input: dict, timestamp: str | None):
+        self.tool = sys.intern(tool)
+        self.input = input
+        self.timestamp = timestamp
+
+    def __repr__(self):
+        return f"ToolCall({self.tool!r}, {self.timestamp!r})"
+
+
+class FileEdit:
+    """A file changed by a tool call, relative to the working directory when possible."""
+
+    __slots__ = ("path", "tool")
+
+    def __init__(self, path: str, tool: str):
+        self.path = path
+        self.tool = sys.intern(tool)
+
+    def __repr__(self):
+        return f"FileEdit({self.path!r}, {self.tool!r})"
+
+
+class Timeline:
+    """First and last timestamp of the messages iter_conversation() visited."""
+
+    __slots__ = ("start", "end")
+
+    def __init__(self):
+        self.start = None
+        self.end = None
+
+    def add(self, timestamp: str):
+        if self.start is None or timestamp < self.start:
+            self.start = timestamp
+        if self.end is None or timestamp > self.end:
+            self.end = timestamp
+
+
+# ============================================================================
+# Iteration
+# ============================================================================
+
+def _tool_records(name, tool_input, timestamp, relative_paths: dict):
+    if not isinstance(name, str):
+        name = "unknown"
+    if not isinstance(tool_input, dict):
+        tool_input = {}
+    yield ToolCall(name, tool_input, timestamp)
+
+    if name in EDIT_TOOLS:
+        file_path = tool_input.get("file_path", tool_input.get("notebook_path", ""))
+        if file_path:
+            # Sessions edit the same few files over and over; relpath is the costly part
+            relative = relative_paths.get(file_path)
+            if relative is None:
+                try:
+                    relative = os.path.relpath(file_path, os.getcwd())
+                except ValueError:
+                    relative = file_path  # Different drive or invalid path: keep it as is
+                relative_paths[file_path] = relative
+            yield FileEdit(relative, name)
+
+
+def iter_conversation(messages, start_cutoff: str = None, timeline: Timeline = None):
+    """
+    Yield Message, ToolCall and FileEdit records of parsed transcript messages.
+
+    Args:
+        messages: Parsed (normalized) transcript messages
+        start_cutoff: Optional ISO timestamp; only messages after it are used
+        timeline: Optional Timeline updated with the timestamp of every used
+            message, including those that yield no record (tool results)
+    """
+    relative_paths = {}
+
+    for msg in messages:
+        if not isinstance(msg, dict):
+            continue
+
+        msg_type = msg.get("type", "")
+        nested = msg.get("message", {})
+        if not isinstance(nested, dict):
+            nested = {}
+
+        ts = msg.get("created_at") or msg.get("timestamp") or nested.get("created_at") or nested.get("timestamp")
+        if start_cutoff and ts and ts <= start_cutoff:
+            continue
+        if ts and timeline is not None:
+            timeline.add(ts)
+
+        role = nested.get("role", "")
+        content = nested.get("content", "")
+
+        if msg_type == USER or role == USER:
+            if isinstance(content, str):
+                if content.strip() and SYSTEM_REMINDER not in content:
+                    yield Message(USER, content[:MAX_TEXT_CHARS], ts)
+            elif isinstance(content, list):
+                for block in content:
+                    if isinstance(block, dict) and block.get("type") == "text":
+                        text = block.get("text", "")
+                        if text and SYSTEM_REMINDER not in text:
+                            yield Message(USER, text[:MAX_TEXT_CHARS], ts)
+
+        elif msg_type == ASSISTANT or role == ASSISTANT:
+            if isinstance(content, str):
+                if content.strip():
+                    yield Message(ASSISTANT, content[:MAX_TEXT_CHARS], ts)
+            elif isinstance(content, list):
+                for block in content:
+                    if not isinstance(block, dict):
+                        continue
+                    block_type = block.get("type", "")
+                    if block_type == "text":
+                        text = block.get("text", "")
+                        if text:
+                            yield Message(ASSISTANT, text[:MAX_TEXT_CHARS], ts)
+                    elif block_type == "tool_use":
+                        yield from _tool_records(block.get("name", "unknown"), block.get("input", {}), ts, relative_paths)
+
+        # Tool calls as top-level records (older format)
+        elif msg_type == "tool_use":
+            yield from _tool_records(msg.get("name", "unknown"), msg.get("input", {}), ts, relative_paths)
@@ -0,0 +1,464 @@
+#!/usr/bin/env python3
+"""
+Daemon: Optional resident server that runs hooks and commands warm.
+
+`context_keeper daemon start` launches a background server on a per-user
+Unix socket ($CONTEXT_KEEPER_HOME/daemon.sock). The server imports every
+hook and command module (and anthropic) once; each request is then served
+by a child forked from it, so a hook starts with its code already loaded
+but still runs in its own process (own sys.argv, logging, signals and exit
+status, and settings re-read per request).
+
+The client side is forward(), which the dispatcher calls before importing
+anything else (for every hook and command except SessionStart and the list
+commands, see cli.LOCAL_COMMANDS). It sends argv, cwd and the environment together with the
+hook's stdin/stdout/stderr file descriptors (SCM_RIGHTS); the child puts
+those on fds 0-2 and runs the command, so hook output reaches Claude Code
+directly, without being relayed. The reply carries the exit status, and a
+SIGTERM sent to the client (hook timeout) is passed on to the child.
+
+forward() returns None, and the dispatcher runs the command in-process, if
+the socket does not exist, the server does not answer, or it serves a
+different plugin directory or version (the plugin was updated since it
+started). Set CONTEXT_KEEPER_DAEMON=0 to never use the server.
+
+Usage:
+  context_keeper daemon start    # Start in the background
+  context_keeper daemon stop     # Stop a running server
+  context_keeper daemon status   # Show pid, plugin directory, uptime and requests
+  context_keeper daemon run      # Run in the foreground
+"""
+
+import os
+import sys
+from pathlib import Path
+
+from . import __version__
+
+PACKAGE_DIR = str(Path(__file__).resolve().parent)
+
+# ============================================================================
+# Configuration
+# ============================================================================
+
+SOCKET_FILE = "daemon.sock"
+LOG_FILE = "daemon.log"
+DEFAULT_IDLE_SECONDS = 8 * 3600
+START_TIMEOUT_SECONDS = 10
+ACCEPT_TIMEOUT_SECONDS = 10
+MAX_MESSAGE_BYTES = 4 * 1024 * 1024
+
+# Imported by the server before it accepts requests, besides the command modules
+PRELOAD = ("anthropic",)
+
+
+def daemon_enabled() -> bool:
+    return os.environ.get("CONTEXT_KEEPER_DAEMON", "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+def get_socket_path() -> Path:
+    # Environment only, like hook_trace: the client runs before settings are read
+    configured = os.environ.get("CONTEXT_KEEPER_SOCKET")
+    if configured:
+        return Path(configured).expanduser()
+    home = os.environ.get("CONTEXT_KEEPER_HOME")
+    state_dir = Path(home).expanduser() if home else Path.home() / ".claude" / "context-keeper"
+    return state_dir / SOCKET_FILE
+
+
+# ============================================================================
+# Protocol
+# ============================================================================
+#
+# One JSON object per line in each direction. The client's request is
+# {"op": "run" | "status" | "stop", ...}; for "run" the first chunk of it
+# carries the client's fds 0-2. The server answers "run" with
+# {"status": "accepted", "pid": <child>} (or {"status": "mismatch"}) and,
+# when the command finished, {"status": "exit", "code": <int>}.
+
+def send_message(sock, message: dict, fds: list[int] = None):
+    import json
+    import socket
+    data = json.dumps(message, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+    if fds:
+        sent = socket.send_fds(sock, [data], fds)
+        data = data[sent:]
+    if data:
+        sock.sendall(data)
+
+
+def recv_message(sock, buffer: bytearray, max_fds: int = 0) -> tuple[dict | None, list[int]]:
+    """Read one message line (and any fds sent with it); None on EOF."""
+    import json
+    import socket
+    fds = []
+    while b"\n" not in buffer:
+        if len(buffer) > MAX_MESSAGE_BYTES:
+            raise ValueError("message too large")
+        if max_fds and not fds:
+            chunk, received, _, _ = socket.recv_fds(sock, 65536, max_fds)
+            fds.extend(received)
+        else:
+            chunk = sock.recv(65536)
+        if not chunk:
+            for fd in fds:
+                os.close(fd)
+            return None, []
+        buffer.extend(chunk)
+    line, _, rest = bytes(buffer).partition(b"\n")
+    buffer[:] = rest
+    return json.loads(line), fds
+
+
+def connect(path: Path = None, timeout: float = None):
+    import socket
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(str(path or get_socket_path()))
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+def request(op: str, timeout: float = 5) -> dict | None:
+    """Send a control request ("status", "stop"); None if no server answers."""
+    try:
+        with connect(timeout=timeout) as sock:
+            send_message(sock, {"op": op})
+            return recv_message(sock, bytearray())[0]
+    except (OSError, ValueError):
+        return None
+
+
+# ============================================================================
+# Client
+# ============================================================================
+
+def forward(argv: list[str]) -> int | None:
+    """
+    Run a dispatcher command in the daemon.
+
+    Returns its exit status, or None if the daemon is not available and the
+    command should run in-process (nothing has been read from stdin then).
+    """
+    if not daemon_enabled():
+        return None
+    path = get_socket_path()
+    if not os.path.exists(path):
+        return None
+
+    try:
+        sock = connect(path, timeout=ACCEPT_TIMEOUT_SECONDS)
+    except OSError:
+        return None
+
+    with sock:
+        buffer = bytearray()
+        try:
+            send_message(sock, {
+                "op": "run",
+                "argv": argv,
+                "cwd": os.getcwd(),
+                "env": dict(os.environ),
+                "root": PACKAGE_DIR,
+                "version": __version__,
+            }, fds=[0, 1, 2])
+        except OSError:
+            return None
+        try:
+            reply, _ = recv_message(sock, buffer)
+        except (OSError, ValueError):
+            # The server may still run the command, so it must not also run here
+            print("[context-keeper] daemon did not answer", file=sys.stderr)
+            return 1
+        if not reply or reply.get("status") != "accepted":
+            return None
+
+        # The daemon now owns our stdin/stdout/stderr; pass termination on
+        import signal
+        child = reply.get("pid")
+
+        def _terminate(signum, frame):
+            try:
+                os.kill(child, signum)
+            except (OSError, TypeError):
+                pass
+
+        for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+            signal.signal(signum, _terminate)
+
+        sock.settimeout(None)
+        try:
+            reply, _ = recv_message(sock, buffer)
+        except (OSError, ValueError):
+            reply = None
+
+    if not reply or reply.get("status") != "exit":
+        print("[context-keeper] daemon connection lost", file=sys.stderr)
+        return 1
+    return reply.get("code", 1)
+
+
+# ============================================================================
+# Server
+# ============================================================================
+
+def _exit_code(e: SystemExit) -> int:
+    if e.code is None or isinstance(e.code, int):
+        return e.code or 0
+    print(e.code, file=sys.stderr)
+    return 1
+
+
+def _run_command(message: dict, fds: list[int]) -> int:
+    """Run one command in the forked child, on the client's stdio."""
+    import signal
+    from . import memory_store
+    from .cli import dispatch
+
+    sys.stdout.flush()
+    sys.stderr.flush()
+    for target, fd in enumerate(fds):
+        os.dup2(fd, target)
+        os.close(fd)
+
+    os.chdir(message["cwd"])
+    os.environ.clear()
+    os.environ.update(message["env"])
+    memory_store._settings_env = None  # Re-read settings.json for this request
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+    try:
+        return dispatch(message["argv"])
+    except SystemExit as e:
+        return _exit_code(e)
+    except BaseException:
+        import traceback
+        traceback.print_exc()
+        return 1
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        except OSError:
+            pass
+
+
+def make_server(path: Path):
+    import signal
+    import socket
+    import socketserver
+    import time
+
+    class Handler(socketserver.BaseRequestHandler):
+        def handle(self):
+            buffer = bytearray()
+            message, fds = recv_message(self.request, buffer, max_fds=3)
+            if message is None:
+                return
+            op = message.get("op")
+
+            if op == "status":
+                send_message(self.request, self.server.status())
+                return
+            if op == "stop":
+                send_message(self.request, {"status": "stopping", "pid": os.getppid()})
+                os.kill(os.getppid(), signal.SIGTERM)
+                return
+            if op != "run" or len(fds) != 3 or (message.get("root"), message.get("version")) != (PACKAGE_DIR, __version__):
+                for fd in fds:
+                    os.close(fd)
+                send_message(self.request, {"status": "mismatch", "root": PACKAGE_DIR, "version": __version__})
+                return
+
+            send_message(self.request, {"status": "accepted", "pid": os.getpid()})
+            code = _run_command(message, fds)
+            try:
+                send_message(self.request, {"status": "exit", "code": code})
+            except OSError:
+                pass  # Client gone (killed at its timeout)
+
+    class Server(socketserver.ForkingMixIn, socketserver.UnixStreamServer):
+        def __init__(self):
+            super().__init__(str(path), Handler, bind_and_activate=False)
+            self.started = time.time()
+            self.last_request = time.monotonic()
+            self.requests = 0
+
+        def server_bind(self):
+            # Owner-only socket; the directory may be shared
+            umask = os.umask(0o177)
+            try:
+                super().server_bind()
+            finally:
+                os.umask(umask)
+
+        def verify_request(self, request, client_address):
+            if hasattr(socket, "SO_PEERCRED"):
+                import struct
+                creds = request.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+                _, uid, _ = struct.unpack("3i", creds)
+                return uid == os.getuid()
+            return True
+
+        def process_request(self, request, client_address):
+            self.requests += 1
+            self.last_request = time.monotonic()
+            super().process_request(request, client_address)
+
+        def status(self) -> dict:
+            return {
+                "status": "running",
+                "pid": os.getppid(),
+                "root": PACKAGE_DIR,
+                "version": __version__,
+                "uptime_s": round(time.time() - self.started),
+                "requests": self.requests,
+                "python": sys.version.split()[0],
+            }
+
+        def idle_seconds(self) -> float:
+            return time.monotonic() - self.last_request
+
+    return Server()
+
+
+def preload():
+    """Import everything a request may need, so forked children start warm."""
+    import importlib
+    from .cli import COMMANDS, HOOKS
+
+    modules = [module for module, *_ in (*HOOKS.values(), *COMMANDS.values()) if module != "daemon"]
+    for name in [f"{__package__}.{module}" for module in dict.fromkeys(modules)] + list(PRELOAD):
+        try:
+            importlib.import_module(name)
+        except Exception as e:
+            print(f"[context-keeper] daemon: cannot preload {name}: {e}", file=sys.stderr)
+
+
+def serve(path: Path = None) -> int:
+    """Run the server in the foreground until stopped or idle."""
+    import signal
+
+    path = path or get_socket_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if request("status") is not None:
+        print(f"[context-keeper] daemon already running on {path}", file=sys.stderr)
+        return 1
+    try:
+        path.unlink()  # Stale socket of a server that did not shut down
+    except FileNotFoundError:
+        pass
+
+    preload()
+    server = make_server(path)
+    try:
+        server.server_bind()
+        server.server_activate()
+    except OSError as e:
+        print(f"[context-keeper] daemon: cannot listen on {path}: {e}", file=sys.stderr)
+        server.server_close()
+        return 1
+
+    def _stop(signum, frame):
+        raise SystemExit(0)
+
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGHUP, _stop)
+
+    idle_limit = float(os.environ.get("CONTEXT_KEEPER_DAEMON_IDLE", DEFAULT_IDLE_SECONDS))
+    server.timeout = 1.0
+    print(f"[context-keeper] daemon {os.getpid()} serving {PACKAGE_DIR} on {path}", file=sys.stderr)
+    try:
+        while True:
+            server.handle_request()
+            if idle_limit and server.idle_seconds() > idle_limit and not server.active_children:
+                print("[context-keeper] daemon idle, exiting", file=sys.stderr)
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        try:
+            if path.is_socket():
+                path.unlink()
+        except OSError:
+            pass
+    return 0
+
+
+def start() -> int:
+    """Start the server in the background and wait until it answers."""
+    import subprocess
+    import time
+
+    status = request("status")
+    if status is not None:
+        print(f"Daemon already running (pid {status['pid']})")
+        return 0
+
+    path = get_socket_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path.parent / LOG_FILE, "ab") as log:
+        process = subprocess.Popen(
+            [sys.executable, PACKAGE_DIR, "daemon", "run"],
+            stdin=subprocess.DEVNULL, stdout=log, stderr=log,
+            start_new_session=True,
+        )
+
+    deadline = time.monotonic() + START_TIMEOUT_SECONDS
+    while time.monotonic() < deadline:
+        status = request("status")
+        if status is not None:
+            print(f"Daemon started (pid {status['pid']}) on {path}")
+            return 0
+        if process.poll() is not None:
+            break
+        time.sleep(0.05)
+
+    print(f"Daemon did not start; see {path.parent / LOG_FILE}", file=sys.stderr)
+    return 1
+
+
+def stop() -> int:
+    import time
+
+    reply = request("stop")
+    if reply is None:
+        print("Daemon not running")
+        return 0
+    deadline = time.monotonic() + START_TIMEOUT_SECONDS
+    while time.monotonic() < deadline and get_socket_path().exists():
+        time.sleep(0.05)
+    print(f"Daemon stopped (pid {reply['pid']})")
+    return 0
+
+
+def show_status() -> int:
+    status = request("status")
+    if status is None:
+        print(f"Daemon not running ({get_socket_path()})")
+        return 1
+    print(f"Daemon running (pid {status['pid']}, Python {status['python']})")
+    print(f"  Socket:   {get_socket_path()}")
+    print(f"  Plugin:   {status['root']} (v{status['version']})")
+    print(f"  Uptime:   {status['uptime_s']}s")
+    print(f"  Requests: {status['requests']}")
+    if (status["root"], status["version"]) != (PACKAGE_DIR, __version__):
+        print("  Serves a different plugin version; hooks run in-process until it is restarted")
+    return 0
+
+
+def main():
+    actions = {"start": start, "stop": stop, "status": show_status, "run": serve}
+    action = sys.argv[1] if len(sys.argv) > 1 else "status"
+    if action not in actions:
+        print(f"usage: context_keeper daemon {{{'|'.join(actions)}}}", file=sys.stderr)
+        sys.exit(2)
+    sys.exit(actions[action]())
+
+
+if __name__ == "__main__":
+    main()
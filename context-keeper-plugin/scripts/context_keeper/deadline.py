@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Deadline: The time budget of one PreCompact run, shared by its stages.
+
+Claude Code kills the PreCompact hook after its timeout (120 s in
+plugin.json). save_memory.main() creates one Deadline when the hook starts
+and passes it to every stage. A stage asks for its budget - the time left
+minus what the stages after it need (RESERVE_SECONDS) - and switches to a
+cheaper strategy when that is not enough, so the hook always writes a
+memory before it is killed:
+
+  stage     when its budget runs out
+  parse     decodes only the newest lines that fit (transcript_cache.decode_budget)
+  llm       routes to the fast model (model_router), does not retry, stops a
+            stream that runs past the budget, and skips the call when less
+            than one call is left; the extractive summary is saved instead
+  nowledge  the push is queued in the outbox and sent by the next run
+
+Every switch is logged and listed under "fallbacks" in the hook's metrics
+record (hook_trace), e.g. "llm: skipped, 9s left".
+
+Environment variables:
+  CONTEXT_KEEPER_DEADLINE - seconds of the budget (default 90, below the hook timeout)
+"""
+
+import logging
+import time
+
+from . import hook_trace
+from .memory_store import get_setting
+
+# ============================================================================
+# Configuration
+# ============================================================================
+
+DEFAULT_SECONDS = 90.0
+
+# Seconds a stage leaves for the stages after it
+RESERVE_SECONDS = {
+    "parse": 30.0,    # Extraction, one LLM call and the save
+    "llm": 5.0,       # The extractive summary and the save
+    "nowledge": 1.0,  # The save
+}
+
+
+def deadline_seconds() -> float:
+    value = get_setting("CONTEXT_KEEPER_DEADLINE", "") or ""
+    try:
+        seconds = float(value)
+    except ValueError:
+        return DEFAULT_SECONDS
+    return seconds if seconds > 0 else DEFAULT_SECONDS
+
+
+class DeadlineExceeded(Exception):
+    """A stage ran out of its budget."""
+
+
+# ============================================================================
+# Deadline
+# ============================================================================
+
+class Deadline:
+    """Seconds from a start time (monotonic clock) and the fallbacks taken so far."""
+
+    __slots__ = ("started", "seconds", "fallbacks")
+
+    def __init__(self, seconds: float = None, started: float = None):
+        self.seconds = deadline_seconds() if seconds is None else seconds
+        self.started = time.monotonic() if started is None else started
+        self.fallbacks = []
+
+    def __repr__(self):
+        return f"Deadline({self.remaining():.1f}s of {self.seconds:.0f}s left)"
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def remaining(self) -> float:
+        return max(0.0, self.seconds - self.elapsed())
+
+    def budget(self, stage: str) -> float:
+        """Seconds `stage` may use: the time left minus the reserve of the stages after it."""
+        return max(0.0, self.remaining() - RESERVE_SECONDS.get(stage, 0.0))
+
+    def expired(self, stage: str) -> bool:
+        return self.budget(stage) <= 0
+
+    def fallback(self, stage: str, strategy: str):
+        """Record that `stage` switched to a cheaper strategy."""
+        note = f"{stage}: {strategy}"
+        self.fallbacks.append(note)
+        logging.warning(f"[context-keeper] Deadline ({self.remaining():.0f}s left), {note}")
+        hook_trace.annotate(fallbacks=list(self.fallbacks))
@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+"""
+Extractive Summary: Local fallback memory when the LLM is unavailable.
+
+When generate_memory_with_llm() returns nothing (no API key, API errors,
+no rate-limit capacity, deadline missed), save_memory.generate_memory()
+builds the memory here instead of saving none. summarize_extractive()
+ranks the sentences of the extracted conversation with TextRank and files
+the best ones under the sections the LLM prompt asks for:
+
+  - sentences are split from the newest MAX_SENTENCES of the user and
+    assistant messages (code blocks dropped) and compared by the cosine of
+    their TF-IDF vectors;
+  - the ranking is a personalized PageRank over that similarity graph; the
+    teleport vector favours recent sentences and sentences that name a
+    modified file or a file a tool call touched;
+  - "Code Changes" lists files_modified with the edit tools used on them,
+    "Tags" the top keywords, and the other sections take the best-ranked
+    sentences matching their keywords.
+
+NumPy computes the similarity matrix and power iteration when installed;
+otherwise an inverted index and sparse rows do the same in pure Python.
+
+Memories built here carry "summary_source": "extractive" so they can be
+told apart (and re-summarized later) from LLM memories. In rolling mode
+the new bullets are merged in front of the previous memory's, and the
+bullets of pre-summarized chunks (presummarizer.py) in between.
+
+Environment variables:
+  CONTEXT_KEEPER_EXTRACTIVE_FALLBACK - 1 (default) to save an extractive memory when the LLM fails, 0 to save none
+"""
+
+import heapq
+import math
+import os
+import re
+
+from .memory_store import get_setting
+
+# ============================================================================
+# Configuration
+# ============================================================================
+
+SUMMARY_SOURCE = "extractive"
+
+SECTIONS = (
+    "Topics Discussed", "Architecture Changes", "UI/UX Changes", "Specification Changes",
+    "Code Changes", "Decisions Made", "Key Outcomes", "Context for Continuation", "Tags",
+)
+EMPTY_SECTION = "- None identified"
+
+MAX_SENTENCES = 400
+MIN_SENTENCE_WORDS = 4
+MAX_SENTENCE_CHARS = 240
+MAX_BULLETS = 5
+MAX_FILES = 15
+MAX_TAGS = 6
+# Bullets kept per section when merged with the previous memory
+MAX_MERGED_BULLETS = 12
+NOWLEDGE_MAX_CHARS = 1750
+
+# TextRank: damping and power iterations (stopping once the ranks move less
+# than TOLERANCE); each sentence links to its MAX_NEIGHBOURS most similar
+# ones, and terms in more than MAX_DF_SHARE of the sentences are ignored
+DAMPING = 0.85
+ITERATIONS = 50
+TOLERANCE = 1e-6
+MAX_NEIGHBOURS = 20
+MAX_DF_SHARE = 0.5
+# Teleport weights on top of 1: recency (newest sentence) and per seed file named
+SEED_WEIGHT = 2.0
+RECENCY_WEIGHT = 1.0
+
+# Keywords that file a ranked sentence under a section (first match wins)
+SECTION_KEYWORDS = (
+    ("Decisions Made", r"decid|decision|instead of|chose|choose|trade-?off|prefer|going with|we'll use|rather than"),
+    ("Architecture Changes", r"architect|design|refactor|module|structure|pattern|middleware|layer|abstraction|dependenc"),
+    ("UI/UX Changes", r"\bui\b|\bux\b|component|button|layout|style|css|screen|modal|page|frontend|render"),
+    ("Specification Changes", r"requirement|spec\b|specification|validat|business rule|contract|schema|endpoint"),
+    ("Context for Continuation", r"\bnext\b|todo|remaining|still need|pending|follow-?up|not yet|later"),
+    ("Key Outcomes", r"fixed|implemented|added|works|passing|passes|resolved|completed|created|done|now "),
+)
+
+STOPWORDS = frozenset("""
+a about above after again all also am an and any are as at be because been before being below between both but
+by can could did do does doing done down during each few for from further had has have having he her here hers
+how i if in into is it its itself just let me more most my no nor not now of off on once only or other our out
+over own same she should so some such than that the their them then there these they this those through to too
+under until up very was we were what when where which while who whom why will with would you your yours
+ok okay please thanks yes sure let's i'll we'll it's that's there's don't can't
+""".split())
+
+_CODE_BLOCK_RE = re.compile(r"```.*?(?:```|$)", re.DOTALL)
+_SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+|\n+")
+_BULLET_RE = re.compile(r"^\s*(?:[-*+>#]+|\d+[.)])\s*")
+_TERM_RE = re.compile(r"[a-z][a-z0-9_]{2,}")
+_SECTION_RE = re.compile(r"^## (.+?)\s*$", re.MULTILINE)
+
+
+def fallback_enabled() -> bool:
+    value = get_setting("CONTEXT_KEEPER_EXTRACTIVE_FALLBACK", "1") or "1"
+    return value.strip().lower() not in ("0", "false", "no", "off")
+
+
+# ============================================================================
+# Sentences
+# ============================================================================
+
+class Sentence:
+    """A candidate bullet; recency runs from 0 (oldest) to 1 (newest) within its role."""
+
+    __slots__ = ("text", "role", "terms", "recency", "seeds")
+
+    def __init__(self, text: str, role: str, terms: list[str]):
+        self.text = text
+        self.role = role
+        self.terms = terms
+        self.recency = 0.0
+        self.seeds = 0
+
+
+def _role_sentences(messages, role: str, limit: int) -> list[Sentence]:
+    """The newest `limit` sentences of one role's messages, oldest first."""
+    sentences = []
+    for text in reversed(messages or []):
+        if not isinstance(text, str):
+            continue
+        for raw in reversed(_SENTENCE_SPLIT_RE.split(_CODE_BLOCK_RE.sub(" ", text))):
+            sentence = _BULLET_RE.sub("", raw).strip()
+            if len(sentence.split()) < MIN_SENTENCE_WORDS:
+                continue
+            terms = [t for t in _TERM_RE.findall(sentence.lower()) if t not in STOPWORDS]
+            if terms:
+                sentences.append(Sentence(sentence[:MAX_SENTENCE_CHARS], role, terms))
+        if len(sentences) >= limit:
+            break
+    sentences = sentences[:limit][::-1]
+    for position, sentence in enumerate(sentences):
+        sentence.recency = (position + 1) / len(sentences)
+    return sentences
+
+
+def split_sentences(content: dict) -> list[Sentence]:
+    """Sentences of the newest messages: up to half user requests, the rest assistant text."""
+    user = _role_sentences(content.get("user_messages"), "user", MAX_SENTENCES // 2)
+    return user + _role_sentences(content.get("assistant_messages"), "assistant", MAX_SENTENCES - len(user))
+
+
+def seed_terms(content: dict) -> set[str]:
+    """Names of modified files and of the files tool calls touched (basename and stem)."""
+    paths = list(content.get("files_modified") or [])
+    for call in content.get("tool_calls") or []:
+        tool_input = getattr(call, "input", None)
+        if isinstance(tool_input, dict):
+            for key in ("file_path", "notebook_path", "path"):
+                if isinstance(tool_input.get(key), str):
+                    paths.append(tool_input[key])
+    seeds = set()
+    for path in paths:
+        name = os.path.basename(path).lower()
+        if name:
+            seeds.add(name)
+            stem = os.path.splitext(name)[0]
+            if len(stem) >= 3:
+                seeds.add(stem)
+    return seeds
+
+
+# ============================================================================
+# TextRank
+# ============================================================================
+
+def _tfidf(sentences: list[Sentence]) -> tuple[list[dict], dict]:
+    """Unit-length TF-IDF vectors ({term: weight}) and the IDF of the kept terms."""
+    df = {}
+    for sentence in sentences:
+        for term in set(sentence.terms):
+            df[term] = df.get(term, 0) + 1
+    n = len(sentences)
+    idf = {term: math.log(n / count) + 1.0 for term, count in df.items() if count <= max(1, MAX_DF_SHARE * n)}
+
+    vectors = []
+    for sentence in sentences:
+        vector = {}
+        for term in sentence.terms:
+            if term in idf:
+                vector[term] = vector.get(term, 0.0) + idf[term]
+        norm = math.sqrt(sum(w * w for w in vector.values())) or 1.0
+        vectors.append({term: w / norm for term, w in vector.items()})
+    return vectors, idf
+
+
+def _teleport(sentences: list[Sentence]) -> list[float]:
+    weights = [1.0 + RECENCY_WEIGHT * s.recency + SEED_WEIGHT * s.seeds for s in sentences]
+    total = sum(weights)
+    return [w / total for w in weights]
+
+
+def _rank_numpy(np, vectors: list[dict], idf: dict, teleport: list[float]) -> list[float]:
+    columns = {term: i for i, term in enumerate(idf)}
+    matrix = np.zeros((len(vectors), max(1, len(columns))))
+    for row, vector in enumerate(vectors):
+        for term, weight in vector.items():
+            matrix[row, columns[term]] = weight
+    similarity = matrix @ matrix.T
+    np.fill_diagonal(similarity, 0.0)
+    if len(vectors) > MAX_NEIGHBOURS:
+        kth = np.partition(similarity, -MAX_NEIGHBOURS, axis=1)[:, -MAX_NEIGHBOURS][:, None]
+        similarity = np.where(similarity >= kth, similarity, 0.0)
+    out_weight = similarity.sum(axis=1)
+    transition = np.divide(similarity, out_weight[:, None], out=np.zeros_like(similarity), where=out_weight[:, None] > 0)
+    dangling = out_weight == 0
+
+    p = np.asarray(teleport)
+    rank = p.copy()
+    for _ in range(ITERATIONS):
+        previous = rank
+        rank = (1 - DAMPING) * p + DAMPING * (transition.T @ rank + rank[dangling].sum() * p)
+        if np.abs(rank - previous).sum() < TOLERANCE:
+            break
+    return rank.tolist()
+
+
+def _rank_python(vectors: list[dict], idf: dict, teleport: list[float]) -> list[float]:
+    # Sparse similarity rows from an inverted index: only pairs sharing a term
+    postings = {}
+    for row, vector in enumerate(vectors):
+        for term, weight in vector.items():
+            postings.setdefault(term, []).append((row, weight))
+    similarity = [{} for _ in vectors]
+    for entries in postings.values():
+        for a in range(len(entries)):
+            row_a, weight_a = entries[a]
+            sim_a = similarity[row_a]
+            for row_b, weight_b in entries[a + 1:]:
+                product = weight_a * weight_b
+                sim_a[row_b] = sim_a.get(row_b, 0.0) + product
+                similarity[row_b][row_a] = similarity[row_b].get(row_a, 0.0) + product
+
+    # Row-normalized transitions to the MAX_NEIGHBOURS most similar sentences
+    transitions = []
+    for neighbours in similarity:
+        if len(neighbours) > MAX_NEIGHBOURS:
+            kth = heapq.nlargest(MAX_NEIGHBOURS, neighbours.values())[-1]
+            neighbours = {other: weight for other, weight in neighbours.items() if weight >= kth}
+        total = sum(neighbours.values())
+        transitions.append([(other, weight / total) for other, weight in neighbours.items()] if total else None)
+
+    rank = list(teleport)
+    for _ in range(ITERATIONS):
+        dangling = sum(r for r, row in zip(rank, transitions) if row is None)
+        incoming = [0.0] * len(rank)
+        for r, row in zip(rank, transitions):
+            if row is not None:
+                for other, weight in row:
+                    incoming[other] += r * weight
+        previous = rank
+        rank = [(1 - DAMPING) * p + DAMPING * (x + dangling * p) for p, x in zip(teleport, incoming)]
+        if sum(abs(a - b) for a, b in zip(rank, previous)) < TOLERANCE:
+            break
+    return rank
+
+
+def rank_sentences(sentences: list[Sentence]) -> tuple[list[float], list[dict]]:
+    """TextRank score per sentence (NumPy if installed), and the TF-IDF vectors."""
+    vectors, idf = _tfidf(sentences)
+    teleport = _teleport(sentences)
+    try:
+        import numpy as np
+    except ImportError:
+        return _rank_python(vectors, idf, teleport), vectors
+    return _rank_numpy(np, vectors, idf, teleport), vectors
+
+
+# ============================================================================
+# Memory Layout
+# ============================================================================
+
+def _code_changes(content: dict) -> list[str]:
+    tools = {}
+    for call in content.get("tool_calls") or []:
+        tool_input = getattr(call, "input", None)
+        if isinstance(tool_input, dict):
+            path = tool_input.get("file_path") or tool_input.get("notebook_path")
+            if isinstance(path, str) and path:
+                counts = tools.setdefault(os.path.basename(path), {})
+                counts[call.tool] = counts.get(call.tool, 0) + 1
+    bullets = []
+    for path in sorted(content.get("files_modified") or [])[:MAX_FILES]:
+        counts = tools.get(os.path.basename(path), {})
+        used = ", ".join(f"{tool} x{count}" for tool, count in sorted(counts.items()))
+        bullets.append(f"- `{path}`" + (f" ({used})" if used else ""))
+    return bullets
+
+
+def _tags(ranked: list[tuple[float, Sentence, dict]]) -> list[str]:
+    weights = {}
+    for score, _, vector in ranked:
+        for term, weight in vector.items():
+            weights[term] = weights.get(term, 0.0) + score * weight
+    top = sorted(weights, key=weights.get, reverse=True)[:MAX_TAGS]
+    return [f"- {' '.join('#' + term for term in top)}"] if top else []
+
+
+def build_sections(content: dict) -> dict[str, list[str]]:
+    """Bullets per section (see SECTIONS) from the ranked sentences."""
+    sentences = split_sentences(content)
+    seeds = seed_terms(content)
+    for sentence in sentences:
+        lowered = sentence.text.lower()
+        sentence.seeds = sum(1 for seed in seeds if seed in lowered)
+
+    sections = {name: [] for name in SECTIONS}
+    sections["Code Changes"] = _code_changes(content)
+    if not sentences:
+        return sections
+
+    scores, vectors = rank_sentences(sentences)
+    ranked = sorted(zip(scores, sentences, vectors), key=lambda item: item[0], reverse=True)
+    patterns = [(name, re.compile(pattern, re.IGNORECASE)) for name, pattern in SECTION_KEYWORDS]
+
+    used = set()
+    code_sentences = 0
+    for _, sentence, _ in ranked:
+        key = sentence.text.lower()
+        if key in used:
+            continue
+        if sentence.role == "user" and len(sections["Topics Discussed"]) < MAX_BULLETS:
+            target = "Topics Discussed"
+        else:
+            target = next((
+                name for name, pattern in patterns
+                if len(sections[name]) < MAX_BULLETS and pattern.search(sentence.text)
+            ), None)
+            # Otherwise sentences naming a changed file describe the code change
+            if target is None and sentence.seeds and code_sentences < MAX_BULLETS:
+                target = "Code Changes"
+                code_sentences += 1
+        if target:
+            sections[target].append(f"- {sentence.text}")
+            used.add(key)
+    sections["Tags"] = _tags(ranked[:MAX_BULLETS * len(SECTIONS)])
+    return sections
+
+
+def _previous_sections(previous_memory: str) -> dict[str, list[str]]:
+    sections = {}
+    matches = list(_SECTION_RE.finditer(previous_memory or ""))
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(previous_memory)
+        lines = [line for line in previous_memory[match.end():end].strip().splitlines() if line.strip()]
+        sections[match.group(1)] = [line for line in lines if line.strip() != EMPTY_SECTION]
+    return sections
+
+
+def render(sections: dict[str, list[str]]) -> str:
+    return "\n\n".join(f"## {name}\n" + "\n".join(sections.get(name) or [EMPTY_SECTION]) for name in SECTIONS)
+
+
+def summarize_extractive(content: dict, previous_memory: str = None) -> dict:
+    """
+    Memory in the LLM's layout built from the ranked sentences of content.
+
+    Returns {"nowledge_summary", "full_memory", "summary_source"} like
+    generate_memory_with_llm() (plus the source).
+    """
+    sections = build_sections(content)
+    # Pre-summarized chunks of the delta (newest first), then the previous memory
+    for earlier in [*reversed(content.get("chunk_summaries") or []), previous_memory]:
+        if not earlier:
+            continue
+        previous = _previous_sections(earlier)
+        for name in SECTIONS:
+            if name == "Tags":
+                continue
+            merged = list(sections[name])
+            merged.extend(line for line in previous.get(name, []) if line not in merged)
+            sections[name] = merged[:MAX_MERGED_BULLETS]
+
+    full_memory = render(sections)
+    summary = "Extractive summary (LLM unavailable).\n\n" + "\n\n".join(
+        f"## {name}\n" + "\n".join(sections[name] or [EMPTY_SECTION])
+        for name in ("Topics Discussed", "Key Outcomes", "Decisions Made", "Context for Continuation")
+    )
+    if len(summary) > NOWLEDGE_MAX_CHARS:
+        summary = summary[:NOWLEDGE_MAX_CHARS].rsplit("\n", 1)[0]
+    return {"nowledge_summary": summary, "full_memory": full_memory, "summary_source": SUMMARY_SOURCE}
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Hook Stats Script: Summarize the per-stage hook metrics written by hook_trace.
+
+Reads metrics.jsonl (and its rotated generations) from the context-keeper
+state directory and prints duration percentiles per hook stage and per
+project, plus run counts by status.
+
+Usage:
+  python3 hook_stats.py [--hook save_memory] [--project NAME] [--since 7d] [--format markdown|json]
+"""
+
+import argparse
+import json
+import math
+import sys
+from pathlib import Path
+
+from .hook_trace import METRICS_BACKUPS, get_metrics_path
+from .memory_store import entry_time, parse_since
+
+
+def iter_runs(metrics_path: Path):
+    """Yield run records, oldest generation first. Malformed lines are skipped."""
+    paths = [metrics_path.with_name(f"{metrics_path.name}.{g}") for g in range(METRICS_BACKUPS, 0, -1)]
+    paths.append(metrics_path)
+    for path in paths:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        run = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if isinstance(run, dict):
+                        yield run
+        except FileNotFoundError:
+            continue
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile: the smallest value with at least pct of the values at or below it."""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[max(0, math.ceil(len(ordered) * pct) - 1)]
+
+
+def summarize(values: list[float]) -> dict:
+    return {
+        "count": len(values),
+        "p50_ms": round(percentile(values, 0.50), 2),
+        "p90_ms": round(percentile(values, 0.90), 2),
+        "p99_ms": round(percentile(values, 0.99), 2),
+        "max_ms": round(max(values), 2) if values else 0.0,
+    }
+
+
+def collect(runs, hook: str = None, project: str = None, since: float = None) -> dict:
+    """Aggregate runs into per-stage and per-project statistics."""
+    stages = {}    # (hook, stage) -> {"ms": [], "bytes": [], "rss": []}
+    projects = {}  # (project, hook) -> {"ms": [], "failed": 0}
+    statuses = {}
+
+    for run in runs:
+        if hook and run.get("hook") != hook:
+            continue
+        if project and project not in str(run.get("project", "")):
+            continue
+        if since is not None and entry_time({"created_at": run.get("ts", "")}) < since:
+            continue
+
+        run_hook = run.get("hook", "unknown")
+        status = run.get("status", "unknown")
+        statuses[status] = statuses.get(status, 0) + 1
+
+        for stage in run.get("stages", []):
+            bucket = stages.setdefault((run_hook, stage.get("name", "?")), {"ms": [], "bytes": [], "rss": []})
+            bucket["ms"].append(stage.get("ms", 0.0))
+            bucket["bytes"].append(stage.get("bytes_read", 0))
+            bucket["rss"].append(stage.get("rss_hwm_kb", 0))
+        total = stages.setdefault((run_hook, "total"), {"ms": [], "bytes": [], "rss": []})
+        total["ms"].append(run.get("total_ms", 0.0))
+        total["rss"].append(run.get("rss_hwm_kb", 0))
+
+        per_project = projects.setdefault((run.get("project", "unknown"), run_hook), {"ms": [], "failed": 0})
+        per_project["ms"].append(run.get("total_ms", 0.0))
+        if status != "ok":
+            per_project["failed"] += 1
+
+    return {
+        "stages": [
+            {
+                "hook": h, "stage": name, **summarize(bucket["ms"]),
+                "max_bytes_read": max(bucket["bytes"], default=0),
+                "max_rss_mb": round(max(bucket["rss"], default=0) / 1024, 1),
+            }
+            for (h, name), bucket in stages.items()
+        ],
+        "projects": [
+            {"project": p, "hook": h, **summarize(bucket["ms"]), "failed": bucket["failed"]}
+            for (p, h), bucket in sorted(projects.items())
+        ],
+        "statuses": statuses,
+    }
+
+
+def format_bytes(value: int) -> str:
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if value < 1024 or unit == "GiB":
+            return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+        value /= 1024
+    return str(value)
+
+
+def print_markdown(stats: dict):
+    print("## Hook Stage Timings\n")
+    print("| Hook | Stage | Runs | p50 ms | p90 ms | p99 ms | max ms | Max Read | Peak RSS MiB |")
+    print("|------|-------|------|--------|--------|--------|--------|----------|--------------|")
+    for row in stats["stages"]:
+        print(
+            f"| {row['hook']} | {row['stage']} | {row['count']} | {row['p50_ms']:.1f} | {row['p90_ms']:.1f} "
+            f"| {row['p99_ms']:.1f} | {row['max_ms']:.1f} | {format_bytes(row['max_bytes_read'])} | {row['max_rss_mb']} |"
+        )
+
+    print("\n## By Project\n")
+    print("| Project | Hook | Runs | p50 ms | p99 ms | Failed |")
+    print("|---------|------|------|--------|--------|--------|")
+    for row in stats["projects"]:
+        print(
+            f"| {Path(row['project']).name or row['project']} | {row['hook']} | {row['count']} "
+            f"| {row['p50_ms']:.1f} | {row['p99_ms']:.1f} | {row['failed']} |"
+        )
+
+    statuses = ", ".join(f"{status}: {count}" for status, count in sorted(stats["statuses"].items()))
+    print(f"\n**Runs by status:** {statuses}")
+
+
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Summarize context-keeper hook metrics")
+    parser.add_argument("--hook", choices=["save_memory", "load_memory", "save_thread"], help="Only this hook")
+    parser.add_argument("--project", help="Only projects whose path contains this text")
+    parser.add_argument("--since", help="Only runs newer than this (e.g. 7d, 12h, 2025-11-24)")
+    parser.add_argument("--format", choices=["markdown", "json"], default="markdown")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    try:
+        since = parse_since(args.since) if args.since else None
+    except ValueError as e:
+        print(f"[context-keeper] Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    metrics_path = get_metrics_path()
+    stats = collect(iter_runs(metrics_path), args.hook, args.project, since)
+
+    if not stats["statuses"]:
+        print(f"No hook metrics recorded yet ({metrics_path}).")
+        return
+
+    # Slowest stages first
+    stats["stages"].sort(key=lambda row: (row["hook"], -row["p50_ms"]))
+    if args.format == "json":
+        print(json.dumps(stats, indent=2))
+    else:
+        print_markdown(stats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Hook Trace: Per-stage timing and resource metrics for the context-keeper hooks.
+
+save_memory.py, load_memory.py and save_thread.py wrap their run in
+`with hook_trace.run("save_memory"):` and each stage in
+`with hook_trace.stage("parse") as s:`. A stage records its duration, the
+bytes it read and records it decoded (set by the caller on `s`), and the
+process RSS high-water mark when it ended. When the run ends (including via
+sys.exit) one JSON line is appended to the metrics file:
+
+  {"ts": ..., "hook": "save_memory", "project": ..., "session_id": ...,
+   "status": "ok" | "exit:<code>" | "error:<type>", "total_ms": ...,
+   "rss_hwm_kb": ..., "stages": [{"name", "ms", "bytes_read", "records", "rss_hwm_kb", "error"?}],
+   "interrupted_in": [...]?}
+
+A stage that raised (including the SystemExit raised on SIGTERM, which
+Claude Code sends when a hook exceeds its timeout) carries "error";
+stages started with begin() but never ended are listed in "interrupted_in".
+
+The file ($CONTEXT_KEEPER_HOME/metrics.jsonl, default
+~/.claude/context-keeper/metrics.jsonl) is rotated at METRICS_MAX_BYTES,
+keeping METRICS_BACKUPS old generations. hook_stats.py summarizes it.
+Set CONTEXT_KEEPER_METRICS=0 to disable.
+
+Imported on the SessionStart fast path, so it only uses the standard
+library modules the hooks already load.
+"""
+
+import os
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# ============================================================================
+# Configuration
+# ============================================================================
+
+METRICS_FILE = "metrics.jsonl"
+METRICS_MAX_BYTES = 5 * 1024 * 1024
+METRICS_BACKUPS = 3
+
+
+def metrics_enabled() -> bool:
+    # Like every other switch, settings.json "env" counts too
+    from .memory_store import get_setting
+    value = get_setting("CONTEXT_KEEPER_METRICS", "1") or "1"
+    return value.strip().lower() not in ("0", "false", "no", "off")
+
+
+def get_metrics_path() -> Path:
+    # The same state directory as every other reader (hook_stats runs outside
+    # hooks, where settings.json "env" values are not in the environment)
+    from .memory_store import get_state_dir
+    return get_state_dir() / METRICS_FILE
+
+
+def rss_hwm_kb() -> int:
+    """Peak RSS of this process in KiB (0 where unavailable)."""
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux KiB
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+# ============================================================================
+# Trace Records
+# ============================================================================
+
+class Stage:
+    """One timed stage; callers fill bytes_read and records."""
+
+    __slots__ = ("name", "started", "ms", "bytes_read", "records", "rss_hwm_kb", "error")
+
+    def __init__(self, name: str):
+        self.name = name
+        if _current is not None:
+            _current.open_stages.append(name)
+        self.started = time.perf_counter()
+        self.ms = 0.0
+        self.bytes_read = 0
+        self.records = 0
+        self.rss_hwm_kb = 0
+        self.error = None
+
+    def end(self):
+        """Close the stage and attach it to the active run."""
+        self.ms = (time.perf_counter() - self.started) * 1000
+        self.rss_hwm_kb = rss_hwm_kb()
+        if _current is not None:
+            _current.stages.append(self)
+            if self.name in _current.open_stages:
+                _current.open_stages.remove(self.name)
+
+    def as_dict(self) -> dict:
+        record = {
+            "name": self.name,
+            "ms": round(self.ms, 2),
+            "bytes_read": self.bytes_read,
+            "records": self.records,
+            "rss_hwm_kb": self.rss_hwm_kb,
+        }
+        if self.error:
+            record["error"] = self.error
+        return record
+
+
+class Trace:
+    """Stages and context of one hook run."""
+
+    def __init__(self, hook: str):
+        self.hook = hook
+        self.started = time.perf_counter()
+        self.fields = {}
+        self.stages = []
+        self.open_stages = []
+
+    def annotate(self, **fields):
+        self.fields.update({k: v for k, v in fields.items() if v is not None})
+
+    def record(self, status: str) -> dict:
+        record = {
+            "ts": datetime.now().astimezone().isoformat(),
+            "hook": self.hook,
+            **self.fields,
+            "status": status,
+            "total_ms": round((time.perf_counter() - self.started) * 1000, 2),
+            "rss_hwm_kb": rss_hwm_kb(),
+            "stages": [s.as_dict() for s in self.stages],
+        }
+        if self.open_stages:
+            # Stages still running when the run ended (e.g. killed on timeout)
+            record["interrupted_in"] = list(self.open_stages)
+        return record
+
+
+_current = None
+
+
+def current() -> Trace | None:
+    return _current
+
+
+def annotate(**fields):
+    """Attach context (project, session_id, trigger, ...) to the active run."""
+    if _current is not None:
+        _current.annotate(**fields)
+
+
+def begin(name: str) -> Stage:
+    """Start a stage that is closed explicitly with Stage.end()."""
+    return Stage(name)
+
+
+@contextmanager
+def stage(name: str):
+    """Time a stage of the active run (only recorded when a run is active)."""
+    record = Stage(name)
+    try:
+        yield record
+    except BaseException as e:
+        # Includes SystemExit raised by SIGTERM when the hook timed out
+        record.error = type(e).__name__
+        raise
+    finally:
+        record.end()
+
+
+# ============================================================================
+# Runs
+# ============================================================================
+
+def append_metrics(line: str, path: Path = None):
+    """Append one JSONL line to metrics.jsonl, rotating it when it grows too large."""
+    append_rotating(path or get_metrics_path(), line, METRICS_MAX_BYTES, METRICS_BACKUPS)
+
+
+def append_rotating(path: Path, line: str, max_bytes: int, backups: int):
+    """
+    Append one JSONL line to path; once it reaches max_bytes it becomes
+    path.1 (path.1 becomes path.2, ...) and the oldest of `backups` is dropped.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        if path.stat().st_size >= max_bytes:
+            for generation in range(backups, 0, -1):
+                older = path.with_name(f"{path.name}.{generation}")
+                newer = path.with_name(f"{path.name}.{generation - 1}") if generation > 1 else path
+                if newer.exists():
+                    os.replace(newer, older)
+    except FileNotFoundError:
+        pass
+
+    # Single O_APPEND write so concurrent hooks never interleave lines
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+    try:
+        os.write(fd, line.encode("utf-8"))
+    finally:
+        os.close(fd)
+
+
+def _exit_on_sigterm(signum, frame):
+    # Claude Code terminates hooks that exceed their timeout; exit normally
+    # so the metrics line (with the interrupted stage) is still written
+    raise SystemExit(128 + signum)
+
+
+@contextmanager
+def run(hook: str):
+    """Trace a whole hook run; writes the metrics line on exit, including sys.exit and SIGTERM."""
+    global _current
+    trace = Trace(hook)
+    previous, _current = _current, trace
+    status = "ok"
+    try:
+        import signal
+        signal.signal(signal.SIGTERM, _exit_on_sigterm)
+    except (ImportError, ValueError, OSError):
+        pass  # Not the main thread / unsupported platform
+    try:
+        yield trace
+    except SystemExit as e:
+        code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        status = "ok" if code == 0 else f"exit:{code}"
+        raise
+    except BaseException as e:
+        status = f"error:{type(e).__name__}"
+        raise
+    finally:
+        _current = previous
+        if metrics_enabled():
+            try:
+                import json
+                append_metrics(json.dumps(trace.record(status), ensure_ascii=False, separators=(",", ":")) + "\n")
+            except (OSError, TypeError, ValueError):
+                pass  # Metrics must never break a hook
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+List Context Script: List all saved contexts, optionally filtered by session ID.
+
+Rows are streamed newest first from the ordered index (index.ndjson) and
+paged with --limit/--cursor, so large stores never produce one huge table.
+
+Usage:
+  python3 list_memories.py [session-id] [--limit N] [--cursor C] [--since 7d] [--trigger auto] [--format ndjson]
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from .memory_store import (
+    ensure_ordered_index,
+    entry_time,
+    format_timestamp,
+    iter_ordered_index,
+    load_session_aggregates,
+    parse_since,
+    resolve_stored_path,
+)
+from .paths import get_memories_dir
+
+INDEX_FIELDS = ("session_id", "timestamp", "created_at", "trigger", "message_count", "memory_path")
+DEFAULT_LIMIT = 50
+
+
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="List saved context memories")
+    parser.add_argument("session", nargs="?", help="Session ID (prefix) to show details for")
+    parser.add_argument("--limit", type=int, default=DEFAULT_LIMIT, help=f"Rows per page (default {DEFAULT_LIMIT}, 0 = all)")
+    parser.add_argument("--cursor", help="Resume after the last row of a previous page")
+    parser.add_argument("--since", help="Only memories newer than this (e.g. 7d, 12h, 2025-11-24)")
+    parser.add_argument("--trigger", help="Only memories with this trigger (auto, manual)")
+    parser.add_argument("--format", choices=["markdown", "ndjson"], default="markdown", help="Output format")
+    return parser.parse_args()
+
+
+def iter_memories(memories_dir: Path, session_filter: str = None, cursor: str = None,
+                  since: float = None, trigger: str = None):
+    """Yield (entry, cursor) pairs newest first that match the filters."""
+    for entry, entry_cursor in iter_ordered_index(memories_dir, cursor):
+        # Entries are in save order, which is not strictly creation order
+        # (resumed and backfilled saves), so an older one does not end the scan
+        if since is not None and entry_time(entry) < since:
+            continue
+        if session_filter and not entry.get("session_id", "").startswith(session_filter):
+            continue
+        if trigger and entry.get("trigger") != trigger:
+            continue
+        yield {field: entry[field] for field in INDEX_FIELDS if field in entry}, entry_cursor
+
+
+def paginate(rows, limit: int):
+    """
+    Yield up to `limit` rows, then the cursor to resume from (None if done).
+
+    The final item is always ("cursor", value); rows are ("row", entry).
+    """
+    last_cursor = None
+    count = 0
+    for entry, entry_cursor in rows:
+        if limit and count >= limit:
+            yield "cursor", last_cursor
+            return
+        yield "row", entry
+        last_cursor = entry_cursor
+        count += 1
+    yield "cursor", None
+
+
+def print_ndjson(pages):
+    """Stream rows as compact JSON lines, followed by the next cursor if any."""
+    for kind, value in pages:
+        if kind == "row":
+            print(json.dumps(value, ensure_ascii=False, separators=(',', ':')), flush=True)
+        elif value:
+            print(json.dumps({"next_cursor": value}), flush=True)
+
+
+def print_next_page_hint(next_cursor: str):
+    if next_cursor:
+        print(f"\nMore contexts available: rerun with `--cursor {next_cursor}`")
+
+
+def list_all_contexts(pages, memories_dir: Path) -> int:
+    """List contexts in a table, streaming rows as they are read. Returns the row count."""
+    count = 0
+    next_cursor = None
+    for kind, value in pages:
+        if kind == "cursor":
+            next_cursor = value
+            break
+        if count == 0:
+            print("## All Saved Contexts\n")
+            print("| # | Session ID | Timestamp | Trigger | Messages |")
+            print("|---|------------|-----------|---------|----------|")
+        count += 1
+        sid = value.get("session_id", "unknown")
+        short_sid = f"{sid[:8]}..." if len(sid) > 8 else sid
+        ts = format_timestamp(value.get("created_at", ""))
+        trigger = value.get("trigger", "-")
+        msgs = value.get("message_count", 0)
+        print(f"| {count} | {short_sid} | {ts} | {trigger} | {msgs} |", flush=True)
+
+    if count == 0:
+        return 0
+
+    # Totals come from the per-session aggregates, not from reading every entry
+    sessions = load_session_aggregates(memories_dir)
+    total = sum(agg.get("compaction_count", 0) for agg in sessions.values())
+    print(f"\nShowing {count} of {total} context memories across {len(sessions)} sessions")
+    print_next_page_hint(next_cursor)
+    print("\nUse `/context-keeper:load-context <session-id>` to load a specific context.")
+    print("Use `/context-keeper:list-context <session-id>` to see details for one session.")
+    return count
+
+
+def list_session_contexts(pages, session_filter: str, memories_dir: Path = None) -> int:
+    """List detailed contexts for a specific session. Returns the row count."""
+    count = 0
+    next_cursor = None
+    for kind, s in pages:
+        if kind == "cursor":
+            next_cursor = s
+            break
+        if count == 0:
+            full_sid = s.get("session_id", session_filter)
+            print(f"## Context History for Session {full_sid[:16]}...\n")
+        count += 1
+        ts = format_timestamp(s.get("created_at", ""))
+        memory_path = s.get('memory_path', '-')
+        if memories_dir and s.get('memory_path'):
+            # Show the stored file (memory.json, memory.json.gz or memory.json.zst)
+            stored = resolve_stored_path(memories_dir / memory_path)
+            if stored:
+                memory_path = str(stored.relative_to(memories_dir))
+        print(f"### Compaction {count}: {ts}")
+        print(f"- **Trigger:** {s.get('trigger', '-')}")
+        print(f"- **Messages:** {s.get('message_count', 0)}")
+        print(f"- **Summary Path:** {memory_path}")
+        print(flush=True)
+
+    if count == 0:
+        return 0
+
+    print_next_page_hint(next_cursor)
+    print("Would you like me to load one of these contexts?")
+    return count
+
+
+def main():
+    args = parse_arguments()
+    memories_dir = get_memories_dir()
+
+    if not ensure_ordered_index(memories_dir):
+        print("No context memories found. Run `/compact` to create your first memory.")
+        return
+
+    try:
+        since = parse_since(args.since) if args.since else None
+        rows = iter_memories(memories_dir, args.session, args.cursor, since, args.trigger)
+        pages = paginate(rows, max(args.limit, 0))
+
+        if args.format == "ndjson":
+            print_ndjson(pages)
+            return
+
+        if args.session:
+            count = list_session_contexts(pages, args.session, memories_dir)
+        else:
+            count = list_all_contexts(pages, memories_dir)
+    except ValueError as e:
+        print(f"[context-keeper] Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if count == 0:
+        if args.session:
+            print(f"No contexts found for session '{args.session}'.")
+        else:
+            print("No context memories found. Run `/compact` to create your first memory.")
+
+
+if __name__ == "__main__":
+    main()
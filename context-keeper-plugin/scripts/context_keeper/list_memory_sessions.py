@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+List Sessions Script: Efficiently list all stored sessions.
+
+Session rows come from the per-session aggregates (sessions.json) maintained
+at save time, so no individual memory entry is read. Rows are streamed and
+paged with --limit/--cursor.
+
+Usage:
+  python3 list_memory_sessions.py [--limit N] [--cursor C] [--since 7d] [--trigger auto] [--format ndjson]
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from .memory_store import (
+    ensure_ordered_index,
+    format_timestamp,
+    load_session_aggregates,
+    parse_since,
+)
+from .paths import get_memories_dir
+
+DEFAULT_LIMIT = 50
+
+
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="List stored context-keeper sessions")
+    parser.add_argument("--limit", type=int, default=DEFAULT_LIMIT, help=f"Rows per page (default {DEFAULT_LIMIT}, 0 = all)")
+    parser.add_argument("--cursor", help="Resume after the last row of a previous page")
+    parser.add_argument("--since", help="Only sessions active since (e.g. 7d, 12h, 2025-11-24)")
+    parser.add_argument("--trigger", help="Only sessions with at least one compaction of this trigger")
+    parser.add_argument("--format", choices=["markdown", "ndjson"], default="markdown", help="Output format")
+    return parser.parse_args()
+
+
+def session_cursor(sid: str, data: dict) -> str:
+    """Cursor for a session row: its sort key."""
+    return f"{data.get('latest_time', 0.0)!r}|{sid}"
+
+
+def iter_sessions(sessions: dict, cursor: str = None, since: float = None, trigger: str = None):
+    """Yield (session_id, aggregate) pairs, most recently active first."""
+    ordered = sorted(
+        sessions.items(),
+        key=lambda x: (x[1].get("latest_time", 0.0), x[0]),
+        reverse=True
+    )
+
+    after = None
+    if cursor:
+        latest_time, sep, sid = cursor.partition("|")
+        try:
+            after = (float(latest_time), sid)
+        except ValueError:
+            sep = ""
+        if not sep:
+            raise ValueError(f"Invalid cursor: {cursor!r}")
+
+    for sid, data in ordered:
+        key = (data.get("latest_time", 0.0), sid)
+        if after is not None and key >= after:
+            continue
+        if since is not None and key[0] < since:
+            return
+        if trigger and not data.get("triggers", {}).get(trigger):
+            continue
+        yield sid, data
+
+
+def main():
+    args = parse_arguments()
+    memories_dir = get_memories_dir()
+
+    if not ensure_ordered_index(memories_dir):
+        print("No sessions found. Context memories are created automatically when you run `/compact`.")
+        return
+
+    sessions = load_session_aggregates(memories_dir)
+
+    if not sessions:
+        print("No sessions recorded yet. Your first context will be saved on the next compaction.")
+        return
+
+    try:
+        since = parse_since(args.since) if args.since else None
+        rows = iter_sessions(sessions, args.cursor, since, args.trigger)
+
+        count = 0
+        next_cursor = None
+        last_cursor = None
+        for sid, data in rows:
+            if args.limit > 0 and count >= args.limit:
+                next_cursor = last_cursor
+                break
+            count += 1
+            last_cursor = session_cursor(sid, data)
+
+            if args.format == "ndjson":
+                row = {"session_id": sid, **{k: v for k, v in data.items() if k != "latest_time"}}
+                print(json.dumps(row, ensure_ascii=False, separators=(',', ':')), flush=True)
+                continue
+
+            if count == 1:
+                print("## Stored Sessions\n")
+                print("| # | Session ID | Compactions | Latest Activity | Project | Messages |")
+                print("|---|------------|-------------|-----------------|---------|----------|")
+            short_sid = f"{sid[:8]}..." if len(sid) > 8 else sid
+            project = Path(data["project"]).name if data.get("project") else "-"
+            latest = format_timestamp(data.get("latest_created", ""))
+            print(f"| {count} | {short_sid} | {data['compaction_count']} | {latest} | {project} | {data['total_messages']} |", flush=True)
+    except ValueError as e:
+        print(f"[context-keeper] Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.format == "ndjson":
+        if next_cursor:
+            print(json.dumps({"next_cursor": next_cursor}))
+        return
+
+    if count == 0:
+        print("No sessions match the given filters.")
+        return
+
+    total_memories = sum(data.get("compaction_count", 0) for data in sessions.values())
+    print(f"\n**Total:** {len(sessions)} sessions with {total_memories} context memories")
+    if next_cursor:
+        print(f"\nMore sessions available: rerun with `--cursor '{next_cursor}'`")
+    print("\n### Quick Actions")
+    print("- Use `/context-keeper:list-context <session-id>` to see all contexts for a session")
+    print("- Use `/context-keeper:load-context <session-id>` to load the latest context from a session")
+
+
+if __name__ == "__main__":
+    main()
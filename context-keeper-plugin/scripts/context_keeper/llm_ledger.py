@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+LLM Ledger: Token usage, latency and estimated spend of memory summarization.
+
+generate_memory_with_llm() records every summarization call (successful or
+not) as one JSON line in ~/.claude/context-keeper/llm_ledger.jsonl:
+
+  {"ts", "project", "session_id", "status", "model", "input_tokens",
+   "output_tokens", "cache_read_input_tokens", "cache_creation_input_tokens",
+   "ttft_ms", "latency_ms", "retries", "rate_wait_ms", "stop_reason", "estimated_cost_usd",
+   "tokens_saved"}
+
+`tokens_saved` is the estimate of prompt tokens the noise filter
+(noise_filter.py) removed before the call.
+
+The ledger is rotated like metrics.jsonl: at LEDGER_MAX_BYTES it moves to
+llm_ledger.jsonl.1 and LEDGER_BACKUPS older generations are kept, which
+the report reads too.
+
+The same usage block is stored in the memory's metadata.json ("llm_usage").
+Costs are estimates from PRICES (USD per million tokens), matched by model
+name; unknown models are reported without a cost.
+
+Usage:
+  python3 llm_ledger.py [--by day|project|model] [--since 30d] [--format markdown|json]
+"""
+
+import argparse
+import json
+import statistics
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from .hook_trace import append_rotating
+from .memory_store import entry_time, get_state_dir, parse_since
+
+LEDGER_FILE = "llm_ledger.jsonl"
+LEDGER_MAX_BYTES = 5 * 1024 * 1024
+LEDGER_BACKUPS = 3
+
+# (model name fragment, input, output, cache read, cache write) in USD per million tokens.
+# First match wins, so more specific fragments come first.
+PRICES = (
+    ("claude-3-haiku", 0.25, 1.25, 0.03, 0.30),
+    ("claude-3-5-haiku", 0.80, 4.00, 0.08, 1.00),
+    ("haiku-4", 1.00, 5.00, 0.10, 1.25),
+    ("opus-4-5", 5.00, 25.00, 0.50, 6.25),
+    ("opus", 15.00, 75.00, 1.50, 18.75),
+    ("sonnet", 3.00, 15.00, 0.30, 3.75),
+)
+
+
+def get_ledger_path() -> Path:
+    return get_state_dir() / LEDGER_FILE
+
+
+def estimate_cost(model: str, usage: dict):
+    """Estimated USD cost of one call, or None for models without a known price."""
+    for fragment, input_price, output_price, cache_read_price, cache_write_price in PRICES:
+        if fragment in (model or ""):
+            return round((
+                usage.get("input_tokens", 0) * input_price
+                + usage.get("output_tokens", 0) * output_price
+                + usage.get("cache_read_input_tokens", 0) * cache_read_price
+                + usage.get("cache_creation_input_tokens", 0) * cache_write_price
+            ) / 1_000_000, 6)
+    return None
+
+
+def usage_from_response(response) -> dict:
+    """Token counts and stop_reason of an Anthropic Message (missing fields are 0/None)."""
+    usage = getattr(response, "usage", None)
+    return {
+        "input_tokens": getattr(usage, "input_tokens", 0) or 0,
+        "output_tokens": getattr(usage, "output_tokens", 0) or 0,
+        "cache_read_input_tokens": getattr(usage, "cache_read_input_tokens", 0) or 0,
+        "cache_creation_input_tokens": getattr(usage, "cache_creation_input_tokens", 0) or 0,
+        "stop_reason": getattr(response, "stop_reason", None),
+    }
+
+
+def record_call(entry: dict, path: Path = None):
+    """Append one call to the ledger (single O_APPEND write, rotated when too large)."""
+    line = json.dumps(
+        {"ts": datetime.now().astimezone().isoformat(), **entry}, ensure_ascii=False, separators=(",", ":")
+    ) + "\n"
+    append_rotating(path or get_ledger_path(), line, LEDGER_MAX_BYTES, LEDGER_BACKUPS)
+
+
+def iter_ledger(path: Path = None):
+    """Yield ledger entries, oldest generation first; malformed lines are skipped."""
+    path = path or get_ledger_path()
+    paths = [path.with_name(f"{path.name}.{g}") for g in range(LEDGER_BACKUPS, 0, -1)] + [path]
+    for generation in paths:
+        try:
+            with open(generation, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if isinstance(entry, dict):
+                        yield entry
+        except FileNotFoundError:
+            continue
+
+
+# ============================================================================
+# Report
+# ============================================================================
+
+def group_key(entry: dict, by: str) -> str:
+    if by == "day":
+        return entry.get("ts", "")[:10] or "unknown"
+    if by == "project":
+        return entry.get("project") or "unknown"
+    return entry.get("model") or "unknown"
+
+
+def aggregate(entries, by: str, since: float = None) -> list[dict]:
+    groups = {}
+    for entry in entries:
+        if since is not None and entry_time({"created_at": entry.get("ts", "")}) < since:
+            continue
+        group = groups.setdefault(group_key(entry, by), {
+            "calls": 0, "errors": 0, "retries": 0, "input_tokens": 0, "output_tokens": 0,
+            "cached_tokens": 0, "saved_tokens": 0, "latency": [], "ttft": [], "cost": 0.0, "unpriced": 0,
+        })
+        group["calls"] += 1
+        group["retries"] += entry.get("retries", 0)
+        if entry.get("status") != "ok":
+            group["errors"] += 1
+        group["input_tokens"] += entry.get("input_tokens", 0)
+        group["output_tokens"] += entry.get("output_tokens", 0)
+        group["cached_tokens"] += entry.get("cache_read_input_tokens", 0)
+        group["saved_tokens"] += entry.get("tokens_saved", 0)
+        if entry.get("latency_ms") is not None:
+            group["latency"].append(entry["latency_ms"])
+        if entry.get("ttft_ms") is not None:
+            group["ttft"].append(entry["ttft_ms"])
+        cost = entry.get("estimated_cost_usd")
+        if cost is None and entry.get("status") == "ok":
+            group["unpriced"] += 1
+        group["cost"] += cost or 0.0
+
+    rows = []
+    for key, group in sorted(groups.items(), reverse=(by == "day")):
+        rows.append({
+            by: key,
+            "calls": group["calls"],
+            "errors": group["errors"],
+            "retries": group["retries"],
+            "input_tokens": group["input_tokens"],
+            "output_tokens": group["output_tokens"],
+            "cached_tokens": group["cached_tokens"],
+            "tokens_saved": group["saved_tokens"],
+            "p50_latency_ms": round(statistics.median(group["latency"]), 1) if group["latency"] else None,
+            "p50_ttft_ms": round(statistics.median(group["ttft"]), 1) if group["ttft"] else None,
+            "estimated_cost_usd": round(group["cost"], 4),
+            "unpriced_calls": group["unpriced"],
+        })
+    return rows
+
+
+def print_markdown(rows: list[dict], by: str):
+    def ms(value):
+        if value is None:
+            return "-"
+        return f"{value:.0f}ms" if value < 1000 else f"{value / 1000:.1f}s"
+
+    print(f"## LLM Usage by {by.title()}\n")
+    print(f"| {by.title()} | Calls | Errors | Retries | Input | Output | Cached | Filtered | p50 Latency | p50 TTFT | Est. Spend |")
+    print("|------|-------|--------|---------|-------|--------|--------|----------|-------------|----------|------------|")
+    for row in rows:
+        label = Path(row[by]).name if by == "project" else row[by]
+        spend = f"${row['estimated_cost_usd']:.4f}" + ("*" if row["unpriced_calls"] else "")
+        print(
+            f"| {label} | {row['calls']} | {row['errors']} | {row['retries']} | {row['input_tokens']:,} "
+            f"| {row['output_tokens']:,} | {row['cached_tokens']:,} | {row['tokens_saved']:,} | {ms(row['p50_latency_ms'])} "
+            f"| {ms(row['p50_ttft_ms'])} | {spend} |"
+        )
+
+    total = sum(row["estimated_cost_usd"] for row in rows)
+    print(f"\n**Total estimated spend:** ${total:.4f} across {sum(row['calls'] for row in rows)} calls")
+    if any(row["unpriced_calls"] for row in rows):
+        print("\n\\* includes calls to models without a known price (not counted)")
+
+
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Report context-keeper LLM usage and estimated spend")
+    parser.add_argument("--by", choices=["day", "project", "model"], default="day")
+    parser.add_argument("--since", help="Only calls newer than this (e.g. 30d, 12h, 2025-11-01)")
+    parser.add_argument("--format", choices=["markdown", "json"], default="markdown")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    try:
+        since = parse_since(args.since) if args.since else None
+    except ValueError as e:
+        print(f"[context-keeper] Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    rows = aggregate(iter_ledger(), args.by, since)
+    if not rows:
+        print("No LLM calls recorded yet. Usage is recorded on the next compaction.")
+        return
+
+    if args.format == "json":
+        print(json.dumps(rows, indent=2))
+    else:
+        print_markdown(rows, args.by)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+Load Memory Script: Load session memories either automatically or manually.
+
+This script can operate in two modes:
+1. Automatic mode: When triggered by SessionStart hook, loads recent context automatically
+2. Manual mode: When invoked by user with optional session ID/timestamp, displays memory for user approval
+
+Usage:
+- Automatic: Script reads JSON from stdin (hook mode)
+- Manual: python3 load_memory.py [session-id-or-timestamp]
+
+Output:
+- Automatic mode: Outputs formatted context to stdout (injected into Claude)
+- Manual mode: Displays memory content and asks for user confirmation
+"""
+
+import sys
+import json
+from datetime import datetime
+
+# memory_store is imported lazily: the SessionStart fast path only needs the
+# pre-rendered payload from session_context.
+from . import hook_trace
+from .paths import get_memories_dir
+from .session_context import compose_memory, fill_session_start, format_context, is_expired, read_session_start
+
+
+
+
+def load_latest_memory(project_path: str, session_id: str = None) -> tuple[str, dict]:
+    """
+    Load the most recent memory for context injection.
+
+    Returns:
+        tuple: (memory_content, metadata) or (None, None) if not found
+    """
+    from .memory_store import load_memory_content, read_index_head, read_json, stored_exists
+
+    memories_dir = get_memories_dir(project_path)
+
+    if not memories_dir.exists():
+        return None, None
+
+    # Try to load from specific session if provided
+    if session_id:
+        session_dir = memories_dir / session_id
+        if session_dir.exists():
+            latest_link = session_dir / "latest"
+            if latest_link.exists():
+                # Resolve symlink
+                if latest_link.is_symlink():
+                    target = session_dir / latest_link.resolve().name
+                else:
+                    target = latest_link
+
+                memory_path = target / "memory.json" if target.is_dir() else None
+                metadata_path = target / "metadata.json" if target.is_dir() else None
+
+                if memory_path and stored_exists(memory_path):
+                    try:
+                        memory = load_memory_content(memory_path)
+                    except (OSError, ValueError) as e:
+                        print(f"[context-keeper] Error: Failed to read {memory_path}: {e}", file=sys.stderr)
+                        memory = ""
+                    metadata = {}
+                    if metadata_path and stored_exists(metadata_path):
+                        try:
+                            metadata = read_json(metadata_path)
+                        except (OSError, ValueError):
+                            pass
+                    return memory, metadata
+
+    # Fallback: Load from index (most recent across all sessions)
+    index_path = memories_dir / "index.json"
+    if not index_path.exists():
+        return None, None
+
+    # Only the first entry is decoded; the rest of the index is never read
+    try:
+        head = read_index_head(index_path, 1)
+    except (ValueError, OSError) as e:
+        print(f"[context-keeper] Error: Failed to load from index: {e}", file=sys.stderr)
+        return None, None
+    if not head:
+        return None, None
+    latest = head[0]
+
+    try:
+        memory_path = memories_dir / latest["memory_path"]
+        if stored_exists(memory_path):
+            # Read memory (plain or compressed JSON, or old .md files)
+            memory = load_memory_content(memory_path)
+            return memory, latest
+    except (KeyError, TypeError) as e:
+        print(f"[context-keeper] Error: Invalid index entry: {e}", file=sys.stderr)
+    except (OSError, ValueError) as e:
+        print(f"[context-keeper] Error: Failed to read memory: {e}", file=sys.stderr)
+
+    return None, None
+
+
+def find_memory_by_identifier(identifier: str) -> tuple[str, dict]:
+    """Find a memory by session_id or timestamp prefix."""
+    from .memory_store import iter_index_entries, load_memory_content, stored_exists
+
+    memories_dir = get_memories_dir()
+    index_path = memories_dir / "index.json"
+
+    if not index_path.exists():
+        return None, None
+
+    # Entries are decoded lazily; stop at the first match
+    try:
+        for entry in iter_index_entries(index_path):
+            if not isinstance(entry, dict):
+                continue
+            if entry.get("session_id", "").startswith(identifier) or entry.get("timestamp", "").startswith(identifier):
+                memory_path = memories_dir / entry.get("memory_path", "")
+                if stored_exists(memory_path):
+                    return load_memory_content(memory_path), entry
+    except (OSError, ValueError):
+        pass
+
+    return None, None
+
+
+def automatic_mode():
+    """Run in automatic mode (triggered by SessionStart hook)."""
+    # Print visible banner to stderr
+    print("\n" + "=" * 60, file=sys.stderr)
+    print("🔄 [context-keeper] Session Start Hook Running...", file=sys.stderr)
+    print("=" * 60, file=sys.stderr)
+
+    try:
+        # Read input from Claude Code
+        hook_input = json.loads(sys.stdin.read())
+
+        # Extract session information (all available fields)
+        session_id = hook_input.get("session_id", "")
+        permission_mode = hook_input.get("permission_mode", "default")
+        source = hook_input.get("source", "unknown")  # startup, resume, clear, compact
+        cwd = hook_input.get("cwd", "")
+
+        print(f"📋 [context-keeper] Source: {source}, Permission: {permission_mode}", file=sys.stderr)
+        hook_trace.annotate(project=cwd or None, session_id=session_id or None, source=source)
+
+        # Only inject context on resume (after compaction) or compact
+        # Skip if this is a clear event (user explicitly cleared)
+        if source == "clear":
+            print("ℹ️  [context-keeper] Skipping context injection (clear event)", file=sys.stderr)
+            print("=" * 60 + "\n", file=sys.stderr)
+            sys.exit(0)
+
+        # Skip on fresh startup - only load context on resume/compact
+        if source == "startup":
+            print("ℹ️  [context-keeper] Skipping context injection (fresh startup)", file=sys.stderr)
+            print("=" * 60 + "\n", file=sys.stderr)
+            sys.exit(0)
+
+        if not cwd:
+            print("ℹ️  [context-keeper] Skipping context injection (no cwd)", file=sys.stderr)
+            print("=" * 60 + "\n", file=sys.stderr)
+            sys.exit(0)
+
+        # Fast path: payload pre-rendered by save_memory.py (no JSON work)
+        with hook_trace.stage("payload") as stage:
+            template, expiry = read_session_start(get_memories_dir(cwd), session_id)
+            stage.bytes_read = len(template or "")
+            stage.records = int(template is not None)
+        if template is not None:
+            if is_expired(expiry):
+                print("ℹ️  [context-keeper] Context is older than 24h, skipping", file=sys.stderr)
+                print("=" * 60 + "\n", file=sys.stderr)
+                sys.exit(0)
+
+            print(fill_session_start(template, source, permission_mode))
+            print("✅ [context-keeper] Previous session context loaded successfully!", file=sys.stderr)
+            print("=" * 60 + "\n", file=sys.stderr)
+            sys.exit(0)
+
+        # Load latest memory
+        print("📂 [context-keeper] Searching for previous session context...", file=sys.stderr)
+        with hook_trace.stage("load") as stage:
+            memory, metadata = load_latest_memory(cwd, session_id)
+            stage.bytes_read = len(memory or "")
+            stage.records = int(bool(memory))
+
+        if not memory:
+            # No memory available - this is fine, just exit cleanly
+            print("ℹ️  [context-keeper] No previous session context found", file=sys.stderr)
+            print("=" * 60 + "\n", file=sys.stderr)
+            sys.exit(0)
+
+        print(f"📄 [context-keeper] Found context for session {session_id[:8] if session_id else 'unknown'}...", file=sys.stderr)
+
+        # Check if this memory is recent enough to be relevant
+        # Skip if the memory is from a very old session (>24 hours)
+        try:
+            created_at = metadata.get('timestamp', metadata.get('created_at', ''))
+            if created_at:
+                # Parse ISO format
+                memory_time = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
+                now = datetime.now(memory_time.tzinfo) if memory_time.tzinfo else datetime.now()
+                age_hours = (now - memory_time.replace(tzinfo=None)).total_seconds() / 3600
+
+                if age_hours > 24:
+                    # Summary is old, skip injection but don't error
+                    print(f"ℹ️  [context-keeper] Context is {age_hours:.1f}h old, skipping (>24h)", file=sys.stderr)
+                    print("=" * 60 + "\n", file=sys.stderr)
+                    sys.exit(0)
+        except (ValueError, TypeError):
+            # Can't parse date, continue anyway
+            pass
+
+        # Compose with earlier compactions of the session within the token budget
+        # (a rolled memory already folds them in)
+        with hook_trace.stage("compose") as stage:
+            from .memory_store import context_token_budget, load_earlier_memories
+            memory_session = metadata.get('session_id')
+            memory_timestamp = metadata.get('memory_timestamp') or metadata.get('timestamp', '')
+            earlier = []
+            if memory_session and memory_timestamp and not metadata.get('rolled_from'):
+                earlier = load_earlier_memories(get_memories_dir(cwd) / memory_session, memory_timestamp)
+            memory = compose_memory(memory, earlier, context_token_budget())
+            stage.bytes_read = sum(len(text) for _, text in earlier)
+            stage.records = len(earlier)
+
+        # Format and output context
+        print("📥 [context-keeper] Loading context into session...", file=sys.stderr)
+        context = format_context(memory, metadata or {}, source, permission_mode)
+        print(context)
+
+        # Print visible completion message
+        print("✅ [context-keeper] Previous session context loaded successfully!", file=sys.stderr)
+        print("=" * 60 + "\n", file=sys.stderr)
+
+        sys.exit(0)
+
+    except Exception as e:
+        print(f"❌ [context-keeper] Error: {e}", file=sys.stderr)
+        print("=" * 60 + "\n", file=sys.stderr)
+        sys.exit(1)
+
+
+def manual_mode(identifier=None):
+    """Run in manual mode (user-invoked command)."""
+    from .memory_store import format_timestamp
+
+    memories_dir = get_memories_dir()
+    index_path = memories_dir / "index.json"
+
+    if not memories_dir.exists() or not index_path.exists():
+        print("No context memories found. Run `/compact` to create your first memory.")
+        return
+
+    memory_content = None
+    entry = None
+
+    if identifier:
+        # Find specific memory
+        memory_content, entry = find_memory_by_identifier(identifier)
+        if not memory_content:
+            print(f"No context found for '{identifier}'.")
+            print("\nAvailable contexts:")
+            from .memory_store import read_index_head
+
+            try:
+                for s in read_index_head(index_path, 5):
+                    sid = s.get("session_id", "unknown")[:8]
+                    ts = format_timestamp(s.get("created_at", ""), seconds=True)
+                    print(f"  - [{sid}...] {ts}")
+            except (ValueError, OSError):
+                pass
+            return
+    else:
+        # Load latest memory
+        memory_content, entry = load_latest_memory(str(memories_dir.parent))
+        if not memory_content:
+            print("No context memories found.")
+            return
+
+    # Display the context
+    print("## Context Memory Loaded\n")
+    print(f"**Session ID:** {entry.get('session_id', 'unknown')}")
+    print(f"**Created:** {format_timestamp(entry.get('created_at', ''), seconds=True)}")
+    print(f"**Trigger:** {entry.get('trigger', '-')}")
+    print(f"**Messages:** {entry.get('message_count', 0)}")
+    print()
+    print("---")
+    print()
+    print(memory_content)
+    print()
+    print("---")
+    print("Would you like me to use this context for our conversation?")
+
+
+def run_hook():
+    """SessionStart hook entry point."""
+    with hook_trace.run("load_memory"):
+        automatic_mode()
+
+
+def main():
+    # Determine mode: if stdin has data, it's automatic mode; otherwise manual
+    import select
+
+    # Check if stdin has data (automatic mode)
+    if select.select([sys.stdin], [], [], 0.0)[0]:
+        # stdin has data - automatic hook mode
+        run_hook()
+    else:
+        # No stdin data - manual command mode
+        identifier = sys.argv[1] if len(sys.argv) > 1 else None
+        manual_mode(identifier)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
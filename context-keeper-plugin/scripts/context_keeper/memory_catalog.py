@@ -0,0 +1,451 @@
+#!/usr/bin/env python3
+"""
+Memory Catalog: User-level catalog of memories across all projects.
+
+Memories live in each project's own .claude/memories directory. The catalog
+(~/.claude/context-keeper/catalog.db, SQLite) records every memory so
+questions like "what did I do across all repos this week" are answered
+without visiting each project.
+
+- save_memory.py registers every new memory as it is saved.
+- `scan` backfills existing project stores. Directory mtimes are cached so
+  unchanged directories are not listed again and unchanged sessions are
+  not re-read. Memories, sessions and projects removed from disk are
+  dropped from the catalog (and its full-text index).
+- `list` and `search` query the catalog only.
+
+Usage:
+  python3 memory_catalog.py scan [--root DIR ...] [--max-depth N]
+  python3 memory_catalog.py list [--since 7d] [--project NAME] [--limit N] [--format ndjson]
+  python3 memory_catalog.py search QUERY [--since 7d] [--limit N] [--format ndjson]
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+from .memory_store import (
+    OBJECTS_DIR,
+    entry_time,
+    format_timestamp,
+    get_state_dir,
+    load_memory_content,
+    make_index_entry,
+    parse_since,
+    read_json,
+    stored_exists,
+)
+
+# ============================================================================
+# Configuration
+# ============================================================================
+
+CATALOG_FILE = "catalog.db"
+SUMMARY_CHARS = 2000
+DEFAULT_MAX_DEPTH = 4
+DEFAULT_LIMIT = 50
+
+# Directory names never worth descending into when looking for projects
+PRUNED_DIRS = {
+    "node_modules", "__pycache__", "venv", ".venv", "site-packages", "dist", "build",
+    "target", "vendor", "Library", "AppData", ".cache", ".git",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS memories (
+    id INTEGER PRIMARY KEY,
+    project TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    created_at TEXT,
+    created_time REAL,
+    trigger TEXT,
+    message_count INTEGER,
+    topics TEXT,
+    files_modified TEXT,
+    memory_path TEXT,
+    summary TEXT,
+    UNIQUE (project, session_id, timestamp)
+);
+CREATE INDEX IF NOT EXISTS memories_created ON memories (created_time DESC);
+CREATE TABLE IF NOT EXISTS scan_dirs (
+    path TEXT PRIMARY KEY,
+    mtime REAL NOT NULL,
+    subdirs TEXT NOT NULL
+);
+"""
+
+
+# ============================================================================
+# Catalog Access
+# ============================================================================
+
+def get_catalog_path() -> Path:
+    return get_state_dir() / CATALOG_FILE
+
+
+def open_catalog(path: Path = None) -> sqlite3.Connection:
+    """Open (and create if needed) the catalog database."""
+    conn = sqlite3.connect(str(path or get_catalog_path()), timeout=5)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    try:
+        conn.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS memories_fts "
+            "USING fts5(summary, topics, files_modified, project)"
+        )
+    except sqlite3.OperationalError:
+        # SQLite built without FTS5: search falls back to LIKE
+        pass
+    return conn
+
+
+def has_fts(conn: sqlite3.Connection) -> bool:
+    row = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'memories_fts'").fetchone()
+    return row is not None
+
+
+def upsert_memory(conn: sqlite3.Connection, project: str, entry: dict, metadata: dict, summary: str):
+    """Insert or refresh one memory row (and its full-text entry)."""
+    topics = " ".join(f"#{t}" for t in metadata.get("topics", []) if isinstance(t, str))
+    files = "\n".join(f for f in metadata.get("files_modified", []) if isinstance(f, str))
+    summary = (summary or "")[:SUMMARY_CHARS]
+
+    conn.execute(
+        """
+        INSERT INTO memories (project, session_id, timestamp, created_at, created_time, trigger,
+                              message_count, topics, files_modified, memory_path, summary)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (project, session_id, timestamp) DO UPDATE SET
+            created_at = excluded.created_at, created_time = excluded.created_time,
+            trigger = excluded.trigger, message_count = excluded.message_count,
+            topics = excluded.topics, files_modified = excluded.files_modified,
+            memory_path = excluded.memory_path, summary = excluded.summary
+        """,
+        (
+            project, entry["session_id"], entry["timestamp"], entry.get("created_at", ""),
+            entry_time(entry), entry.get("trigger", ""), entry.get("message_count", 0),
+            topics, files, entry.get("memory_path", ""), summary,
+        ),
+    )
+    if has_fts(conn):
+        rowid = conn.execute(
+            "SELECT id FROM memories WHERE project = ? AND session_id = ? AND timestamp = ?",
+            (project, entry["session_id"], entry["timestamp"]),
+        ).fetchone()[0]
+        conn.execute("DELETE FROM memories_fts WHERE rowid = ?", (rowid,))
+        conn.execute(
+            "INSERT INTO memories_fts (rowid, summary, topics, files_modified, project) VALUES (?, ?, ?, ?, ?)",
+            (rowid, summary, topics, files, project),
+        )
+
+
+def forget_memories(conn: sqlite3.Connection, where: str, params: tuple) -> int:
+    """Delete the memories matching where (and their full-text rows); returns how many."""
+    if has_fts(conn):
+        conn.execute(f"DELETE FROM memories_fts WHERE rowid IN (SELECT id FROM memories WHERE {where})", params)
+    return conn.execute(f"DELETE FROM memories WHERE {where}", params).rowcount
+
+
+def register_memory(project_path: str, session_id: str, timestamp: str, metadata: dict, summary: str):
+    """Record a freshly saved memory in the global catalog (called by save_memory)."""
+    conn = open_catalog()
+    try:
+        with conn:
+            entry = make_index_entry(session_id, timestamp, metadata)
+            upsert_memory(conn, str(Path(project_path).resolve()), entry, metadata, summary)
+    finally:
+        conn.close()
+
+
+# ============================================================================
+# Incremental Scanner
+# ============================================================================
+
+def _cached_subdirs(conn: sqlite3.Connection, path: str, mtime: float):
+    row = conn.execute("SELECT mtime, subdirs FROM scan_dirs WHERE path = ?", (path,)).fetchone()
+    if row and row["mtime"] == mtime:
+        return json.loads(row["subdirs"])
+    return None
+
+
+def _remember_subdirs(conn: sqlite3.Connection, path: str, mtime: float, subdirs: list):
+    conn.execute(
+        "INSERT OR REPLACE INTO scan_dirs (path, mtime, subdirs) VALUES (?, ?, ?)",
+        (path, mtime, json.dumps(subdirs)),
+    )
+
+
+def list_subdirs(conn: sqlite3.Connection, path: str, stats: dict, keep=None) -> list:
+    """
+    Child directory names of path, reusing the cached listing if the
+    directory's mtime is unchanged (adding/removing entries bumps it).
+    """
+    try:
+        mtime = os.stat(path).st_mtime
+    except OSError:
+        return []
+
+    cached = _cached_subdirs(conn, path, mtime)
+    if cached is not None:
+        stats["dirs_unchanged"] += 1
+        return cached
+
+    subdirs = []
+    try:
+        with os.scandir(path) as it:
+            for child in it:
+                try:
+                    if child.is_dir(follow_symlinks=False) and (keep is None or keep(child.name)):
+                        subdirs.append(child.name)
+                except OSError:
+                    continue
+    except OSError:
+        return []
+
+    stats["dirs_listed"] += 1
+    _remember_subdirs(conn, path, mtime, subdirs)
+    return subdirs
+
+
+def ingest_project(conn: sqlite3.Connection, project: Path, stats: dict):
+    """Catalog every memory of one project store, skipping unchanged sessions."""
+    memories_dir = project / ".claude" / "memories"
+    project_key = str(project.resolve())
+
+    sessions = list_subdirs(conn, str(memories_dir), stats)
+    for session_id in sessions:
+        if session_id == OBJECTS_DIR:
+            continue
+        session_dir = memories_dir / session_id
+        before = stats["dirs_listed"]
+        timestamps = list_subdirs(conn, str(session_dir), stats)
+        if stats["dirs_listed"] == before:
+            continue  # Session unchanged since the last scan
+
+        known = {
+            row["timestamp"] for row in conn.execute(
+                "SELECT timestamp FROM memories WHERE project = ? AND session_id = ?",
+                (project_key, session_id),
+            )
+        }
+        for timestamp in timestamps:
+            memory_dir = session_dir / timestamp
+            if timestamp in known or memory_dir.is_symlink() or not stored_exists(memory_dir / "memory.json"):
+                continue
+            try:
+                metadata = read_json(memory_dir / "metadata.json")
+            except (OSError, ValueError):
+                metadata = {}
+            try:
+                summary = load_memory_content(memory_dir / "memory.json")
+            except (OSError, ValueError):
+                summary = ""
+            upsert_memory(conn, project_key, make_index_entry(session_id, timestamp, metadata), metadata, summary)
+            stats["memories_added"] += 1
+
+        # Forget memories whose directories were removed
+        for stale in known - set(timestamps):
+            stats["memories_removed"] += forget_memories(
+                conn, "project = ? AND session_id = ? AND timestamp = ?", (project_key, session_id, stale)
+            )
+
+    # Forget sessions whose directories were removed
+    stale_sessions = {
+        row["session_id"] for row in conn.execute("SELECT DISTINCT session_id FROM memories WHERE project = ?", (project_key,))
+    } - set(sessions)
+    for session_id in stale_sessions:
+        stats["memories_removed"] += forget_memories(conn, "project = ? AND session_id = ?", (project_key, session_id))
+
+
+def _worth_descending(name: str) -> bool:
+    return name not in PRUNED_DIRS and (not name.startswith(".") or name == ".claude")
+
+
+def scan(conn: sqlite3.Connection, roots: list, max_depth: int = DEFAULT_MAX_DEPTH) -> dict:
+    """Walk roots for project stores (.claude/memories) and catalog them."""
+    stats = {"dirs_listed": 0, "dirs_unchanged": 0, "projects": 0, "memories_added": 0, "memories_removed": 0}
+    stack = [(Path(root).expanduser(), 0) for root in roots]
+    seen = set()
+
+    # Projects already in the catalog are always refreshed, wherever they are
+    catalogued = {row["project"] for row in conn.execute("SELECT DISTINCT project FROM memories")}
+    stack.extend((Path(project), max_depth) for project in catalogued)
+
+    while stack:
+        path, depth = stack.pop()
+        key = str(path)
+        if key in seen:
+            continue
+        seen.add(key)
+
+        subdirs = list_subdirs(conn, key, stats, keep=_worth_descending)
+        if ".claude" in subdirs and (path / ".claude" / "memories").is_dir():
+            stats["projects"] += 1
+            with conn:
+                ingest_project(conn, path, stats)
+        elif key in catalogued:
+            # The project's store is gone: forget its memories
+            with conn:
+                stats["memories_removed"] += forget_memories(conn, "project = ?", (key,))
+
+        if depth < max_depth:
+            stack.extend((path / name, depth + 1) for name in subdirs if name != ".claude")
+
+    conn.commit()
+    return stats
+
+
+# ============================================================================
+# Queries
+# ============================================================================
+
+ROW_FIELDS = ("project", "session_id", "timestamp", "created_at", "trigger", "message_count", "topics", "memory_path")
+
+
+def list_memories(conn: sqlite3.Connection, since: float = None, project: str = None, limit: int = DEFAULT_LIMIT):
+    """Most recent memories across all projects."""
+    sql = f"SELECT {', '.join(ROW_FIELDS)} FROM memories WHERE 1 = 1"
+    params = []
+    if since is not None:
+        sql += " AND created_time >= ?"
+        params.append(since)
+    if project:
+        sql += " AND project LIKE ?"
+        params.append(f"%{project}%")
+    sql += " ORDER BY created_time DESC"
+    if limit:
+        sql += " LIMIT ?"
+        params.append(limit)
+    return conn.execute(sql, params)
+
+
+def search_memories(conn: sqlite3.Connection, query: str, since: float = None, limit: int = DEFAULT_LIMIT):
+    """Full-text search over summaries, topics, files and project paths."""
+    fields = ", ".join(f"m.{f}" for f in ROW_FIELDS)
+    params = []
+    if has_fts(conn):
+        # Quote each term so user input is never parsed as FTS syntax
+        match = " ".join('"' + term.replace('"', '""') + '"' for term in query.split())
+        sql = (
+            f"SELECT {fields}, snippet(memories_fts, 0, '**', '**', '...', 12) AS snippet "
+            "FROM memories_fts JOIN memories m ON m.id = memories_fts.rowid "
+            "WHERE memories_fts MATCH ?"
+        )
+        params.append(match)
+        order = " ORDER BY bm25(memories_fts)"
+    else:
+        sql = f"SELECT {fields}, substr(m.summary, 1, 120) AS snippet FROM memories m WHERE 1 = 1"
+        for term in query.split():
+            sql += " AND (m.summary LIKE ? OR m.topics LIKE ? OR m.files_modified LIKE ? OR m.project LIKE ?)"
+            params.extend([f"%{term}%"] * 4)
+        order = " ORDER BY m.created_time DESC"
+    if since is not None:
+        sql += " AND m.created_time >= ?"
+        params.append(since)
+    sql += order
+    if limit:
+        sql += " LIMIT ?"
+        params.append(limit)
+    return conn.execute(sql, params)
+
+
+# ============================================================================
+# Output
+# ============================================================================
+
+def print_rows(rows, fmt: str, title: str, with_snippet: bool = False) -> int:
+    """Stream catalog rows as a markdown table or NDJSON. Returns the row count."""
+    count = 0
+    for row in rows:
+        count += 1
+        if fmt == "ndjson":
+            print(json.dumps(dict(row), ensure_ascii=False, separators=(',', ':')), flush=True)
+            continue
+        if count == 1:
+            print(f"## {title}\n")
+            header = "| # | Project | Session ID | Timestamp | Trigger | Messages |"
+            divider = "|---|---------|------------|-----------|---------|----------|"
+            if with_snippet:
+                header += " Match |"
+                divider += "-------|"
+            print(header)
+            print(divider)
+        sid = row["session_id"]
+        short_sid = f"{sid[:8]}..." if len(sid) > 8 else sid
+        line = (
+            f"| {count} | {Path(row['project']).name} | {short_sid} | {format_timestamp(row['created_at'])} "
+            f"| {row['trigger'] or '-'} | {row['message_count'] or 0} |"
+        )
+        if with_snippet:
+            snippet = " ".join((row["snippet"] or "").split()).replace("|", "\\|")
+            line += f" {snippet} |"
+        print(line, flush=True)
+    return count
+
+
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Cross-project context-keeper memory catalog")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    scan_parser = sub.add_parser("scan", help="Backfill the catalog from project stores")
+    scan_parser.add_argument("--root", action="append", help="Directory to search for projects (default: home)")
+    scan_parser.add_argument("--max-depth", type=int, default=DEFAULT_MAX_DEPTH)
+
+    for name in ("list", "search"):
+        query_parser = sub.add_parser(name, help=f"{name.title()} memories across all projects")
+        if name == "search":
+            query_parser.add_argument("query", nargs="+", help="Words to search for")
+        query_parser.add_argument("--since", help="Only memories newer than this (e.g. 7d, 12h, 2025-11-24)")
+        query_parser.add_argument("--limit", type=int, default=DEFAULT_LIMIT, help="Maximum rows (0 = all)")
+        query_parser.add_argument("--format", choices=["markdown", "ndjson"], default="markdown")
+        if name == "list":
+            query_parser.add_argument("--project", help="Only projects whose path contains this text")
+
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    conn = open_catalog()
+
+    try:
+        if args.command == "scan":
+            start = time.perf_counter()
+            stats = scan(conn, args.root or [str(Path.home())], args.max_depth)
+            elapsed = time.perf_counter() - start
+            print("## Memory Catalog Scan\n")
+            print(f"- **Projects:** {stats['projects']}")
+            print(f"- **Memories added:** {stats['memories_added']}")
+            print(f"- **Memories removed:** {stats['memories_removed']}")
+            print(f"- **Directories listed:** {stats['dirs_listed']} ({stats['dirs_unchanged']} unchanged, skipped)")
+            print(f"- **Time:** {elapsed:.2f}s")
+            return
+
+        since = parse_since(args.since) if args.since else None
+        if args.command == "list":
+            rows = list_memories(conn, since, args.project, max(args.limit, 0))
+            count = print_rows(rows, args.format, "Memories Across All Projects")
+        else:
+            query = " ".join(args.query)
+            rows = search_memories(conn, query, since, max(args.limit, 0))
+            count = print_rows(rows, args.format, f"Memories Matching '{query}'", with_snippet=True)
+
+        if count == 0 and args.format == "markdown":
+            print("No memories found. Run `memory_catalog.py scan` to backfill existing projects.")
+    except (ValueError, sqlite3.Error) as e:
+        print(f"[context-keeper] Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
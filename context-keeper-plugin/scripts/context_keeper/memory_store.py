@@ -0,0 +1,761 @@
+#!/usr/bin/env python3
+"""
+Memory Store: Shared storage helpers for context-keeper memory files.
+
+Memory and metadata files can be stored either as plain pretty-printed JSON
+(the original format) or compressed (zstd when available, otherwise gzip).
+Writers pick the format from CONTEXT_KEEPER_STORAGE_FORMAT; readers detect
+the format from the file suffix and magic bytes, so callers keep using the
+logical `memory.json` / `metadata.json` paths recorded in index.json.
+
+Memory content is additionally deduplicated through a content-addressed
+chunk store: each markdown section of a memory is hashed and stored once under
+`.claude/memories/objects/`, and memory.json becomes a manifest of chunk
+references that readers reassemble transparently.
+
+Environment variables:
+  CONTEXT_KEEPER_STORAGE_FORMAT - json (default), gzip, zstd or auto
+                                  (auto = zstd if available, otherwise gzip)
+  CONTEXT_KEEPER_DEDUP          - 1 (default) to store memory sections in the
+                                  chunk store, 0 to write full memory.json files
+  CONTEXT_KEEPER_HOME           - user-level state directory
+                                  (default ~/.claude/context-keeper)
+  CONTEXT_KEEPER_CONTEXT_TOKENS - token budget of the composed SessionStart
+                                  memory (default 8000, 0 = unlimited)
+
+index.json is read with an incremental in-process parser (iter_index_entries)
+that decodes `memories[]` entries one at a time, so readers that only need
+the first few entries never materialize the rest of the file.
+
+index.json only keeps the most recent entries. The complete history lives in
+an append-only ordered index (index.ndjson, one entry per line, oldest first)
+that list commands read backwards for newest-first paging with byte-offset
+cursors, plus per-session aggregates in sessions.json. Appends are single
+O_APPEND writes; sessions.json is read, updated and replaced under an
+exclusive lock on sessions.lock (index_lock()), so concurrent hooks do not
+lose each other's counts.
+
+Every hook and list command imports this module, so gzip, hashlib and zstd
+are imported on first use rather than at import time.
+"""
+
+import json
+import os
+import re
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+# zstd is imported on first use (see get_zstd()): most hook runs never need it
+_zstd = False
+
+
+# ============================================================================
+# Configuration
+# ============================================================================
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+FORMAT_SUFFIXES = {
+    "json": "",
+    "gzip": ".gz",
+    "zstd": ".zst",
+}
+
+INDEX_READ_CHUNK = 64 * 1024
+
+ORDERED_INDEX = "index.ndjson"
+SESSIONS_INDEX = "sessions.json"
+SESSIONS_LOCK = "sessions.lock"
+
+OBJECTS_DIR = "objects"
+CHUNKED_FORMAT = "chunked-v1"
+
+# Sections start at level-2 markdown headings ("## Topics Discussed", ...)
+DEFAULT_CONTEXT_TOKENS = 8000
+EARLIER_MEMORIES = 3
+
+SECTION_RE = re.compile(r'^## ', re.MULTILINE)
+
+_settings_env = None
+
+
+def get_setting(name: str, default: Optional[str] = None) -> Optional[str]:
+    """
+    Read a context-keeper setting.
+
+    The process environment wins; otherwise the "env" block of
+    ~/.claude/settings.json is consulted (read once per process).
+    """
+    global _settings_env
+
+    value = os.environ.get(name)
+    if value is not None:
+        return value
+
+    if _settings_env is None:
+        _settings_env = {}
+        config_path = Path.home() / ".claude" / "settings.json"
+        try:
+            config = json.loads(config_path.read_text(encoding='utf-8'))
+            env = config.get("env", {})
+            if isinstance(env, dict):
+                _settings_env = env
+        except (OSError, json.JSONDecodeError):
+            pass
+
+    return _settings_env.get(name, default)
+
+
+def get_state_dir() -> Path:
+    """User-level context-keeper directory (catalog, caches, metrics)."""
+    configured = get_setting("CONTEXT_KEEPER_HOME")
+    state_dir = Path(configured).expanduser() if configured else Path.home() / ".claude" / "context-keeper"
+    state_dir.mkdir(parents=True, exist_ok=True)
+    return state_dir
+
+
+def get_zstd():
+    """The zstd module (stdlib on Python 3.14+, else zstandard), or None."""
+    global _zstd
+    if _zstd is False:
+        try:
+            from compression import zstd as _zstd  # Python 3.14+
+        except ImportError:
+            try:
+                import zstandard as _zstd
+            except ImportError:
+                _zstd = None
+    return _zstd
+
+
+def zstd_available() -> bool:
+    """Return True if a zstd implementation can be imported."""
+    return get_zstd() is not None
+
+
+def format_timestamp(created_at: str, seconds: bool = False) -> str:
+    """Format ISO timestamp to readable format."""
+    try:
+        dt = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
+        return dt.strftime("%Y-%m-%d %H:%M:%S" if seconds else "%Y-%m-%d %H:%M")
+    except (ValueError, TypeError, AttributeError):
+        width = 19 if seconds else 16
+        return created_at[:width] if created_at else "unknown"
+
+
+def dedup_enabled() -> bool:
+    """Return True if memory content should go through the chunk store."""
+    value = get_setting("CONTEXT_KEEPER_DEDUP", "1") or "1"
+    return value.strip().lower() not in ("0", "false", "no", "off")
+
+
+def context_token_budget() -> int:
+    """Token budget for the composed SessionStart memory (0 = unlimited)."""
+    value = get_setting("CONTEXT_KEEPER_CONTEXT_TOKENS", "") or ""
+    try:
+        return max(0, int(value)) if value.strip() else DEFAULT_CONTEXT_TOKENS
+    except ValueError:
+        return DEFAULT_CONTEXT_TOKENS
+
+
+def get_storage_format(requested: Optional[str] = None) -> str:
+    """Resolve the storage format to write with: json, gzip or zstd."""
+    fmt = (requested or get_setting("CONTEXT_KEEPER_STORAGE_FORMAT", "json") or "json").strip().lower()
+    if fmt in ("gz",):
+        fmt = "gzip"
+    if fmt in ("zst",):
+        fmt = "zstd"
+    if fmt == "auto":
+        fmt = "zstd" if zstd_available() else "gzip"
+    if fmt == "zstd" and not zstd_available():
+        fmt = "gzip"
+    if fmt not in FORMAT_SUFFIXES:
+        fmt = "json"
+    return fmt
+
+
+# ============================================================================
+# Encoding / Decoding
+# ============================================================================
+
+def encode_bytes(raw: bytes, fmt: str) -> bytes:
+    """Compress raw bytes for the given storage format."""
+    if fmt == "zstd":
+        return get_zstd().compress(raw)
+    if fmt == "gzip":
+        import gzip
+        return gzip.compress(raw, compresslevel=6, mtime=0)
+    return raw
+
+
+def encode_json(data, fmt: str) -> bytes:
+    """Serialize data for the given storage format."""
+    if fmt == "json":
+        return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+
+    # Compressed payloads don't benefit from indentation
+    raw = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return encode_bytes(raw, fmt)
+
+
+def decode_bytes(raw: bytes) -> bytes:
+    """Decompress raw file content based on its magic bytes."""
+    if raw[:2] == GZIP_MAGIC:
+        import gzip
+        return gzip.decompress(raw)
+    if raw[:4] == ZSTD_MAGIC:
+        if get_zstd() is None:
+            raise ValueError("zstd-compressed memory found but no zstd module is installed (pip install zstandard)")
+        return get_zstd().decompress(raw)
+    return raw
+
+
+# ============================================================================
+# File Access
+# ============================================================================
+
+def stored_variants(path: Path) -> list[Path]:
+    """All on-disk variants of a logical JSON path, plain first."""
+    path = Path(path)
+    return [path.with_name(path.name + suffix) for suffix in FORMAT_SUFFIXES.values()]
+
+
+def resolve_stored_path(path: Path) -> Optional[Path]:
+    """Return the existing on-disk file for a logical path, or None."""
+    for candidate in stored_variants(path):
+        if candidate.exists():
+            return candidate
+    return None
+
+
+def stored_exists(path: Path) -> bool:
+    """Return True if any variant of the logical path exists."""
+    return resolve_stored_path(path) is not None
+
+
+def read_bytes(path: Path) -> bytes:
+    """Read a logical path, transparently decompressing it."""
+    actual = resolve_stored_path(path)
+    if actual is None:
+        raise FileNotFoundError(str(path))
+    return decode_bytes(actual.read_bytes())
+
+
+def read_json(path: Path):
+    """Read and parse a (possibly compressed) JSON file by its logical path."""
+    return json.loads(read_bytes(path).decode('utf-8'))
+
+
+def _atomic_write(target: Path, payload: bytes):
+    """Write payload to target via a temporary file and rename."""
+    tmp_path = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+    tmp_path.write_bytes(payload)
+    os.replace(tmp_path, target)
+
+
+def write_json(path: Path, data, fmt: Optional[str] = None) -> Path:
+    """
+    Write data to a logical JSON path in the configured storage format.
+
+    The file is written atomically, and variants in other formats are removed
+    so readers never see a stale copy. Returns the on-disk path.
+    """
+    path = Path(path)
+    fmt = get_storage_format(fmt)
+    target = path.with_name(path.name + FORMAT_SUFFIXES[fmt])
+
+    _atomic_write(target, encode_json(data, fmt))
+
+    for stale in stored_variants(path):
+        if stale != target and stale.exists():
+            try:
+                stale.unlink()
+            except OSError:
+                pass
+
+    return target
+
+
+# ============================================================================
+# Content-Addressed Chunk Store
+# ============================================================================
+
+def split_sections(text: str) -> list[str]:
+    """Split memory markdown into sections; joining them restores the text."""
+    starts = [m.start() for m in SECTION_RE.finditer(text)]
+    if not starts or starts[0] != 0:
+        starts.insert(0, 0)
+    bounds = starts + [len(text)]
+    return [text[bounds[i]:bounds[i + 1]] for i in range(len(starts)) if bounds[i] < bounds[i + 1]]
+
+
+def objects_dir_for(memory_path: Path) -> Path:
+    """Chunk store location for a memory file ({memories}/{session}/{timestamp}/memory.json)."""
+    return Path(memory_path).parent.parent.parent / OBJECTS_DIR
+
+
+def object_path(objects_dir: Path, digest: str) -> Path:
+    """Path of a chunk, fanned out by the first two hex digits."""
+    return objects_dir / digest[:2] / digest[2:]
+
+
+def store_chunk(objects_dir: Path, chunk: str, fmt: Optional[str] = None) -> tuple[str, bool]:
+    """
+    Store a chunk by its SHA-256 digest.
+
+    Returns (digest, written); written is False when the chunk already existed.
+    """
+    import hashlib
+
+    raw = chunk.encode('utf-8')
+    digest = hashlib.sha256(raw).hexdigest()
+    path = object_path(objects_dir, digest)
+    if path.exists():
+        return digest, False
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    _atomic_write(path, encode_bytes(raw, get_storage_format(fmt)))
+    return digest, True
+
+
+def load_chunk(objects_dir: Path, digest: str) -> str:
+    """Read a chunk, transparently decompressing it."""
+    return decode_bytes(object_path(objects_dir, digest).read_bytes()).decode('utf-8')
+
+
+def build_manifest(memory_path: Path, memory_data: dict, fmt: Optional[str] = None) -> tuple[dict, dict]:
+    """
+    Store a full memory record's content as chunks and return its manifest.
+
+    Sections already present in the store are not rewritten. Returns
+    (manifest, stats) where stats counts total chunks, new chunks and the
+    bytes written for them.
+    """
+    objects_dir = objects_dir_for(memory_path)
+    stats = {"chunks": 0, "new_chunks": 0, "new_bytes": 0}
+    digests = []
+    for chunk in split_sections(memory_data["content"]):
+        digest, written = store_chunk(objects_dir, chunk, fmt)
+        digests.append(digest)
+        stats["chunks"] += 1
+        if written:
+            stats["new_chunks"] += 1
+            stats["new_bytes"] += object_path(objects_dir, digest).stat().st_size
+
+    manifest = {key: value for key, value in memory_data.items() if key != "content"}
+    manifest["format"] = CHUNKED_FORMAT
+    manifest["chunks"] = digests
+    return manifest, stats
+
+
+def write_memory(memory_path: Path, memory_data: dict, fmt: Optional[str] = None) -> tuple[Path, dict]:
+    """
+    Write a memory file, deduplicating its content through the chunk store.
+
+    memory_data is the full memory record ({"content": ..., ...}). With dedup
+    enabled the content is replaced by a manifest of chunk digests.
+
+    Returns (on-disk path, stats) as reported by build_manifest().
+    """
+    if not dedup_enabled() or not isinstance(memory_data.get("content"), str):
+        return write_json(memory_path, memory_data, fmt), {"chunks": 0, "new_chunks": 0, "new_bytes": 0}
+
+    manifest, stats = build_manifest(memory_path, memory_data, fmt)
+    return write_json(memory_path, manifest, fmt), stats
+
+
+def load_earlier_memories(session_dir: Path, before: str, limit: int = EARLIER_MEMORIES) -> list[tuple[str, str]]:
+    """
+    Load up to `limit` memories of a session saved before timestamp `before`.
+
+    Returns [(timestamp, text)], newest first. Unreadable memories are skipped.
+    """
+    try:
+        timestamps = sorted(
+            (d.name for d in Path(session_dir).iterdir() if d.is_dir() and not d.is_symlink() and d.name < before),
+            reverse=True,
+        )
+    except OSError:
+        return []
+
+    earlier = []
+    for timestamp in timestamps:
+        memory_path = Path(session_dir) / timestamp / "memory.json"
+        if not stored_exists(memory_path):
+            continue
+        try:
+            earlier.append((timestamp, load_memory_content(memory_path)))
+        except (OSError, ValueError):
+            continue
+        if len(earlier) >= limit:
+            break
+    return earlier
+
+
+def is_manifest(memory_data) -> bool:
+    """Return True if a parsed memory.json is a chunk manifest."""
+    return isinstance(memory_data, dict) and memory_data.get("format") == CHUNKED_FORMAT
+
+
+def assemble_content(memory_path: Path, manifest: dict) -> str:
+    """Reassemble memory content from its chunk manifest."""
+    objects_dir = objects_dir_for(memory_path)
+    return "".join(load_chunk(objects_dir, digest) for digest in manifest.get("chunks", []))
+
+
+def load_memory_content(memory_path: Path) -> str:
+    """
+    Load the memory text from a memory file.
+
+    Handles JSON memories in any storage format, chunk manifests, and
+    legacy plain-text/markdown memory files.
+    """
+    raw = read_bytes(memory_path)
+    text = raw.decode('utf-8')
+    try:
+        memory_data = json.loads(text)
+    except json.JSONDecodeError:
+        # Fallback for old .md files
+        return text
+    if is_manifest(memory_data):
+        return assemble_content(memory_path, memory_data)
+    if isinstance(memory_data, dict):
+        return memory_data.get('content', '')
+    return text
+
+
+# ============================================================================
+# Incremental Index Reader
+# ============================================================================
+
+class _JSONStream:
+    """Buffered reader that decodes one JSON value at a time from a file."""
+
+    _WHITESPACE = re.compile(r'[ \t\n\r]*')
+    _NUMBER_CHARS = "0123456789.eE+-"
+
+    def __init__(self, f, chunk_size: int):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        """Read another chunk, dropping the consumed prefix. False at EOF."""
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character ('' at EOF) without consuming it."""
+        while True:
+            self.pos = self._WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str):
+        """Consume the next non-whitespace character, which must be char."""
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Malformed index: expected {char!r}, found {found!r}")
+        self.pos += 1
+
+    def value(self):
+        """Decode the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                obj, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # A number cut at the buffer edge ("12" of "123", "2" of "2.5")
+            # decodes successfully; make sure it really ended
+            if end == len(self.buf) or (
+                isinstance(obj, (int, float)) and self.buf[end] in self._NUMBER_CHARS
+            ):
+                if self._fill():
+                    continue
+            self.pos = end
+            return obj
+
+
+def iter_index_entries(index_path: Path, chunk_size: int = INDEX_READ_CHUNK):
+    """
+    Lazily yield the entries of index.json's `memories` array.
+
+    Entries are decoded one at a time; stopping the iteration early leaves
+    the rest of the file unread. Other top-level keys are skipped. Raises
+    ValueError (including json.JSONDecodeError) for malformed files.
+    """
+    with open(index_path, 'r', encoding='utf-8') as f:
+        stream = _JSONStream(f, chunk_size)
+        stream.expect("{")
+        if stream.peek() == "}":
+            return
+        while True:
+            key = stream.value()
+            stream.expect(":")
+            if key == "memories":
+                stream.expect("[")
+                if stream.peek() == "]":
+                    stream.pos += 1
+                else:
+                    while True:
+                        yield stream.value()
+                        if stream.peek() == "]":
+                            stream.pos += 1
+                            break
+                        stream.expect(",")
+            else:
+                stream.value()
+
+            if stream.peek() == "}":
+                return
+            stream.expect(",")
+
+
+def read_index_head(index_path: Path, limit: int) -> list[dict]:
+    """Return the first `limit` index entries (most recent first)."""
+    entries = []
+    if limit <= 0:
+        return entries
+    for entry in iter_index_entries(index_path):
+        entries.append(entry)
+        if len(entries) >= limit:
+            break
+    return entries
+
+
+# ============================================================================
+# Ordered Index and Session Aggregates
+# ============================================================================
+
+def make_index_entry(session_id: str, timestamp: str, metadata: dict) -> dict:
+    """Build the index entry recorded for a saved memory."""
+    return {
+        "session_id": session_id,
+        "timestamp": timestamp,
+        "created_at": metadata.get('timestamp', ''),
+        "trigger": metadata.get('trigger', ''),
+        "project": metadata.get('cwd', ''),
+        "message_count": metadata.get('message_count', 0),
+        "memory_path": f"{session_id}/{timestamp}/memory.json"
+    }
+
+
+def entry_time(entry: dict) -> float:
+    """Unix time of an index entry (created_at, else its directory timestamp)."""
+    created_at = entry.get("created_at") or ""
+    try:
+        return datetime.fromisoformat(created_at.replace('Z', '+00:00')).timestamp()
+    except (ValueError, TypeError, AttributeError):
+        pass
+    try:
+        return datetime.strptime(entry.get("timestamp", ""), "%Y%m%d_%H%M%S").timestamp()
+    except (ValueError, TypeError):
+        return 0.0
+
+
+def parse_since(value: str) -> float:
+    """
+    Parse a --since value into Unix time.
+
+    Accepts relative durations ("30m", "12h", "7d") or ISO dates/datetimes
+    ("2025-11-24", "2025-11-24T19:00"). Raises ValueError otherwise.
+    """
+    value = value.strip()
+    units = {"m": 60, "h": 3600, "d": 86400, "w": 604800}
+    if value[-1:].lower() in units and value[:-1].isdigit():
+        import time
+        return time.time() - int(value[:-1]) * units[value[-1].lower()]
+    return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+
+
+def append_ordered_index(memories_dir: Path, entry: dict):
+    """Append an entry to the ordered index with a single O_APPEND write."""
+    line = (json.dumps(entry, ensure_ascii=False, separators=(',', ':')) + "\n").encode('utf-8')
+    fd = os.open(Path(memories_dir) / ORDERED_INDEX, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, line)
+    finally:
+        os.close(fd)
+
+
+def _iter_lines_reverse(path: Path, end: Optional[int] = None, block_size: int = INDEX_READ_CHUNK):
+    """Yield (offset, line) pairs from the end of a file backwards."""
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell() if end is None else min(end, f.tell())
+        tail = b""
+        while pos > 0:
+            read_size = min(block_size, pos)
+            pos -= read_size
+            f.seek(pos)
+            block = f.read(read_size) + tail
+            lines = block.split(b"\n")
+            # The first piece may be a partial line continuing before pos
+            tail = lines.pop(0)
+            line_end = pos + len(block)
+            for line in reversed(lines):
+                line_end -= len(line) + 1
+                if line.strip():
+                    yield line_end + 1, line
+        if tail.strip():
+            yield 0, tail
+
+
+def iter_ordered_index(memories_dir: Path, cursor: Optional[str] = None):
+    """
+    Yield (entry, cursor) pairs newest first from the ordered index.
+
+    The returned cursor is the byte offset of the entry's line; passing it
+    back resumes with the next older entry. Offsets stay valid as new
+    entries are appended. Malformed lines are skipped.
+    """
+    path = Path(memories_dir) / ORDERED_INDEX
+    end = None
+    if cursor:
+        try:
+            end = int(cursor)
+        except ValueError:
+            raise ValueError(f"Invalid cursor: {cursor!r}")
+
+    for offset, line in _iter_lines_reverse(path, end):
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            continue
+        if isinstance(entry, dict):
+            yield entry, str(offset)
+
+
+@contextmanager
+def file_lock(path: Path):
+    """Exclusive flock on a lock file shared by concurrent hooks (no-op where flock is unavailable)."""
+    try:
+        import fcntl
+    except ImportError:
+        yield
+        return
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        os.close(fd)  # Releases the lock
+
+
+def index_lock(memories_dir: Path):
+    """Exclusive lock on a store's session aggregates."""
+    return file_lock(Path(memories_dir) / SESSIONS_LOCK)
+
+
+def update_session_aggregates(memories_dir: Path, entry: dict):
+    """Fold a new index entry into the per-session aggregates (sessions.json)."""
+    path = Path(memories_dir) / SESSIONS_INDEX
+    with index_lock(memories_dir):
+        try:
+            sessions = json.loads(path.read_text(encoding='utf-8'))
+            if not isinstance(sessions, dict):
+                sessions = {}
+        except (OSError, ValueError):
+            sessions = {}
+
+        _fold_entry(sessions, entry)
+        _atomic_write(path, json.dumps(sessions, indent=2, ensure_ascii=False).encode('utf-8'))
+
+
+def _fold_entry(sessions: dict, entry: dict):
+    """Add one index entry to an aggregates mapping in place."""
+    sid = entry.get("session_id", "unknown")
+    agg = sessions.setdefault(sid, {
+        "compaction_count": 0,
+        "total_messages": 0,
+        "latest_created": "",
+        "latest_time": 0.0,
+        "project": "",
+        "triggers": {},
+    })
+    agg["compaction_count"] += 1
+    agg["total_messages"] += entry.get("message_count", 0) or 0
+    agg["project"] = entry.get("project", "") or agg["project"]
+    trigger = entry.get("trigger") or "unknown"
+    agg["triggers"][trigger] = agg["triggers"].get(trigger, 0) + 1
+    when = entry_time(entry)
+    if when >= agg["latest_time"]:
+        agg["latest_time"] = when
+        agg["latest_created"] = entry.get("created_at", "")
+
+
+def load_session_aggregates(memories_dir: Path) -> dict:
+    """Read sessions.json, building the ordered index first if needed."""
+    ensure_ordered_index(memories_dir)
+    try:
+        sessions = json.loads((Path(memories_dir) / SESSIONS_INDEX).read_text(encoding='utf-8'))
+        return sessions if isinstance(sessions, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def ensure_ordered_index(memories_dir: Path) -> bool:
+    """
+    Build index.ndjson and sessions.json for stores created before they existed.
+
+    Every saved memory directory is scanned once (index.json is capped, the
+    directories are not). Returns True if the ordered index is available.
+    """
+    memories_dir = Path(memories_dir)
+    ordered_path = memories_dir / ORDERED_INDEX
+    if ordered_path.exists() and (memories_dir / SESSIONS_INDEX).exists():
+        return True
+    if not memories_dir.is_dir():
+        return False
+
+    with index_lock(memories_dir):
+        if ordered_path.exists() and (memories_dir / SESSIONS_INDEX).exists():
+            return True  # Built by a concurrent hook while we waited
+        _build_ordered_index(memories_dir)
+    return True
+
+
+def _build_ordered_index(memories_dir: Path):
+    ordered_path = memories_dir / ORDERED_INDEX
+    entries = []
+    for session_dir in memories_dir.iterdir():
+        if not session_dir.is_dir() or session_dir.is_symlink() or session_dir.name == OBJECTS_DIR:
+            continue
+        for memory_dir in session_dir.iterdir():
+            if not memory_dir.is_dir() or memory_dir.is_symlink():
+                continue
+            if not stored_exists(memory_dir / "memory.json"):
+                continue
+            try:
+                metadata = read_json(memory_dir / "metadata.json")
+            except (OSError, ValueError):
+                metadata = {}
+            entries.append(make_index_entry(session_dir.name, memory_dir.name, metadata))
+
+    entries.sort(key=lambda e: (entry_time(e), e["timestamp"], e["session_id"]))
+    sessions = {}
+    for entry in entries:
+        _fold_entry(sessions, entry)
+
+    if not ordered_path.exists():
+        lines = "".join(json.dumps(e, ensure_ascii=False, separators=(',', ':')) + "\n" for e in entries)
+        _atomic_write(ordered_path, lines.encode('utf-8'))
+    _atomic_write(memories_dir / SESSIONS_INDEX, json.dumps(sessions, indent=2, ensure_ascii=False).encode('utf-8'))
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Migrate Memories Script: Convert stored memories between storage formats.
+
+Rewrites every memory.json / metadata.json (plain, gzip or zstd) under the
+project's .claude/memories directory into the target format. index.json is
+left as plain JSON so it stays cheap to read. With --dedup, full memories are
+also converted into chunk manifests backed by .claude/memories/objects/.
+
+Usage:
+  python3 migrate_memories.py [--format auto|zstd|gzip|json] [--dedup] [--project-path PATH] [--dry-run]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from .memory_store import (
+    FORMAT_SUFFIXES,
+    OBJECTS_DIR,
+    build_manifest,
+    get_storage_format,
+    is_manifest,
+    read_json,
+    resolve_stored_path,
+    write_json,
+)
+from .paths import get_memories_dir
+
+STORED_FILES = ("memory.json", "metadata.json")
+
+
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Convert context-keeper memory files to another storage format"
+    )
+    parser.add_argument(
+        "--format",
+        default="auto",
+        help="Target format: auto (zstd if available, else gzip), zstd, gzip or json"
+    )
+    parser.add_argument(
+        "--dedup",
+        action="store_true",
+        help="Also convert full memories into chunk manifests (content-addressed store)"
+    )
+    parser.add_argument("--project-path", help="Project path (defaults to cwd)")
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would change")
+    return parser.parse_args()
+
+
+def iter_logical_paths(memories_dir: Path):
+    """Yield logical memory/metadata paths for every stored memory."""
+    for session_dir in sorted(memories_dir.iterdir()):
+        if not session_dir.is_dir() or session_dir.is_symlink() or session_dir.name == OBJECTS_DIR:
+            continue
+        for memory_dir in sorted(session_dir.iterdir()):
+            # Skip the "latest" symlink so each memory is visited once
+            if not memory_dir.is_dir() or memory_dir.is_symlink():
+                continue
+            for name in STORED_FILES:
+                logical = memory_dir / name
+                if resolve_stored_path(logical):
+                    yield logical
+
+
+def needs_dedup(logical: Path, data) -> bool:
+    """Return True if a memory.json still holds its full content."""
+    return (
+        logical.name == "memory.json"
+        and isinstance(data, dict)
+        and not is_manifest(data)
+        and isinstance(data.get("content"), str)
+    )
+
+
+def migrate(memories_dir: Path, fmt: str, dry_run: bool = False, dedup: bool = False) -> dict:
+    """Convert all stored files to fmt. Returns migration statistics."""
+    stats = {
+        "converted": 0, "skipped": 0, "failed": 0, "bytes_before": 0, "bytes_after": 0,
+        "new_chunks": 0, "shared_chunks": 0,
+    }
+    target_suffix = FORMAT_SUFFIXES[fmt]
+
+    for logical in iter_logical_paths(memories_dir):
+        current = resolve_stored_path(logical)
+        size_before = current.stat().st_size
+        stats["bytes_before"] += size_before
+
+        try:
+            data = read_json(logical) if dedup and logical.name == "memory.json" else None
+        except (OSError, ValueError):
+            data = None
+        convert_content = dedup and needs_dedup(logical, data)
+
+        if current.name == logical.name + target_suffix and not convert_content:
+            stats["skipped"] += 1
+            stats["bytes_after"] += size_before
+            continue
+
+        if dry_run:
+            print(f"would convert {current.relative_to(memories_dir)}")
+            stats["converted"] += 1
+            stats["bytes_after"] += size_before
+            continue
+
+        try:
+            if data is None:
+                data = read_json(logical)
+            if convert_content:
+                data, chunk_stats = build_manifest(logical, data, fmt)
+                stats["new_chunks"] += chunk_stats["new_chunks"]
+                stats["shared_chunks"] += chunk_stats["chunks"] - chunk_stats["new_chunks"]
+                stats["bytes_after"] += chunk_stats["new_bytes"]
+            written = write_json(logical, data, fmt)
+        except (OSError, ValueError) as e:
+            print(f"[context-keeper] Error: Failed to convert {current}: {e}", file=sys.stderr)
+            stats["failed"] += 1
+            stats["bytes_after"] += size_before
+            continue
+
+        stats["converted"] += 1
+        stats["bytes_after"] += written.stat().st_size
+
+    return stats
+
+
+def main():
+    args = parse_arguments()
+    memories_dir = get_memories_dir(args.project_path)
+
+    if not memories_dir.exists():
+        print("No context memories found. Run `/compact` to create your first memory.")
+        return
+
+    fmt = get_storage_format(args.format)
+    if args.format.lower() == "zstd" and fmt != "zstd":
+        print("zstd is not available (pip install zstandard), falling back to gzip.", file=sys.stderr)
+
+    stats = migrate(memories_dir, fmt, args.dry_run, args.dedup)
+
+    before_kb = stats["bytes_before"] / 1024
+    after_kb = stats["bytes_after"] / 1024
+    action = "Would convert" if args.dry_run else "Converted"
+    print(f"## Memory Store Migration ({fmt})\n")
+    print(f"- **{action}:** {stats['converted']} files")
+    print(f"- **Already {fmt}:** {stats['skipped']} files")
+    if stats["failed"]:
+        print(f"- **Failed:** {stats['failed']} files")
+    if args.dedup and not args.dry_run:
+        print(f"- **Chunks:** {stats['new_chunks']} stored, {stats['shared_chunks']} deduplicated")
+    print(f"- **Size:** {before_kb:.1f} KiB -> {after_kb:.1f} KiB")
+
+    if stats["failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
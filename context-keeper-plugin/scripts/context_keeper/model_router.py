@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Model Router: Latency-aware choice of the summarization model.
+
+generate_memory_with_llm() asks route_model() for a model once the prompt
+is packed. The policy:
+
+  - consolidations (a previous memory or pre-summarized chunks folded in)
+    that are not small go to the strong model, but only if its predicted
+    latency (with a safety factor) fits in the time left before the hook
+    deadline; otherwise the fast model is used;
+  - everything else goes to the fast model.
+
+The strong model is only distinct when CONTEXT_KEEPER_STRONG_MODEL is set;
+otherwise it is the fast model and nothing is routed, so a custom
+CLAUDE_SUMMARY_API_URL never receives a model it was not configured with.
+
+Latency is predicted per model from recent successful calls kept in
+~/.claude/context-keeper/model_latency.json (time to first token per 1k
+input tokens and output tokens per second), with conservative priors
+until enough samples exist. Hooks update it under a file lock, so
+concurrent calls do not drop each other's samples.
+
+Environment variables:
+  CONTEXT_KEEPER_MODEL_ROUTING - 1 (default) to route, 0 to always use the fast model
+  CONTEXT_KEEPER_FAST_MODEL    - default: CLAUDE_SUMMARY_MODEL, else claude-3-haiku-20240307
+  CONTEXT_KEEPER_STRONG_MODEL  - default: the fast model (no routing)
+"""
+
+import json
+import os
+import statistics
+from pathlib import Path
+
+from .memory_store import file_lock, get_setting, get_state_dir
+
+# ============================================================================
+# Configuration
+# ============================================================================
+
+DEFAULT_FAST_MODEL = "claude-3-haiku-20240307"
+
+# The packed prompt is ~1.1k tokens of instructions plus at most 2 x 3000
+# characters of messages, ~2.6k tokens in all; beyond this it is mostly the
+# previous memory or chunk summaries being consolidated
+SMALL_PROMPT_TOKENS = 4000
+SAFETY_FACTOR = 1.5
+EXPECTED_OUTPUT_TOKENS = 2500
+
+STATS_FILE = "model_latency.json"
+STATS_LOCK = "model_latency.lock"
+MAX_SAMPLES = 50
+MIN_SAMPLES = 3
+
+# (ttft ms per 1k input tokens, output tokens per second) before samples exist
+PRIORS = {
+    "haiku": (250.0, 120.0),
+    "sonnet": (600.0, 60.0),
+    "opus": (1000.0, 30.0),
+}
+DEFAULT_PRIOR = (600.0, 60.0)
+
+
+def routing_enabled() -> bool:
+    value = get_setting("CONTEXT_KEEPER_MODEL_ROUTING", "1") or "1"
+    return value.strip().lower() not in ("0", "false", "no", "off")
+
+
+def get_models(configured_model: str = None) -> tuple[str, str]:
+    """(fast, strong) model names."""
+    fast = get_setting("CONTEXT_KEEPER_FAST_MODEL") or configured_model or DEFAULT_FAST_MODEL
+    strong = get_setting("CONTEXT_KEEPER_STRONG_MODEL") or fast
+    return fast, strong
+
+
+# ============================================================================
+# Latency Statistics
+# ============================================================================
+
+def get_stats_path() -> Path:
+    return get_state_dir() / STATS_FILE
+
+
+def load_stats(path: Path = None) -> dict:
+    try:
+        stats = json.loads((path or get_stats_path()).read_text(encoding="utf-8"))
+        return stats if isinstance(stats, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def record_latency(model: str, input_tokens: int, output_tokens: int, ttft_ms: float, latency_ms: float, path: Path = None):
+    """Add one successful call to the model's recent samples (last MAX_SAMPLES kept)."""
+    if not model or not latency_ms or ttft_ms is None:
+        return
+    path = path or get_stats_path()
+    with file_lock(path.with_name(STATS_LOCK)):
+        stats = load_stats(path)
+        samples = stats.setdefault(model, [])
+        samples.append([input_tokens, output_tokens, round(ttft_ms, 1), round(latency_ms, 1)])
+        del samples[:-MAX_SAMPLES]
+
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(stats, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+
+def latency_profile(model: str, stats: dict) -> tuple[float, float, str]:
+    """(ttft ms per 1k input tokens, output tokens/s, source) for a model."""
+    samples = stats.get(model, [])
+    if len(samples) >= MIN_SAMPLES:
+        ttft_per_k = [ttft / max(1.0, input_tokens / 1000) for input_tokens, _, ttft, _ in samples]
+        speeds = [
+            output_tokens / ((latency - ttft) / 1000)
+            for _, output_tokens, ttft, latency in samples
+            if latency > ttft and output_tokens
+        ]
+        if speeds:
+            # Pessimistic side: slow first tokens, median generation speed
+            ttft_p90 = sorted(ttft_per_k)[min(len(ttft_per_k) - 1, int(len(ttft_per_k) * 0.9))]
+            return ttft_p90, statistics.median(speeds), f"{len(samples)} samples"
+
+    for family, prior in PRIORS.items():
+        if family in model:
+            return prior[0], prior[1], "prior"
+    return DEFAULT_PRIOR[0], DEFAULT_PRIOR[1], "prior"
+
+
+def predict_latency(model: str, prompt_tokens: int, stats: dict) -> tuple[float, str]:
+    """Predicted seconds for one summarization call."""
+    ttft_per_k, tokens_per_second, source = latency_profile(model, stats)
+    seconds = ttft_per_k * max(1.0, prompt_tokens / 1000) / 1000 + EXPECTED_OUTPUT_TOKENS / tokens_per_second
+    return seconds, source
+
+
+# ============================================================================
+# Routing
+# ============================================================================
+
+def route_model(prompt_tokens: int, remaining_seconds: float, consolidating: bool = False,
+                configured_model: str = None) -> tuple[str, str]:
+    """Pick the model for a packed prompt. Returns (model, reason)."""
+    fast, strong = get_models(configured_model)
+    if not routing_enabled() or fast == strong:
+        return fast, "routing disabled"
+
+    if prompt_tokens < SMALL_PROMPT_TOKENS:
+        return fast, f"small prompt ({prompt_tokens} tokens)"
+
+    if not consolidating:
+        return fast, f"no consolidation ({prompt_tokens} tokens)"
+
+    stats = load_stats()
+    predicted, source = predict_latency(strong, prompt_tokens, stats)
+    if predicted * SAFETY_FACTOR <= remaining_seconds:
+        return strong, (
+            f"consolidation ({prompt_tokens} tokens), {strong} predicted {predicted:.1f}s ({source}) "
+            f"fits {remaining_seconds:.0f}s left"
+        )
+    return fast, (
+        f"consolidation ({prompt_tokens} tokens), {strong} predicted {predicted:.1f}s ({source}) "
+        f"exceeds {remaining_seconds:.0f}s left"
+    )
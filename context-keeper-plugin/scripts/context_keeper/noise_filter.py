@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Noise Filter: Local reduction of the extracted conversation before summarization.
+
+The summarization prompt tells the LLM to ignore acknowledgements, duplicate
+messages and long logs; reduce_content() drops them before the prompt is
+packed, so the slots of the prompt go to messages that matter:
+
+  - acknowledgements ("ok", "thanks, go ahead", "Got it!") are dropped;
+  - stack traces and log runs are condensed to their first and last lines
+    plus the error lines in between;
+  - near-duplicate messages of the same role are collapsed into their most
+    recent occurrence. Candidates are messages whose 64-bit SimHash of
+    their words is within NEAR_DUPLICATE_BITS bits, found through
+    SIMHASH_BANDS band buckets instead of pairwise; a candidate is a
+    near-duplicate if the Jaccard similarity of the word bigrams is at
+    least NEAR_DUPLICATE_JACCARD (same words in a different order are not).
+
+Only the newest REDUCE_WINDOW messages per role are reduced: the prompt
+uses the newest ones, and older ones pass through unchanged. Each run
+reports what it removed and the estimated tokens saved, measured on the
+message sections the caller actually packs into its prompt (measure), with
+and without the filter: a removed message the prompt would have cut anyway
+saves nothing.
+
+Environment variables:
+  CONTEXT_KEEPER_NOISE_FILTER - 1 (default) to reduce, 0 to send the messages as extracted
+"""
+
+import re
+from typing import Callable
+
+from .memory_store import get_setting
+from .session_context import estimate_tokens
+
+# ============================================================================
+# Configuration
+# ============================================================================
+
+REDUCE_WINDOW = 200
+
+# Acknowledgements: short messages made only of these words
+ACK_MAX_WORDS = 6
+ACK_WORDS = frozenset((
+    "ok", "okay", "k", "kk", "thanks", "thank", "you", "thx", "ty", "got", "it", "i", "understand",
+    "see", "sounds", "good", "great", "perfect", "nice", "cool", "sure", "yes", "yep", "yeah",
+    "alright", "awesome", "excellent", "lgtm", "done", "please", "continue", "go", "ahead",
+    "proceed", "right", "makes", "sense", "fine", "will", "do", "that", "now", "so", "much", "a", "lot",
+))
+
+# Logs: runs of at least LOG_MIN_RUN log lines keep LOG_KEEP_LINES at each end
+LOG_MIN_RUN = 8
+LOG_KEEP_LINES = 2
+
+# SimHash: 64-bit fingerprints of the words, near-duplicates within this
+# many bits (chat messages are short: a reworded sentence moves 4-8 bits,
+# unrelated ones 14 and more)
+SIMHASH_BITS = 64
+NEAR_DUPLICATE_BITS = 8
+SIMHASH_BANDS = NEAR_DUPLICATE_BITS + 1  # Two close fingerprints then share a band
+SIMHASH_MIN_WORDS = 8
+NEAR_DUPLICATE_JACCARD = 0.5
+
+_WORD_RE = re.compile(r"\w+")
+_LOG_LINE_RE = re.compile(
+    r"""^\s*(?:
+        File\s".*",\s+line\s+\d+                          # Python frame
+      | at\s+\S.*[(:]\d+                                  # JS / Java frame
+      | \S+\.(?:py|js|jsx|ts|tsx|go|java|rb|rs|c|cpp):\d+  # file:line
+      | \[?\d{4}-\d{2}-\d{2}[T\s]\d{2}:\d{2}               # timestamped line
+      | \[?(?:TRACE|DEBUG|INFO|WARN(?:ING)?|ERROR|FATAL)\b  # level prefix
+    )""",
+    re.VERBOSE,
+)
+_PYTHON_FRAME_RE = re.compile(r'^\s*File\s".*",\s+line\s+\d+')
+_ERROR_LINE_RE = re.compile(r"error|exception|fail|fatal|panic|traceback|assert", re.IGNORECASE)
+
+
+def filter_enabled() -> bool:
+    value = get_setting("CONTEXT_KEEPER_NOISE_FILTER", "1") or "1"
+    return value.strip().lower() not in ("0", "false", "no", "off")
+
+
+# ============================================================================
+# Acknowledgements and Logs
+# ============================================================================
+
+def is_acknowledgement(text: str) -> bool:
+    words = _WORD_RE.findall(text.lower())
+    return 0 < len(words) <= ACK_MAX_WORDS and all(word in ACK_WORDS for word in words)
+
+
+def condense_logs(text: str) -> str:
+    """Replace the middle of long log / stack trace runs with an omission marker, keeping error lines."""
+    lines = text.split("\n")
+    if len(lines) < LOG_MIN_RUN:
+        return text
+
+    # Mark log lines; the indented source line under a Python frame belongs to it
+    in_log = [False] * len(lines)
+    for i, line in enumerate(lines):
+        in_log[i] = bool(_LOG_LINE_RE.match(line)) or (
+            i > 0 and in_log[i - 1] and line[:1].isspace() and bool(_PYTHON_FRAME_RE.match(lines[i - 1]))
+        )
+
+    condensed = []
+    changed = False
+    i = 0
+    while i < len(lines):
+        if not in_log[i]:
+            condensed.append(lines[i])
+            i += 1
+            continue
+        end = i
+        while end < len(lines) and in_log[end]:
+            end += 1
+        run = lines[i:end]
+        if len(run) < LOG_MIN_RUN:
+            condensed.extend(run)
+        else:
+            changed = True
+            condensed.extend(run[:LOG_KEEP_LINES])
+            omitted = 0
+            for line in run[LOG_KEEP_LINES:-LOG_KEEP_LINES]:
+                if _ERROR_LINE_RE.search(line):
+                    if omitted:
+                        condensed.append(f"... [{omitted} lines omitted]")
+                        omitted = 0
+                    condensed.append(line)
+                else:
+                    omitted += 1
+            if omitted:
+                condensed.append(f"... [{omitted} lines omitted]")
+            condensed.extend(run[-LOG_KEEP_LINES:])
+        i = end
+    return "\n".join(condensed) if changed else text
+
+
+# ============================================================================
+# Near-Duplicates
+# ============================================================================
+
+def simhash(words: list[str]) -> int:
+    """64-bit SimHash of words (hash() is per process, so fingerprints are too)."""
+    mask = (1 << SIMHASH_BITS) - 1
+    hashes = [hash(word) & mask for word in words]
+    # Transpose the hashes into one byte per bit, so counting the set bits
+    # of a position is one strided slice instead of a Python loop per feature
+    bits = "".join([format(h, "064b") for h in hashes]).encode("ascii")
+    threshold = len(hashes) / 2
+    fingerprint = 0
+    for position in range(SIMHASH_BITS):
+        if bits[position::SIMHASH_BITS].count(b"1") > threshold:
+            fingerprint |= 1 << (SIMHASH_BITS - 1 - position)
+    return fingerprint
+
+
+class NearDuplicateIndex:
+    """SimHash fingerprints (with word bigrams) bucketed by band (pigeonhole: near-duplicates share a band)."""
+
+    __slots__ = ("buckets", "exact")
+
+    BAND_BITS = SIMHASH_BITS // SIMHASH_BANDS
+
+    def __init__(self):
+        self.buckets = [{} for _ in range(SIMHASH_BANDS)]
+        self.exact = set()
+
+    def _bands(self, fingerprint: int):
+        band_mask = (1 << self.BAND_BITS) - 1
+        for band in range(SIMHASH_BANDS):
+            yield band, (fingerprint >> (band * self.BAND_BITS)) & band_mask
+
+    def seen(self, text: str) -> bool:
+        """Whether text duplicates a text added before; adds it otherwise."""
+        key = " ".join(text.split()).lower()
+        if key in self.exact:
+            return True
+        self.exact.add(key)
+
+        words = _WORD_RE.findall(key)
+        if len(words) < SIMHASH_MIN_WORDS:
+            return False
+        fingerprint = simhash(words)
+        bigrams = set(zip(words, words[1:]))
+        for band, value in self._bands(fingerprint):
+            for other, other_bigrams in self.buckets[band].get(value, ()):
+                if (fingerprint ^ other).bit_count() <= NEAR_DUPLICATE_BITS and (
+                    len(bigrams & other_bigrams) >= NEAR_DUPLICATE_JACCARD * len(bigrams | other_bigrams)
+                ):
+                    return True
+        entry = (fingerprint, bigrams)
+        for band, value in self._bands(fingerprint):
+            self.buckets[band].setdefault(value, []).append(entry)
+        return False
+
+
+# ============================================================================
+# Reduction
+# ============================================================================
+
+def reduce_messages(messages: list[str], report: dict, window: int = REDUCE_WINDOW) -> list[str]:
+    """Reduce the newest `window` kept messages of one role (newest first, so duplicates keep their latest copy)."""
+    duplicates = NearDuplicateIndex()
+    kept = []
+    position = len(messages)
+    while position > 0 and len(kept) < window:
+        position -= 1
+        text = messages[position]
+        if is_acknowledgement(text):
+            report["acknowledgements"] += 1
+            continue
+        condensed = condense_logs(text)
+        if condensed is not text:
+            report["condensed_logs"] += 1
+        if duplicates.seen(condensed):
+            report["duplicates"] += 1
+            continue
+        kept.append(condensed)
+
+    kept.reverse()
+    return messages[:position] + kept
+
+
+def message_tokens(content: dict) -> int:
+    """Tokens of all user and assistant messages (for callers that send them all)."""
+    return sum(
+        estimate_tokens(text) for key in ("user_messages", "assistant_messages")
+        for text in content.get(key) or [] if isinstance(text, str)
+    )
+
+
+def reduce_content(content: dict, measure: Callable[[dict], int] = message_tokens) -> dict:
+    """
+    Copy of extract_conversation_content() output with noise removed from
+    the user and assistant messages.
+
+    The copy's "reduction" holds the report: acknowledgements, duplicates,
+    condensed_logs, and tokens_before / tokens_saved as measure() counts
+    the messages the caller packs into its prompt, before and after.
+    """
+    report = {"acknowledgements": 0, "duplicates": 0, "condensed_logs": 0, "tokens_before": 0, "tokens_saved": 0}
+    reduced = dict(content, reduction=report)
+    for key in ("user_messages", "assistant_messages"):
+        messages = content.get(key)
+        if isinstance(messages, list):
+            reduced[key] = reduce_messages([m for m in messages if isinstance(m, str)], report)
+    report["tokens_before"] = measure(content)
+    report["tokens_saved"] = max(0, report["tokens_before"] - measure(reduced))
+    return reduced
@@ -0,0 +1,14 @@
+#!/usr/bin/env python3
+"""
+Paths: Where context-keeper keeps project memories.
+
+Kept free of imports beyond pathlib so the SessionStart fast path can use
+it without loading memory_store.
+"""
+
+from pathlib import Path
+
+
+def get_memories_dir(project_path: str = None) -> Path:
+    """Get the memories directory for the project (default: the current directory)."""
+    return Path(project_path or Path.cwd()) / ".claude" / "memories"
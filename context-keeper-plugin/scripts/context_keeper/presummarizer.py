@@ -0,0 +1,681 @@
+#!/usr/bin/env python3
+"""
+Presummarizer: Optional watcher that summarizes running sessions ahead of compaction.
+
+`context_keeper watch start` launches a background process that tails the
+active transcripts (modified in the last ACTIVE_SECONDS) under
+~/.claude/projects. It waits for changes with inotify (Linux, through
+libc) and, where that is unavailable, polls the transcripts' size and mtime
+every POLL_SECONDS.
+
+When the messages a session added since its last compaction, or since its
+last chunk, reach CONTEXT_KEEPER_PRESUMMARIZE_TOKENS (estimated after the
+noise filter), the watcher summarizes them with the fast model
+(model_router) into a chunk, kept in the session's memory directory:
+
+  .claude/memories/<session_id>/presummary.json
+    {"transcript", "last_compact_time", "checked_size",
+     "chunks": [{"after", "start_time", "end_time", "message_count",
+                 "files_modified", "summary", "model", "created"}]}
+
+Each chunk starts where the one before it ended (its `after` is the
+previous chunk's `end_time`, or the compaction boundary). A delta too large
+for one chunk prompt (the watcher started late, long pasted messages) is
+split into consecutive chunks that each fit whole (split_delta()), so a
+chunk's `end_time` is always the last message its summary has seen. At PreCompact,
+save_memory.main() takes the chunks of the session's current boundary,
+parses only the messages after the last one, and puts the chunk summaries
+in front of them (content["chunk_summaries"]), so the LLM reads a few
+short summaries and a small tail instead of the whole delta. Chunks of an
+earlier boundary are ignored, and the file is removed once the memory is
+saved.
+
+Usage:
+  context_keeper watch start    # Start in the background
+  context_keeper watch stop     # Stop a running watcher
+  context_keeper watch status   # Show pid, mode and chunks summarized
+  context_keeper watch run      # Run in the foreground
+
+Environment variables:
+  CONTEXT_KEEPER_PRESUMMARIZE - 1 (default) to summarize chunks and use them at PreCompact, 0 to ignore them
+  CONTEXT_KEEPER_PRESUMMARIZE_TOKENS - new tokens that make a chunk (default 10000)
+  CONTEXT_KEEPER_TRANSCRIPTS_DIR - where Claude Code writes transcripts (default ~/.claude/projects)
+  CONTEXT_KEEPER_WATCH_MODE - auto (default), inotify or poll
+"""
+
+import json
+import logging
+import os
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from .memory_store import get_setting, get_state_dir, read_json, write_json
+from .paths import get_memories_dir
+from .session_context import estimate_tokens
+
+PACKAGE_DIR = str(Path(__file__).resolve().parent)
+
+# ============================================================================
+# Configuration
+# ============================================================================
+
+PRESUMMARY_FILE = "presummary.json"
+STATUS_FILE = "watcher.json"
+LOG_FILE = "watcher.log"
+
+DEFAULT_CHUNK_TOKENS = 10000
+# Only transcripts modified this recently are summarized
+ACTIVE_SECONDS = 30 * 60
+POLL_SECONDS = 5.0
+# A transcript is looked at no more often than this (Claude Code appends line by line)
+SETTLE_SECONDS = 10.0
+IDLE_WAIT_SECONDS = 60.0
+# The delta is extracted again only after the transcript grew this much
+RECHECK_BYTES = 64 * 1024
+START_TIMEOUT_SECONDS = 10
+
+# One chunk summary call: up to half the characters per role (each message
+# cut to CHUNK_MESSAGE_MAX_CHARS) and CHUNK_TOOL_CALLS tool calls
+CHUNK_DEADLINE_SECONDS = 120.0
+CHUNK_PROMPT_MAX_CHARS = 48000
+CHUNK_MESSAGE_MAX_CHARS = 2000
+CHUNK_TOOL_CALLS = 50
+# Chunk summaries in the PreCompact prompt (the newest that fit)
+CHUNK_SUMMARIES_MAX_CHARS = 16000
+
+# inotify(7)
+IN_MODIFY = 0x00000002
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_ISDIR = 0x40000000
+IN_EVENT_HEADER = 16  # struct inotify_event (wd, mask, cookie, len) before its name
+
+
+def presummarize_enabled() -> bool:
+    value = get_setting("CONTEXT_KEEPER_PRESUMMARIZE", "1") or "1"
+    return value.strip().lower() not in ("0", "false", "no", "off")
+
+
+def chunk_tokens() -> int:
+    try:
+        return max(1, int(get_setting("CONTEXT_KEEPER_PRESUMMARIZE_TOKENS", "") or DEFAULT_CHUNK_TOKENS))
+    except ValueError:
+        return DEFAULT_CHUNK_TOKENS
+
+
+def get_transcripts_dir() -> Path:
+    configured = get_setting("CONTEXT_KEEPER_TRANSCRIPTS_DIR")
+    return Path(configured).expanduser() if configured else Path.home() / ".claude" / "projects"
+
+
+def get_presummary_path(session_id: str, project_path: str = None) -> Path:
+    return get_memories_dir(project_path) / session_id / PRESUMMARY_FILE
+
+
+# ============================================================================
+# Chunks (PreCompact side)
+# ============================================================================
+
+def load_chunks(session_id: str, project_path: str, last_compact_time: str | None) -> list[dict]:
+    """The session's chunks if they start at `last_compact_time` and follow each other, else []."""
+    try:
+        state = read_json(get_presummary_path(session_id, project_path))
+    except FileNotFoundError:
+        return []
+    except (OSError, ValueError) as e:
+        logging.warning(f"Ignoring unreadable pre-summary: {e}")
+        return []
+    if state.get("last_compact_time") != last_compact_time:
+        return []
+    chunks = state.get("chunks") or []
+    after = last_compact_time
+    for chunk in chunks:
+        if chunk.get("after") != after or not chunk.get("summary") or not chunk.get("end_time"):
+            logging.warning("Ignoring pre-summary chunks that do not follow each other")
+            return []
+        after = chunk["end_time"]
+    return chunks
+
+
+def discard_chunks(session_id: str, project_path: str):
+    get_presummary_path(session_id, project_path).unlink(missing_ok=True)
+
+
+def add_chunks(content: dict, chunks: list[dict]) -> dict:
+    """Content of the messages after the chunks, extended to cover them (as the earlier part of the delta)."""
+    if not chunks:
+        return content
+    combined = dict(content)
+    combined["chunk_summaries"] = [chunk["summary"] for chunk in chunks]
+    combined["files_modified"] = list(dict.fromkeys(
+        [path for chunk in chunks for path in chunk.get("files_modified") or []] + (content.get("files_modified") or [])
+    ))
+    combined["message_count"] = sum(chunk.get("message_count", 0) for chunk in chunks) + content.get("message_count", 0)
+    combined["start_time"] = chunks[0].get("start_time") or content.get("start_time")
+    combined["end_time"] = content.get("end_time") or chunks[-1]["end_time"]
+    return combined
+
+
+def chunks_prompt(summaries: list[str], max_chars: int = CHUNK_SUMMARIES_MAX_CHARS) -> str:
+    """Chunk summaries for a prompt, oldest first; the oldest are dropped beyond max_chars."""
+    kept = []
+    size = 0
+    for summary in reversed(summaries):
+        if kept and size + len(summary) > max_chars:
+            break
+        kept.append(summary)
+        size += len(summary)
+    kept.reverse()
+    parts = [f'<part index="{i}">\n{summary.strip()}\n</part>' for i, summary in enumerate(kept, 1)]
+    if len(kept) < len(summaries):
+        parts.insert(0, f"[{len(summaries) - len(kept)} older parts omitted]")
+    return "\n\n".join(parts)
+
+
+# ============================================================================
+# Chunk Summaries (watcher side)
+# ============================================================================
+
+def content_tokens(content: dict) -> int:
+    texts = (content.get("user_messages") or []) + (content.get("assistant_messages") or [])
+    return sum(estimate_tokens(text) for text in texts if isinstance(text, str))
+
+
+def _prompt_chars(texts: list[str]) -> int:
+    return sum(min(len(text), CHUNK_MESSAGE_MAX_CHARS) for text in texts if isinstance(text, str) and text.strip())
+
+
+def split_delta(messages: list[dict], after: str | None) -> list[list[dict]]:
+    """Transcript messages in consecutive groups whose content fits one chunk prompt whole."""
+    from .save_memory import extract_conversation_content
+
+    groups, group = [], []
+    user_chars = assistant_chars = tool_calls = 0
+    for message in messages:
+        part = extract_conversation_content([message], start_cutoff=after)
+        user, assistant = _prompt_chars(part["user_messages"]), _prompt_chars(part["assistant_messages"])
+        tools = len(part["tool_calls"])
+        if group and (user_chars + user > CHUNK_PROMPT_MAX_CHARS // 2
+                      or assistant_chars + assistant > CHUNK_PROMPT_MAX_CHARS // 2
+                      or tool_calls + tools > CHUNK_TOOL_CALLS):
+            groups.append(group)
+            group = []
+            user_chars = assistant_chars = tool_calls = 0
+        group.append(message)
+        user_chars += user
+        assistant_chars += assistant
+        tool_calls += tools
+    if group:
+        groups.append(group)
+    return groups
+
+
+def _newest_that_fit(texts: list[str], max_chars: int) -> list[str]:
+    kept = []
+    for text in reversed([t for t in texts if isinstance(t, str) and t.strip()]):
+        text = text[:CHUNK_MESSAGE_MAX_CHARS]
+        if len(text) > max_chars:
+            break
+        kept.append(text)
+        max_chars -= len(text)
+    kept.reverse()
+    return kept
+
+
+def chunk_message_sections(content: dict) -> tuple[str, str]:
+    """The user and assistant message sections as build_chunk_prompt() packs them."""
+    return tuple(
+        json.dumps(_newest_that_fit(content.get(key) or [], CHUNK_PROMPT_MAX_CHARS // 2), indent=2, ensure_ascii=False)
+        for key in ("user_messages", "assistant_messages")
+    )
+
+
+def chunk_message_tokens(content: dict) -> int:
+    """Tokens of the message sections of a chunk prompt (the noise filter's measure)."""
+    return sum(estimate_tokens(section) for section in chunk_message_sections(content))
+
+
+def build_chunk_prompt(content: dict) -> str:
+    user_section, assistant_section = chunk_message_sections(content)
+    tool_calls = [
+        f"- {call.tool}: {json.dumps(call.input, ensure_ascii=False)[:200]}"
+        for call in (content.get("tool_calls") or [])[-CHUNK_TOOL_CALLS:]
+    ]
+    return f"""Summarize this part of a running Claude Code session. It will be combined with the
+summaries of the other parts into the session's memory later, so record facts, not impressions.
+
+Use exactly these markdown sections, with short bullets (at most about 300 words in total):
+
+## Topics Discussed
+## Code Changes
+## Decisions Made
+## Key Outcomes
+## Context for Continuation
+
+Keep file paths, error messages and decisions with their rationale. Leave out acknowledgements,
+the assistant's reasoning and raw logs. Write "- None identified" under a section with nothing to say.
+
+## User Messages
+{user_section}
+
+## Assistant Responses
+{assistant_section}
+
+## Tool Calls
+{chr(10).join(tool_calls) or "- None"}
+
+## Files Modified
+{chr(10).join(f"- {path}" for path in content.get("files_modified") or []) or "- None"}
+
+Return only the markdown."""
+
+
+def summarize_chunk(content: dict, session_info: dict) -> tuple[str, str] | None:
+    """(summary, model) of a chunk's content from the fast model, or None."""
+    from .deadline import Deadline
+    from .model_router import get_models
+    from .save_memory import call_llm, get_summary_config, record_llm_call
+
+    api_key, api_url, configured_model = get_summary_config()
+    if not api_key:
+        logging.info("No API key found (set CLAUDE_SUMMARY_API_KEY), not summarizing chunks")
+        return None
+
+    import anthropic
+
+    client_args = {"api_key": api_key, "max_retries": 0}
+    if api_url:
+        client_args["base_url"] = api_url
+    client = anthropic.Anthropic(**client_args)
+
+    model = get_models(configured_model)[0]
+    prompt = build_chunk_prompt(content)
+    call = {
+        "model": model, "route": "presummarize", "prompt_tokens": estimate_tokens(prompt),
+        "retries": 0, "ttft_ms": None, "latency_ms": None, "rate_wait_ms": 0.0,
+        "tokens_saved": content.get("reduction", {}).get("tokens_saved", 0),
+    }
+    response = None
+    try:
+        response = call_llm(client, model, prompt, call, api_key, Deadline(CHUNK_DEADLINE_SECONDS))
+    except Exception as e:
+        logging.error(f"Chunk summary failed: {e}")
+        return None
+    finally:
+        record_llm_call(call, response, session_info)
+
+    summary = "".join(getattr(block, "text", "") for block in response.content or []).strip()
+    return (summary, model) if summary else None
+
+
+def transcript_session(path: Path) -> tuple[str, str | None]:
+    """(session_id, cwd) of a transcript: its file name and the cwd its first lines record."""
+    cwd = None
+    try:
+        with open(path, "rb") as f:
+            for _ in range(20):
+                line = f.readline()
+                if not line:
+                    break
+                try:
+                    cwd = json.loads(line).get("cwd")
+                except (ValueError, AttributeError):
+                    continue
+                if cwd:
+                    break
+    except OSError:
+        pass
+    return path.stem, cwd
+
+
+def presummarize(path: Path, stats: dict) -> bool:
+    """
+    Summarize a transcript's messages since its last chunk if there are
+    enough, in as many chunks as they need (split_delta()); a last group
+    below the threshold is left for later. Returns True if a chunk was added.
+    """
+    from .noise_filter import filter_enabled, reduce_content
+    from .save_memory import extract_conversation_content, get_last_compact_time
+    from .transcript_cache import parse_transcript
+
+    try:
+        size = path.stat().st_size
+    except OSError:
+        return False
+    session_id, cwd = transcript_session(path)
+    if not cwd:
+        return False
+
+    boundary = get_last_compact_time(session_id, cwd, str(path))
+    state_path = get_presummary_path(session_id, cwd)
+    try:
+        state = read_json(state_path)
+    except (OSError, ValueError):
+        state = {}
+    if state.get("transcript") != str(path) or state.get("last_compact_time") != boundary:
+        state = {"transcript": str(path), "last_compact_time": boundary, "checked_size": 0, "chunks": []}
+    if size - state["checked_size"] < RECHECK_BYTES:
+        return False
+
+    chunks = state["chunks"]
+    after = chunks[-1]["end_time"] if chunks else boundary
+    messages = parse_transcript(str(path), after=after)
+    content = extract_conversation_content(messages, start_cutoff=after)
+    if filter_enabled():
+        content = reduce_content(content)
+    tokens = content_tokens(content)
+    state["checked_size"] = size
+
+    added = False
+    groups = split_delta(messages, after) if tokens >= chunk_tokens() else []
+    for group in groups:
+        content = extract_conversation_content(group, start_cutoff=after)
+        if filter_enabled():
+            content = reduce_content(content, chunk_message_tokens)
+        tokens = content_tokens(content)
+        if not content.get("end_time") or (added and tokens < chunk_tokens()):
+            break
+        logging.info(f"[context-keeper] Summarizing {tokens} new tokens of session {session_id[:8]}")
+        result = summarize_chunk(content, {"session_id": session_id, "cwd": cwd})
+        if not result:
+            stats["failures"] += 1
+            break  # Chunks must follow each other; the rest waits for the next look
+        summary, model = result
+        chunks.append({
+            "after": after,
+            "start_time": content.get("start_time"),
+            "end_time": content["end_time"],
+            "message_count": content.get("message_count", 0),
+            "files_modified": content.get("files_modified") or [],
+            "summary": summary,
+            "model": model,
+            "created": datetime.now().astimezone().isoformat(),
+        })
+        after = content["end_time"]
+        stats["chunks"] += 1
+        stats["tokens"] += tokens
+        stats["last_chunk"] = {"session_id": session_id, "tokens": tokens, "at": chunks[-1]["created"]}
+        added = True
+    state_path.parent.mkdir(parents=True, exist_ok=True)
+    write_json(state_path, state, "json")
+    return added
+
+
+# ============================================================================
+# Transcript Changes
+# ============================================================================
+
+def active_transcripts(root: Path) -> list[Path]:
+    cutoff = time.time() - ACTIVE_SECONDS
+    transcripts = []
+    for path in root.glob("*/*.jsonl"):
+        try:
+            if path.stat().st_mtime >= cutoff:
+                transcripts.append(path)
+        except OSError:
+            continue
+    return transcripts
+
+
+class InotifySource:
+    """Transcripts written to, from inotify events on the root and its project directories."""
+
+    mode = "inotify"
+
+    def __init__(self, root: Path):
+        import ctypes
+        import ctypes.util
+
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.root = root
+        self.dirs = {}  # Watch descriptor -> directory
+        self._watch(root, IN_CREATE | IN_MOVED_TO)
+        for directory in root.iterdir():
+            if directory.is_dir():
+                self._watch(directory)
+
+    def _watch(self, directory: Path, mask: int = IN_MODIFY | IN_CREATE | IN_MOVED_TO):
+        import ctypes
+
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), mask)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"cannot watch {directory}")
+        self.dirs[wd] = directory
+
+    def changed(self, timeout: float) -> set[Path]:
+        import select
+        import struct
+
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+
+        changed = set()
+        position = 0
+        while position + IN_EVENT_HEADER <= len(data):
+            wd, mask, _, length = struct.unpack_from("iIII", data, position)
+            name = data[position + IN_EVENT_HEADER:position + IN_EVENT_HEADER + length].rstrip(b"\0")
+            position += IN_EVENT_HEADER + length
+            if mask & IN_Q_OVERFLOW:
+                changed.update(active_transcripts(self.root))  # Events were lost
+                continue
+            directory = self.dirs.get(wd)
+            if directory is None or not name:
+                continue
+            path = directory / os.fsdecode(name)
+            if directory == self.root:
+                if mask & IN_ISDIR:
+                    try:
+                        self._watch(path)  # A new project
+                    except OSError as e:
+                        logging.warning(f"{e}")
+            elif path.suffix == ".jsonl":
+                changed.add(path)
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingSource:
+    """Transcripts written to, from their size and mtime every POLL_SECONDS."""
+
+    mode = "poll"
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.seen = {}
+
+    def changed(self, timeout: float) -> set[Path]:
+        time.sleep(min(timeout, POLL_SECONDS))
+        changed = set()
+        current = {}
+        for path in active_transcripts(self.root):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            current[path] = (stat.st_size, stat.st_mtime_ns)
+            if self.seen.get(path) != current[path]:
+                changed.add(path)
+        self.seen = current
+        return changed
+
+    def close(self):
+        pass
+
+
+def open_source(root: Path):
+    """inotify where available (unless CONTEXT_KEEPER_WATCH_MODE=poll), polling otherwise."""
+    mode = (get_setting("CONTEXT_KEEPER_WATCH_MODE", "auto") or "auto").strip().lower()
+    if mode != "poll" and sys.platform.startswith("linux"):
+        try:
+            return InotifySource(root)
+        except (OSError, AttributeError) as e:
+            if mode == "inotify":
+                raise
+            logging.warning(f"inotify unavailable ({e}), polling transcripts every {POLL_SECONDS:.0f}s")
+    return PollingSource(root)
+
+
+# ============================================================================
+# Watcher
+# ============================================================================
+
+def get_status_path() -> Path:
+    return get_state_dir() / STATUS_FILE
+
+
+def read_status() -> dict | None:
+    """The running watcher's status, or None."""
+    try:
+        status = read_json(get_status_path())
+        os.kill(status["pid"], 0)
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    return status
+
+
+def serve() -> int:
+    """Watch transcripts in the foreground until stopped."""
+    import signal
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    if not presummarize_enabled():
+        print("[context-keeper] watcher: CONTEXT_KEEPER_PRESUMMARIZE=0, not watching", file=sys.stderr)
+        return 1
+    running = read_status()
+    if running is not None and running["pid"] != os.getpid():
+        print(f"[context-keeper] watcher already running (pid {running['pid']})", file=sys.stderr)
+        return 1
+    root = get_transcripts_dir()
+    if not root.is_dir():
+        print(f"[context-keeper] watcher: no transcripts directory {root}", file=sys.stderr)
+        return 1
+
+    def _stop(signum, frame):
+        raise SystemExit(0)
+
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGHUP, _stop)
+
+    source = open_source(root)
+    stats = {
+        "pid": os.getpid(), "mode": source.mode, "root": str(root), "threshold_tokens": chunk_tokens(),
+        "started": datetime.now().astimezone().isoformat(), "chunks": 0, "tokens": 0, "failures": 0,
+        "last_chunk": None,
+    }
+    status_path = get_status_path()
+    status_path.parent.mkdir(parents=True, exist_ok=True)
+    write_json(status_path, stats, "json")
+    print(f"[context-keeper] watcher {os.getpid()} watching {root} ({source.mode})", file=sys.stderr)
+
+    due = {path: 0.0 for path in active_transcripts(root)}  # Transcript -> when to look at it
+    looked = {}
+    try:
+        while True:
+            now = time.monotonic()
+            timeout = max(0.0, min(due.values()) - now) if due else IDLE_WAIT_SECONDS
+            for path in source.changed(timeout):
+                due.setdefault(path, looked.get(path, 0.0) + SETTLE_SECONDS)
+            now = time.monotonic()
+            for path in [path for path, when in due.items() if when <= now]:
+                del due[path]
+                looked[path] = now
+                try:
+                    if presummarize(path, stats):
+                        write_json(status_path, stats, "json")
+                except Exception as e:
+                    logging.error(f"Pre-summarizing {path} failed: {e}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        source.close()
+        if (read_status() or {}).get("pid") == os.getpid():
+            status_path.unlink(missing_ok=True)
+    return 0
+
+
+def start() -> int:
+    """Start the watcher in the background and wait until it runs."""
+    import subprocess
+
+    status = read_status()
+    if status is not None:
+        print(f"Watcher already running (pid {status['pid']})")
+        return 0
+
+    state_dir = get_state_dir()
+    state_dir.mkdir(parents=True, exist_ok=True)
+    with open(state_dir / LOG_FILE, "ab") as log:
+        process = subprocess.Popen(
+            [sys.executable, PACKAGE_DIR, "watch", "run"],
+            stdin=subprocess.DEVNULL, stdout=log, stderr=log,
+            start_new_session=True,
+        )
+
+    deadline = time.monotonic() + START_TIMEOUT_SECONDS
+    while time.monotonic() < deadline:
+        status = read_status()
+        if status is not None and status["pid"] == process.pid:
+            print(f"Watcher started (pid {process.pid}, {status['mode']}) on {status['root']}")
+            return 0
+        if process.poll() is not None:
+            break
+        time.sleep(0.05)
+
+    print(f"Watcher did not start; see {state_dir / LOG_FILE}", file=sys.stderr)
+    return 1
+
+
+def stop() -> int:
+    import signal
+
+    status = read_status()
+    if status is None:
+        print("Watcher not running")
+        return 0
+    os.kill(status["pid"], signal.SIGTERM)
+    deadline = time.monotonic() + START_TIMEOUT_SECONDS
+    while time.monotonic() < deadline and read_status() is not None:
+        time.sleep(0.05)
+    print(f"Watcher stopped (pid {status['pid']})")
+    return 0
+
+
+def show_status() -> int:
+    status = read_status()
+    if status is None:
+        print(f"Watcher not running ({get_status_path()})")
+        return 1
+    print(f"Watcher running (pid {status['pid']}, {status['mode']})")
+    print(f"  Transcripts: {status['root']}")
+    print(f"  Started:     {status['started']}")
+    print(f"  Threshold:   {status['threshold_tokens']} tokens per chunk")
+    print(f"  Chunks:      {status['chunks']} ({status['tokens']} tokens summarized, {status['failures']} failed)")
+    if status.get("last_chunk"):
+        last = status["last_chunk"]
+        print(f"  Last chunk:  session {last['session_id'][:8]}, {last['tokens']} tokens at {last['at']}")
+    return 0
+
+
+def main():
+    actions = {"start": start, "stop": stop, "status": show_status, "run": serve}
+    action = sys.argv[1] if len(sys.argv) > 1 else "status"
+    if action not in actions:
+        print(f"usage: context_keeper watch {{{'|'.join(actions)}}}", file=sys.stderr)
+        sys.exit(2)
+    sys.exit(actions[action]())
+
+
+if __name__ == "__main__":
+    main()
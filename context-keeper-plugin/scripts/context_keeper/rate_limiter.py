@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Rate Limiter: Requests/min and tokens/min limits shared by all hook processes.
+
+Every save_memory.py process calls the summary API on its own; when many
+sessions compact at once (parallel sessions, CI fleets) they would together
+exceed the API key's rate limits and trigger 429 storms. Before each request
+call_llm() reserves capacity here, in two token buckets per API key (one for
+requests, one for tokens) kept in $CONTEXT_KEEPER_HOME/rate_limits.db.
+
+Reservations are made in one IMMEDIATE SQLite transaction: a bucket may go
+negative, and the caller then sleeps until its reservation is covered by the
+refill. Later callers queue behind earlier ones, so waiting is first come,
+first served without polling. A caller whose wait would exceed its
+deadline reserves nothing and gives up (RateLimitTimeout). After the call
+the token reservation is settled against the actual usage (an attempt that
+fails or runs out of time returns all of it), and a 429 from the API
+empties the buckets so that other processes back off too.
+
+API keys are stored only as a truncated SHA-256 digest.
+
+Environment variables:
+  CONTEXT_KEEPER_RATE_RPM - requests per minute per API key (default 50, 0 = unlimited)
+  CONTEXT_KEEPER_RATE_TPM - tokens (input + output) per minute per API key
+                            (default 100000, 0 = unlimited)
+"""
+
+import hashlib
+import sqlite3
+import time
+from pathlib import Path
+
+from .memory_store import get_setting, get_state_dir
+
+# ============================================================================
+# Configuration
+# ============================================================================
+
+DB_FILE = "rate_limits.db"
+DEFAULT_RPM = 50
+DEFAULT_TPM = 100000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS buckets (
+    key TEXT PRIMARY KEY,
+    requests REAL NOT NULL,
+    tokens REAL NOT NULL,
+    updated REAL NOT NULL
+);
+"""
+
+
+class RateLimitTimeout(Exception):
+    """Capacity would not be available before the caller's deadline."""
+
+    def __init__(self, wait: float, max_wait: float):
+        super().__init__(f"rate limit wait {wait:.1f}s exceeds the {max(0.0, max_wait):.1f}s left")
+        self.wait = wait
+
+
+def _limit(name: str, default: int) -> int:
+    try:
+        return max(0, int(get_setting(name, str(default)) or default))
+    except ValueError:
+        return default
+
+
+def get_limits() -> tuple[int, int]:
+    """(requests per minute, tokens per minute); 0 means unlimited."""
+    return _limit("CONTEXT_KEEPER_RATE_RPM", DEFAULT_RPM), _limit("CONTEXT_KEEPER_RATE_TPM", DEFAULT_TPM)
+
+
+def key_id(api_key: str) -> str:
+    return hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:16]
+
+
+def open_limiter(path: Path = None) -> sqlite3.Connection:
+    path = path or get_state_dir() / DB_FILE
+    # Explicit transactions; concurrent writers wait on the database lock
+    conn = sqlite3.connect(str(path), timeout=30, isolation_level=None)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+# ============================================================================
+# Buckets
+# ============================================================================
+
+def _refill(row, now: float, rpm: int, tpm: int) -> tuple[float, float]:
+    if row is None:
+        return float(rpm), float(tpm)
+    requests, tokens, updated = row
+    elapsed = max(0.0, now - updated)
+    return min(rpm, requests + elapsed * rpm / 60), min(tpm, tokens + elapsed * tpm / 60)
+
+
+def reserve(conn: sqlite3.Connection, key: str, tokens: int, max_wait: float,
+            limits: tuple[int, int] = None) -> float:
+    """
+    Reserve one request and `tokens` tokens; returns the seconds to wait before sending.
+
+    Raises RateLimitTimeout (reserving nothing) if the wait would exceed max_wait.
+    """
+    rpm, tpm = limits or get_limits()
+    # A dimension without a limit is tracked as always full
+    rpm_cap, tpm_cap = rpm or 1, tpm or 1
+    tokens = min(tokens, tpm_cap) if tpm else 0
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        now = time.time()
+        row = conn.execute("SELECT requests, tokens, updated FROM buckets WHERE key = ?", (key,)).fetchone()
+        requests_left, tokens_left = _refill(row, now, rpm_cap, tpm_cap)
+        requests_left -= 1 if rpm else 0
+        tokens_left -= tokens
+
+        wait = max(0.0, -requests_left * 60 / rpm_cap, -tokens_left * 60 / tpm_cap)
+        if wait > max_wait:
+            conn.execute("ROLLBACK")
+            raise RateLimitTimeout(wait, max_wait)
+
+        conn.execute(
+            "INSERT OR REPLACE INTO buckets (key, requests, tokens, updated) VALUES (?, ?, ?, ?)",
+            (key, requests_left, tokens_left, now),
+        )
+        conn.execute("COMMIT")
+        return wait
+    except sqlite3.Error:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def settle(conn: sqlite3.Connection, key: str, reserved: int, used: int, limits: tuple[int, int] = None):
+    """Return unused reserved tokens (or charge the overrun) after a call."""
+    _, tpm = limits or get_limits()
+    if not tpm or reserved == used:
+        return
+    conn.execute(
+        "UPDATE buckets SET tokens = MIN(?, tokens + ?) WHERE key = ?",
+        (tpm, min(reserved, tpm) - used, key),
+    )
+
+
+def drain(conn: sqlite3.Connection, key: str):
+    """Empty the key's buckets after a 429 so every process backs off."""
+    conn.execute(
+        "UPDATE buckets SET requests = MIN(requests, 0), tokens = MIN(tokens, 0), updated = ? WHERE key = ?",
+        (time.time(), key),
+    )
+
+
+def acquire(conn: sqlite3.Connection, key: str, tokens: int, max_wait: float) -> float:
+    """Reserve capacity and sleep until it is available; returns the seconds waited."""
+    wait = reserve(conn, key, tokens, max_wait)
+    if wait > 0:
+        time.sleep(wait)
+    return wait
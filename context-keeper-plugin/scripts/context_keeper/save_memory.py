@@ -0,0 +1,1643 @@
+#!/usr/bin/env python3
+"""
+Save Memory Script: Summarizes and persists Claude Code sessions before compaction.
+
+This script triggers before context compaction (manual /compact or automatic).
+It reads the full transcript, generates a memory, and saves it locally.
+
+Input (stdin): JSON with session metadata
+Output (stdout): Status message for user
+Exit codes:
+  0 - Success
+  1 - Non-blocking error (logged but doesn't block compaction)
+
+Environment variables:
+  CLAUDE_SUMMARY_API_KEY - Dedicated API key for Claude summarization (required for LLM memory)
+  CLAUDE_SUMMARY_API_URL - Custom API base URL (optional, e.g., for proxy or region)
+  CLAUDE_SUMMARY_MODEL - model used to summerize the memeory
+  CONTEXT_KEEPER_STORAGE_FORMAT - json (default), gzip, zstd or auto for memory/metadata files
+  CONTEXT_KEEPER_DEDUP - 1 (default) to deduplicate memory sections in .claude/memories/objects/
+  CONTEXT_KEEPER_ROLLING - 1 (default) to fold the session's previous memory into each new one
+  CONTEXT_KEEPER_DEADLINE - seconds the whole run may take (default 90; see deadline.py)
+  CONTEXT_KEEPER_CHECKPOINTS - 1 (default) to checkpoint each run so a killed one can resume (see summary_jobs.py)
+  CONTEXT_KEEPER_PRESUMMARIZE - 1 (default) to use the chunks `context_keeper watch` summarized (see presummarizer.py)
+  CONTEXT_KEEPER_TRIVIAL_SCORE - deltas scoring up to this are recorded without the LLM (default 4; see change_detector.py)
+"""
+
+import argparse
+import json
+import logging
+import os
+import re
+import sys
+import time
+import traceback
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional
+from .memory_store import (
+    ORDERED_INDEX,
+    append_ordered_index,
+    context_token_budget,
+    ensure_ordered_index,
+    entry_time,
+    get_setting,
+    get_state_dir,
+    load_earlier_memories,
+    load_memory_content,
+    load_session_aggregates,
+    make_index_entry,
+    read_json,
+    split_sections,
+    stored_exists,
+    update_session_aggregates,
+    write_json,
+    write_memory,
+)
+from .paths import get_memories_dir
+from .conversation import USER, Message, Timeline, ToolCall, iter_conversation
+from .session_context import write_session_start
+from . import hook_trace
+from .llm_ledger import estimate_cost, record_call, usage_from_response
+from .model_router import record_latency, route_model
+from .noise_filter import filter_enabled, reduce_content
+from .extractive_summary import fallback_enabled as extractive_fallback_enabled, summarize_extractive
+from .session_context import estimate_tokens
+from .deadline import Deadline, DeadlineExceeded
+from .change_detector import SUMMARY_SOURCE as DELTA_NOTE_SOURCE, append_note, delta_note, is_trivial, measure_delta
+from .presummarizer import add_chunks, chunks_prompt, discard_chunks, load_chunks, presummarize_enabled
+from .summary_jobs import JOBS_DIR, SummaryJob, checkpoints_enabled, iter_open_jobs, merge_content
+from .transcript_cache import decode_budget, decoded_bytes, load_index, messages_after, parse_transcript, read_tail
+
+
+
+
+# ============================================================================
+# MCP Import
+# ============================================================================
+
+# ============================================================================
+# Configuration
+# ============================================================================
+
+
+# ============================================================================
+# Configuration
+# ============================================================================
+
+MAX_TOKENS = 4000
+
+# Post-LLM fan-out: local sinks run concurrently and are always waited for;
+# the Nowledge push runs in the background and is waited for at most this long
+LOCAL_WRITE_WORKERS = 4
+NOWLEDGE_WAIT_SECONDS = 5
+NOWLEDGE_URL = "http://127.0.0.1:14242/memories"
+
+# Pushes deferred for lack of time wait here (under the state dir) for the
+# next run whose push succeeds; the oldest are dropped beyond this many
+NOWLEDGE_OUTBOX = "nowledge-outbox"
+NOWLEDGE_OUTBOX_MAX = 20
+
+# Transient API failures are retried here (the SDK's own retries are off so
+# they can be counted in the LLM ledger)
+LLM_MAX_RETRIES = 2
+LLM_RETRY_BACKOFF_SECONDS = 1.0
+
+# Waiting for shared rate-limit capacity (rate_limiter.py) must leave at
+# least this much of the summarization budget for the call itself
+RATE_LIMIT_MIN_CALL_SECONDS = 15
+
+# Cap on the previous memory fed back in rolling mode (~4k tokens, the size
+# of one LLM output), so the prompt stays bounded however often a session compacts
+PREVIOUS_MEMORY_MAX_CHARS = 16000
+
+# ============================================================================
+# Type Safety Helpers
+# ============================================================================
+
+def ensure_list(value, default=None):
+    """Ensure value is a list, return default or empty list if not."""
+    if isinstance(value, list):
+        return value
+    return default if default is not None else []
+
+def ensure_string(value, default=""):
+    """Ensure value is a string, return default if not."""
+    if isinstance(value, str):
+        return value
+    return default
+
+# ============================================================================
+# Logging Configuration
+# ============================================================================
+
+def configure_logging():
+    # Called by the hook entry point rather than at import, so modules that
+    # import this one (benchmarks, the daemon) keep their own logging
+    logging.basicConfig(
+        level=logging.DEBUG,
+        format='[%(asctime)s] [%(funcName)s] %(levelname)s: %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S',
+        handlers=[
+            logging.FileHandler('/tmp/context-keeper-memory-debug.log'),
+            logging.StreamHandler(sys.stdout),
+            logging.StreamHandler(sys.stderr)
+        ]
+    )
+
+
+# ============================================================================
+# Transcript Parsing
+# ============================================================================
+
+def extract_conversation_content(messages: list[dict], start_cutoff: Optional[str] = None) -> dict:
+    """
+    Extract user and assistant messages, identifying tools and modified files.
+
+    Collects the records of conversation.iter_conversation(): texts as
+    strings, tool calls as ToolCall records, modified files as paths.
+
+    Args:
+        messages: List of message dictionaries
+        start_cutoff: Optional timestamp (ISO string). If provided, only messages created AFTER this time are included.
+    """
+    user_messages = []
+    assistant_messages = []
+    tool_calls = []
+    files_modified = set()
+    timeline = Timeline()
+
+    # Ensure we have a list of messages
+    if not isinstance(messages, list):
+        logging.debug(f"Expected list of messages, got {type(messages)}")
+        messages = []
+
+    for record in iter_conversation(messages, start_cutoff, timeline):
+        if type(record) is Message:
+            (user_messages if record.role == USER else assistant_messages).append(record.text)
+        elif type(record) is ToolCall:
+            tool_calls.append(record)
+        else:
+            files_modified.add(record.path)
+
+    logging.debug(f"Extracted {len(user_messages)} user msgs, {len(assistant_messages)} assistant msgs")
+    logging.debug(f"Found {len(tool_calls)} tool calls, {len(files_modified)} modified files")
+    logging.debug(f"Session timeline: {timeline.start} to {timeline.end}")
+
+    return {
+        "user_messages": user_messages,
+        "assistant_messages": assistant_messages,
+        "tool_calls": tool_calls,
+        "files_modified": list(files_modified),
+        "message_count": len(user_messages) + len(assistant_messages),
+        "start_time": timeline.start,
+        "end_time": timeline.end
+    }
+
+
+# ============================================================================
+# Summary Generation
+# ============================================================================
+
+def get_summary_config() -> tuple[str | None, str | None, str | None]:
+    """
+    Get summary API configuration from ~/.claude/settings.json.
+    Returns: (api_key, api_url, model_name)
+    """
+    config_path = Path.home() / ".claude" / "settings.json"
+    logging.debug(f"Reading summary config from: {config_path}")
+
+    if not config_path.exists():
+        logging.debug(f"Config file not found: {config_path}")
+        return None, None, None
+
+    try:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        
+        env = config.get("env", {})
+        logging.debug(f"Loaded env keys: {list(env.keys())}")
+        
+        api_key = env.get("CLAUDE_SUMMARY_API_KEY")
+        api_url = env.get("CLAUDE_SUMMARY_API_URL")
+        model = env.get("CLAUDE_SUMMARY_MODEL")
+        
+        # Log masked key for debugging
+        if api_key:
+            masked = api_key[:4] + "..." + api_key[-4:] if len(api_key) > 10 else "***"
+            logging.debug(f"Found API key: {masked}")
+        else:
+            logging.debug("API key not found")
+            
+        logging.debug(f"Found URL: {api_url}")
+        logging.debug(f"Found model: {model}")
+        
+        return api_key, api_url, model
+        
+    except Exception as e:
+        logging.warning(f"Failed to read {config_path}: {e}")
+        return None, None, None
+
+
+def prompt_message_sections(content: dict) -> tuple[str, str]:
+    """The user and assistant message sections as generate_memory_with_llm() packs them into the prompt."""
+    user_msgs = ensure_list(content.get('user_messages', []))[-20:]
+    assistant_msgs = ensure_list(content.get('assistant_messages', []))[-20:]
+    user_section = json.dumps([msg for msg in user_msgs if isinstance(msg, str) and len(str(msg).strip()) > 0 and '<system-reminder>' not in str(msg)][:15], indent=2, ensure_ascii=False)[:3000]
+    assistant_section = json.dumps([msg for msg in assistant_msgs if isinstance(msg, str) and len(str(msg).strip()) > 0][:15], indent=2, ensure_ascii=False)[:3000]
+    return user_section, assistant_section
+
+
+def prompt_message_tokens(content: dict) -> int:
+    """Tokens of the message sections of the summary prompt (the noise filter's measure)."""
+    return sum(estimate_tokens(section) for section in prompt_message_sections(content))
+
+
+def generate_memory_with_llm(content: dict, session_info: dict, previous_memory: Optional[str] = None,
+                             deadline: Deadline = None, job: SummaryJob = None) -> Optional[str]:
+    """
+    Generate comprehensive memory using Claude API.
+
+    With previous_memory (rolling mode), content only holds the messages since
+    the last compaction and the LLM returns the previous memory updated with them.
+    The call is skipped, or stopped, when it does not fit in the deadline.
+
+    With a job, the prompt, the streamed output and the parsed memory are
+    checkpointed in it; if the job already has a prompt (resume), that prompt
+    is sent again and the output streamed so far is continued, not regenerated.
+    """
+    api_key, api_url, model_name = get_summary_config()
+    deadline = deadline or Deadline()
+    
+    if not api_key:
+        logging.info("No API key found (set CLAUDE_SUMMARY_API_KEY)")
+        logging.debug("=== generate_memory_with_llm() END (no API key) ===")
+        return None
+
+    if deadline.budget("llm") < RATE_LIMIT_MIN_CALL_SECONDS:
+        deadline.fallback("llm", f"skipped, {deadline.budget('llm'):.0f}s left for the call")
+        return None
+
+    logging.debug("=== generate_memory_with_llm() START ===")
+    logging.debug(f"API key obtained, length: {len(api_key)} chars")
+
+    # Prepare content for summarization (truncate to avoid token limits)
+    # Ensure all values are lists before slicing
+    logging.debug(f"[DEBUG] Content type: {type(content)}")
+    logging.debug(f"[DEBUG] Content keys: {list(content.keys()) if isinstance(content, dict) else 'Not a dict'}")
+
+    user_msgs_list = content.get('user_messages', [])
+    assistant_msgs_list = content.get('assistant_messages', [])
+    tool_calls_list = content.get('tool_calls', [])
+    files_modified_list = content.get('files_modified', [])
+
+    # Ensure lists (safety)
+    user_msgs_list = ensure_list(user_msgs_list)
+    assistant_msgs_list = ensure_list(assistant_msgs_list)
+    tool_calls_list = ensure_list(tool_calls_list)
+    files_modified_list = ensure_list(files_modified_list)
+
+    # Slice appropriately for the context window
+    user_msgs = user_msgs_list[-20:]
+    assistant_msgs = assistant_msgs_list[-20:] 
+    tool_calls = tool_calls_list[-50:]
+    files_modified = files_modified_list
+    user_section, assistant_section = prompt_message_sections(content)
+
+
+    # Debug the types we got
+    logging.debug(f"[DEBUG] user_msgs type: {type(user_msgs)}, len: {len(user_msgs) if isinstance(user_msgs, list) else 'not list'}")
+    logging.debug(f"[DEBUG] assistant_msgs type: {type(assistant_msgs)}, len: {len(assistant_msgs) if isinstance(assistant_msgs, list) else 'not list'}")
+    logging.debug(f"[DEBUG] tool_calls type: {type(tool_calls)}, len: {len(tool_calls) if isinstance(tool_calls, list) else 'not list'}")
+    logging.debug(f"[DEBUG] files_modified type: {type(files_modified)}, len: {len(files_modified) if isinstance(files_modified, list) else 'not list'}")
+
+    # Check first elements of each list
+    if isinstance(user_msgs, list) and len(user_msgs) > 0:
+        logging.debug(f"[DEBUG] First user_msg type: {type(user_msgs[0])}")
+    if isinstance(assistant_msgs, list) and len(assistant_msgs) > 0:
+        logging.debug(f"[DEBUG] First assistant_msg type: {type(assistant_msgs[0])}")
+    if isinstance(tool_calls, list) and len(tool_calls) > 0:
+        logging.debug(f"[DEBUG] First tool_call type: {type(tool_calls[0])}")
+
+    # Build custom instructions section if provided
+    custom_instructions = session_info.get('custom_instructions', '')
+    custom_section = ""
+    if custom_instructions:
+        custom_section = f"""
+        ## User's Custom Instructions
+        The user provided these specific instructions for this compaction:
+        {custom_instructions}
+
+        **Important:** Incorporate the user's custom instructions into your memory. Focus on what they've asked for.
+        """
+
+    # Rolling mode: consolidate the previous memory with the new messages
+    previous_section = ""
+    if previous_memory:
+        previous_section = f"""
+    ## Previous Memory
+    This session was compacted before. The memory below covers everything up to the last
+    compaction; the messages further down are only what happened since then.
+    Produce ONE consolidated memory: keep what is still relevant, update items the new
+    messages changed (e.g. resolved errors, finished tasks), drop what is obsolete, and add
+    the new work. Do not mention that this is an update.
+
+    <previous-memory>
+    {previous_memory}
+    </previous-memory>
+    """
+
+    # Pre-summarized chunks: the messages below are only the tail of the delta
+    chunks_section = ""
+    chunk_summaries = ensure_list(content.get('chunk_summaries'))
+    if chunk_summaries:
+        chunks_section = f"""
+    ## Earlier Parts of This Session
+    The messages further down are only the most recent ones. The messages before them (since
+    the last compaction, if any) were summarized in parts while the session ran, oldest first.
+    Cover these parts in the memory as if you had read their messages yourself.
+
+    {chunks_prompt(chunk_summaries)}
+    """
+
+    logging.debug("[DEBUG] About to build prompt string...")
+    prompt_stage = hook_trace.begin("prompt")
+    prompt = f"""Analyze this Claude Code session and create a comprehensive memory for future context restoration.
+
+    ## What MUST be preserved:
+    - Key architecture changes (system design, structural modifications, refactoring decisions)
+    - Key UI/UX changes (component updates, interface modifications, user experience improvements)
+    - Key specification changes (requirements changes, business rules, validation logic updates)
+    - Multiple rounds of conversation that clarify issues and requirements
+    - Indirect or direct logs that show errors (error messages, stack traces, failure information)
+
+    ## What should be refined/summarized:
+    - Repetitive conversations that converge on a solution
+    - Long error traces refined to show only key error indicators
+    - Multiple similar questions condensed into single entries
+
+    ## What should be avoided:
+    - Plenty of unrelated logs posted by user (random logs, test outputs)
+    - LLM thinking process and internal reasoning
+    - Meaningless acknowledgments ("I understand", "Got it", "Thanks", etc.)
+    - Raw tool outputs without meaningful context
+    - Duplicate or very similar messages
+
+    ## Session Information
+    - Session ID: {session_info.get('session_id', 'unknown')}
+    - Project: {session_info.get('cwd', 'unknown')}
+    - Trigger: {session_info.get('trigger', 'unknown')}
+    - Permission Mode: {session_info.get('permission_mode', 'default')}
+    - Hook Event: {session_info.get('hook_event_name', 'PreCompact')}
+    - Timestamp: {session_info.get('timestamp', 'unknown')}
+    - Total Messages: {content.get('message_count', 0)}
+    {custom_section}
+    {previous_section}
+    {chunks_section}
+
+    ## Filtered Content
+    This session has been filtered to preserve only essential content as specified above. The following were excluded:
+    - Unrelated logs and system outputs
+    - LLM internal thinking processes
+    - Filler acknowledgments and pleasantries
+    - Repetitive minor interactions
+    - Raw tool outputs without context
+
+    ## Key Messages Preserved
+    {user_section}
+
+    ## Key Assistant Responses
+    {assistant_section}
+
+    ---
+
+    Create a memory with these sections:
+
+    ## Topics Discussed
+    - List main themes and subjects covered
+
+    ## Architecture Changes
+    - Files modified with brief descriptions of changes
+    - Key design patterns and decisions
+
+    ## UI/UX Changes
+    - Interface updates and component modifications
+    - User flow improvements
+    - Design system updates
+
+    ## Specification Changes
+    - Requirements and business rules updates
+    - Validation logic changes
+    - API contract modifications
+
+    ## Code Changes
+    - Files modified with brief descriptions
+    - Key snippets or patterns implemented
+
+    ## Decisions Made
+    - Important decisions with rationale
+    - Trade-offs considered
+    - Architecture choices
+
+    ## Key Outcomes
+    - What was accomplished
+    - Problems solved
+    - Features implemented
+
+    ## Context for Continuation
+    - Important context needed to continue this work
+    - Current state of implementation
+    - Next steps if mentioned
+    - Next steps if mentioned
+    - File changes that were made (use relative paths to the Project directory)
+
+    ## Tags
+    - Relevant hashtags for categorization (e.g., #authentication #api #bugfix #refactor)
+
+    Be comprehensive but concise. Focus on the essential context that would help resume this work later.
+
+    IMPORTANT: You must return a VALID JSON object with exactly two fields. Use the EXACT key names provided below:
+    1. "nowledge_summary": (NOTE THE SPELLING 'nowledge'). A detailed and comprehensive summary for retrieval (MAXIMUM 1750 characters). 
+       - Focus on: High-level purpose, Key decisions, Critical outcomes, and Next steps.
+       - Focus most recent content if it will reach the limit.
+       - Do NOT list modified files (this is added automatically).
+       - FILL the available space (aim for ~1700 chars). Be dense and informative.
+       - Purpose: To provide a rich context summary.
+    2. "full_memory": The detailed markdown report following the structure above (Topics, Architecture, etc.).
+
+    Example Output Structure:
+    {{
+      "nowledge_summary": "## Topics Discussed\\n- Authentication\\n- JWT Migration\\n\\n## Architecture Changes\\n- Updated auth middleware...",
+      "full_memory": "## Topics Discussed\\n- Authentication\\n- JWT Migration\\n\\n## Architecture Changes\\n- Updated auth middleware..."
+    }}
+
+    Return ONLY the raw JSON object. Do not wrap in markdown code blocks or add any other text."""  # This closes the prompt string
+    # nowledge-mem memory_add has content Lengthlength <= 1792 limit
+    prefill = ""
+    if job is not None:
+        if job.prompt() is not None:
+            prompt, prefill = job.prompt(), job.streamed().rstrip()  # A reply cannot start with trailing whitespace
+            logging.info(f"[context-keeper] Resuming job {job.job_id}: {len(prefill)} chars already generated")
+        else:
+            job.save_prompt(prompt)
+    prompt_stage.bytes_read = len(prompt)
+    prompt_stage.end()
+
+    logging.debug("[DEBUG] Prompt string built successfully, about to call API...")
+
+    try:
+        # Get configuration
+        api_key, api_url, model_name = get_summary_config()
+        
+        if not api_key:
+            logging.error("No summary API key found in ~/.claude/settings.json")
+            print("❌ [context-keeper] Missing API Key: Ensure CLAUDE_SUMMARY_API_KEY is set in ~/.claude/settings.json", file=sys.stderr)
+            return None
+
+        # Imported here: it is the slowest import of the hook and only this path needs it
+        import anthropic
+
+        # Build client with optional custom base URL
+        logging.debug(f"API URL obtained: {api_url if api_url else 'None (using default)'}")
+
+        if api_url:
+            logging.debug(f"Creating Anthropic client with custom base_url: {api_url}")
+            client = anthropic.Anthropic(api_key=api_key, base_url=api_url, max_retries=0)
+            logging.info(f"Using custom API URL: {api_url}")
+        else:
+            logging.debug("Creating Anthropic client with default base_url")
+            client = anthropic.Anthropic(api_key=api_key, max_retries=0)
+
+        # Pick the model from prompt size, time left and observed latency
+        # (CLAUDE_SUMMARY_MODEL is the fast model; see model_router.py)
+        prompt_tokens = estimate_tokens(prompt)
+        model_name, route_reason = route_model(
+            prompt_tokens, deadline.budget("llm"), consolidating=previous_memory is not None or bool(chunk_summaries), configured_model=model_name
+        )
+        logging.info(f"[context-keeper] Model routing: {model_name} ({route_reason})")
+        hook_trace.annotate(model=model_name)
+
+        logging.debug(f"Calling LLM with model: {model_name}, max_tokens: {MAX_TOKENS}")
+        llm_call = {
+            "model": model_name, "route": route_reason, "prompt_tokens": prompt_tokens,
+            "retries": 0, "ttft_ms": None, "latency_ms": None, "rate_wait_ms": 0.0,
+            "tokens_saved": content.get("reduction", {}).get("tokens_saved", 0),
+        }
+        response = None
+        with hook_trace.stage("llm") as stage:
+            try:
+                response = call_llm(client, model_name, prompt, llm_call, api_key, deadline, job, prefill)
+                prefill = prefill[:llm_call["resumed_chars"]]  # Dropped if the API refused it
+            finally:
+                llm_usage = record_llm_call(llm_call, response, session_info)
+            stage.bytes_read = sum(len(getattr(block, 'text', '')) for block in getattr(response, 'content', None) or [])
+
+        # Safely extract text from response
+        # Safely extract text from response
+        if hasattr(response, 'content') and response.content and len(response.content) > 0:
+            content_block = response.content[0]
+            if hasattr(content_block, 'text'):
+                response_text = prefill + content_block.text
+                logging.debug(f"LLM response received, content length: {len(response_text)} chars")
+                
+                # Try to parse as JSON
+                try:
+                    # Clean potential markdown wrapping
+                    if "```json" in response_text:
+                        response_text = response_text.split("```json")[1].split("```")[0].strip()
+                    elif "```" in response_text:
+                        response_text = response_text.split("```")[1].split("```")[0].strip()
+                        
+                    data = json.loads(response_text)
+                    logging.debug("Successfully parsed JSON response")
+                    logging.debug(f"Keys found: {list(data.keys())}")
+                    
+                    # Validate keys
+                    if "full_memory" in data and "nowledge_summary" in data:
+                        logging.debug("=== generate_memory_with_llm() END (success) ===")
+                        data["llm_usage"] = llm_usage
+                        if job is not None:
+                            job.save_response(data)
+                        return data
+                    else:
+                        logging.warning(f"Missing required keys in JSON response. Found: {list(data.keys())}")
+                        return None
+
+                except json.JSONDecodeError as e:
+                    logging.error(f"Failed to parse JSON response: {e}")
+                    logging.debug(f"Raw response: {response_text[:500]}...")
+                    
+                    # FALLBACK: Try regex extraction if JSON is malformed/truncated
+                    logging.info("Attempting regex fallback extraction...")
+                    try:
+                        extracted_data = {}
+                        
+                        # 1. Extract nowledge_summary/knowledge_summary
+                        # Match: "key": "value", (non-greedy)
+                        ns_match = re.search(r'"(?:k|n)owledge_summary"\s*:\s*"(.*?)"\s*,\s*"\w+', response_text, re.DOTALL)
+                        if not ns_match:
+                             # Try matching up to end of string if truncated inside the next key
+                             ns_match = re.search(r'"(?:k|n)owledge_summary"\s*:\s*"(.*)', response_text, re.DOTALL)
+                        
+                        if ns_match:
+                            summary_text = ns_match.group(1)
+                            # Cleanup unescaped quotes if valid JSON failed, though raw text might be messy
+                            # Simple fix for basic escaped quotes
+                            summary_text = summary_text.replace('\\"', '"').replace('\\n', '\n')
+                            extracted_data["nowledge_summary"] = summary_text
+                        
+                        # 2. Extract full_memory
+                        fm_match = re.search(r'"full_memory"\s*:\s*"(.*)', response_text, re.DOTALL)
+                        if fm_match:
+                            fm_text = fm_match.group(1)
+                            # Remove trailing " or } if present at the very end
+                            fm_text = re.sub(r'"\s*}\s*$', '', fm_text)
+                            fm_text = fm_text.replace('\\"', '"').replace('\\n', '\n')
+                            extracted_data["full_memory"] = fm_text
+                        
+                        if "nowledge_summary" in extracted_data:
+                            logging.info("Regex fallback successful")
+                            extracted_data["llm_usage"] = llm_usage
+                            if job is not None:
+                                job.save_response(extracted_data)
+                            return extracted_data
+                            
+                    except Exception as regex_e:
+                        logging.error(f"Regex fallback failed: {regex_e}")
+
+                    return None
+            else:
+                logging.error(f"Content block missing 'text' attribute, type: {type(content_block)}")
+        else:
+            logging.error(f"Unexpected response structure: {type(response)}")
+            logging.error(f"Response content: {getattr(response, 'content', 'No content attr')}")
+
+        logging.debug("=== generate_memory_with_llm() END (failed to extract text) ===")
+        return None
+    except Exception as e:
+        logging.error(f"LLM summarization failed: {e}")
+        print(f"❌ [context-keeper] LLM Generation Failed: {e}", file=sys.stderr)
+        logging.debug(f"Exception type: {type(e).__name__}")
+        logging.debug("=== generate_memory_with_llm() END (exception) ===")
+        return None
+
+
+
+
+
+def open_rate_limiter(api_key: str):
+    """(connection, key) of the shared rate limiter, or (None, None) if it is unavailable."""
+    from . import rate_limiter
+
+    try:
+        return rate_limiter.open_limiter(), rate_limiter.key_id(api_key)
+    except (OSError, rate_limiter.sqlite3.Error) as e:
+        logging.warning(f"Rate limiter unavailable, calling without it: {e}")
+        return None, None
+
+
+def wait_for_rate_limit(limiter, limiter_key: str, tokens: int, call: dict, deadline: Deadline) -> bool:
+    """
+    Wait for shared capacity (bounded by the time left); RateLimitTimeout if
+    there is none in time. Returns whether tokens were reserved.
+    """
+    from . import rate_limiter
+
+    if limiter is None:
+        return False
+    try:
+        waited = rate_limiter.acquire(limiter, limiter_key, tokens, deadline.budget("llm") - RATE_LIMIT_MIN_CALL_SECONDS)
+    except rate_limiter.sqlite3.Error as e:
+        logging.warning(f"Rate limiter failed, calling without it: {e}")
+        return False
+    if waited:
+        logging.info(f"[context-keeper] Waited {waited:.1f}s for rate-limit capacity")
+        call["rate_wait_ms"] = round(call["rate_wait_ms"] + waited * 1000, 1)
+    return True
+
+
+def update_rate_limit(update, limiter, limiter_key: str, *args):
+    """Apply settle()/drain() to the shared buckets; failures only cost accuracy."""
+    from . import rate_limiter
+
+    if limiter is None:
+        return
+    try:
+        update(limiter, limiter_key, *args)
+    except rate_limiter.sqlite3.Error as e:
+        logging.warning(f"Failed to update rate limiter: {e}")
+
+
+def call_llm(client, model_name: str, prompt: str, call: dict, api_key: str = None, deadline: Deadline = None,
+             job: SummaryJob = None, prefill: str = ""):
+    """
+    Stream one summarization request, retrying transient API failures.
+
+    Each attempt first waits for capacity in the shared rate limiter (bounded
+    by the time left); its token reservation is settled against the usage,
+    or returned in full when the attempt ends without a response. Fills call with "retries", "rate_wait_ms", "ttft_ms"
+    (first text delta of the final attempt), "latency_ms" (total, including
+    backoff and rate-limit waits) and "resumed_chars". Returns the final
+    Message; raises DeadlineExceeded when the stream runs past the LLM budget
+    of the deadline, and does not retry when a retry would not fit in it.
+
+    A prefill (output of an interrupted run) is sent as the start of the
+    reply, which the Message continues; if the API refuses it, the request
+    starts over without it. Streamed text is checkpointed in the job.
+    """
+    import anthropic
+    from . import rate_limiter
+
+    retryable = tuple(
+        getattr(anthropic, name)
+        for name in ("APIConnectionError", "RateLimitError", "InternalServerError")
+        if hasattr(anthropic, name)
+    )
+    deadline = deadline or Deadline()
+    bad_request = getattr(anthropic, "BadRequestError", ())
+    limiter, limiter_key = open_rate_limiter(api_key)
+    # Reserve the worst case; settled against the actual usage afterwards
+    reserved_tokens = call["prompt_tokens"] + MAX_TOKENS
+    start = time.perf_counter()
+    try:
+        for attempt in range(LLM_MAX_RETRIES + 1):
+            reserved = 0  # Tokens this attempt holds in the shared bucket
+            call["ttft_ms"] = None
+            call["resumed_chars"] = len(prefill)
+            messages = [{"role": "user", "content": prompt}]
+            if prefill:
+                messages.append({"role": "assistant", "content": prefill})
+            if job is not None:
+                job.restart_stream(prefill)  # What this attempt continues
+            try:
+                if wait_for_rate_limit(limiter, limiter_key, reserved_tokens, call, deadline):
+                    reserved = reserved_tokens
+                attempt_start = time.perf_counter()
+                with client.messages.stream(
+                    model=model_name,
+                    max_tokens=MAX_TOKENS,
+                    messages=messages,
+                    timeout=max(1.0, deadline.budget("llm")),  # Bounds connecting and each read
+                ) as stream:
+                    for text in stream.text_stream:
+                        if call["ttft_ms"] is None:
+                            call["ttft_ms"] = round((time.perf_counter() - attempt_start) * 1000, 1)
+                        if job is not None:
+                            job.stream(text)
+                        if deadline.expired("llm"):
+                            deadline.fallback("llm", f"stream stopped after {time.perf_counter() - attempt_start:.0f}s")
+                            raise DeadlineExceeded(f"{model_name} did not finish within the deadline")
+                    response = stream.get_final_message()
+                if reserved:
+                    usage = usage_from_response(response)
+                    update_rate_limit(rate_limiter.settle, limiter, limiter_key, reserved,
+                                      usage["input_tokens"] + usage["output_tokens"])
+                    reserved = 0
+                return response
+            except bad_request as e:
+                if not prefill or attempt == LLM_MAX_RETRIES:
+                    raise
+                logging.warning(f"Continuing the interrupted reply was refused ({e}), starting it over")
+                prefill = ""
+                call["retries"] += 1
+            except retryable as e:
+                if type(e).__name__ == "RateLimitError":
+                    # Return the reservation first so the drain is not undone by it
+                    if reserved:
+                        update_rate_limit(rate_limiter.settle, limiter, limiter_key, reserved, 0)
+                        reserved = 0
+                    update_rate_limit(rate_limiter.drain, limiter, limiter_key)  # Make every process back off
+                delay = LLM_RETRY_BACKOFF_SECONDS * 2 ** attempt
+                if attempt == LLM_MAX_RETRIES:
+                    raise
+                if delay + RATE_LIMIT_MIN_CALL_SECONDS > deadline.budget("llm"):
+                    deadline.fallback("llm", f"no retry after {type(e).__name__}")
+                    raise
+                call["retries"] += 1
+                logging.warning(f"LLM call failed ({type(e).__name__}: {e}), retrying in {delay:.0f}s")
+                time.sleep(delay)
+            finally:
+                if reserved:
+                    # No response (error, deadline, retry): release the worst-case reservation
+                    update_rate_limit(rate_limiter.settle, limiter, limiter_key, reserved, 0)
+                call["latency_ms"] = round((time.perf_counter() - start) * 1000, 1)
+                if job is not None:
+                    job.flush()
+    finally:
+        if limiter is not None:
+            limiter.close()
+
+
+def record_llm_call(call: dict, response, session_info: dict) -> dict:
+    """Complete a call record with usage and cost, and append it to the LLM ledger."""
+    usage = usage_from_response(response)
+    call.update(usage)
+    call["estimated_cost_usd"] = estimate_cost(call.get("model"), usage) if response is not None else None
+
+    try:
+        record_call({
+            "project": session_info.get("cwd"),
+            "session_id": session_info.get("session_id"),
+            "status": "ok" if response is not None else "error",
+            **call,
+        })
+    except OSError as e:
+        logging.warning(f"Failed to write LLM ledger: {e}")
+
+    # Feed the router's latency statistics
+    if response is not None:
+        try:
+            record_latency(call["model"], call["input_tokens"], call["output_tokens"], call["ttft_ms"], call["latency_ms"])
+        except OSError as e:
+            logging.warning(f"Failed to update model latency stats: {e}")
+
+    logging.info(
+        f"LLM usage: {call['input_tokens']} in / {call['output_tokens']} out "
+        f"({call['cache_read_input_tokens']} cached), latency {call['latency_ms']} ms, "
+        f"ttft {call['ttft_ms']} ms, retries {call['retries']}, stop {call['stop_reason']}"
+    )
+    return call
+
+
+def generate_memory(content: dict, session_info: dict, previous_memory: Optional[str] = None,
+                    deadline: Deadline = None, job: SummaryJob = None) -> dict | str:
+    """Generate memory with LLM, falling back to a local extractive summary."""
+    # Try LLM first
+    llm_memory = generate_memory_with_llm(content, session_info, previous_memory, deadline, job)
+    if llm_memory:
+        return llm_memory
+
+    if not extractive_fallback_enabled():
+        logging.warning("LLM memory generation failed and the extractive fallback is disabled.")
+        return None
+
+    # No key, API down or out of time: rank the conversation locally (tagged
+    # "summary_source": "extractive" so it can be re-summarized later)
+    logging.warning("LLM memory generation failed, saving an extractive summary instead")
+    with hook_trace.stage("extractive") as stage:
+        memory = summarize_extractive(content, previous_memory)
+        stage.bytes_read = len(memory["full_memory"])
+    hook_trace.annotate(summary_source=memory["summary_source"])
+    return memory
+
+
+# ============================================================================
+# File Storage helpers
+# ============================================================================
+
+def get_last_compact_time(session_id: str, project_path: str = None, transcript_path: str = None,
+                          deadline: Deadline = None) -> Optional[str]:
+    """
+    Get the timestamp (event_end) of the last compaction for this session.
+    
+    Strategy:
+    1. Latest 'compact_boundary' event of the transcript (most reliable); the
+       transcript's line index records them, so only lines appended since the
+       index was written are read (unless that does not fit in the deadline).
+    2. Fallback to local metadata.json if the transcript has none.
+    """
+    # 1. Try the compaction boundaries of transcript_path if provided
+    if transcript_path and os.path.exists(transcript_path):
+        try:
+            max_bytes = decode_budget(deadline.budget("parse")) if deadline else None
+            index = load_index(transcript_path, max_bytes)
+            if index is None:
+                if deadline:
+                    deadline.fallback("parse", "line index too far behind, boundary from the latest memory")
+            # Latest by timestamp, not by position in the file
+            elif index.last_compact_time:
+                return index.last_compact_time
+        except Exception as e:
+            logging.warning(f"Failed to scan transcript for compaction time: {e}")
+
+    # 2. Try local metadata first (fastest)
+    try:
+        memories_dir = get_memories_dir(project_path)
+        latest_meta_path = memories_dir / session_id / "latest" / "metadata.json"
+        
+        if stored_exists(latest_meta_path):
+            meta = read_json(latest_meta_path)
+            # Prefer event_end (actual message time), fallback to timestamp (creation time)
+            return meta.get("event_end") or meta.get("timestamp")
+    except Exception as e:
+        logging.warning(f"Failed to read last compaction time locally: {e}")
+        
+    return None
+
+def parse_within_deadline(transcript_path: str, after: Optional[str], deadline: Deadline) -> list[dict]:
+    """parse_transcript(), decoding only the newest lines that fit in the parse budget when time is short."""
+    max_bytes = decode_budget(deadline.budget("parse"))
+    index = load_index(transcript_path, max_bytes)
+    if index is None:
+        deadline.fallback("parse", f"reading only the last {max_bytes >> 20} MiB of the transcript")
+        return read_tail(transcript_path, max_bytes)
+    needed = index.bytes_after(after)
+    if needed > max_bytes:
+        deadline.fallback("parse", f"decoding only the newest {max_bytes >> 20} of {needed >> 20} MiB")
+        return messages_after(transcript_path, after, max_bytes)
+    return parse_transcript(transcript_path, after=after)
+
+
+def resume_open_jobs(session_id: str, cwd: str, content: dict, deadline: Deadline) -> tuple[dict, list[SummaryJob]]:
+    """
+    Finish the session's open jobs: save the memory a killed run had already
+    generated, and merge the delta of the others in front of `content`.
+    Returns (content, merged jobs); remove those once a new job holds their delta.
+    """
+    merged = []
+    earlier = None
+    for pending in iter_open_jobs(get_memories_dir(cwd) / session_id):
+        try:
+            response = pending.response() if pending.step == "summarized" else None
+            if response:
+                logging.info(f"[context-keeper] Saving the memory job {pending.job_id} generated before it was interrupted")
+                store_memory(session_id, cwd, response, pending.content(), pending.session_info,
+                             pending.previous_timestamp, deadline, resumed=True)
+                pending.close()
+                continue
+            delta = pending.content()
+        except (OSError, ValueError) as e:
+            logging.warning(f"Failed to resume summary job {pending.job_id}: {e}")
+            continue
+        logging.info(f"[context-keeper] Resuming job {pending.job_id} ({pending.step}): its messages are summarized with these")
+        earlier = delta if earlier is None else merge_content(earlier, delta)
+        merged.append(pending)
+    if earlier is not None:
+        content = merge_content(earlier, content)
+    return content, merged
+
+
+def rolling_enabled() -> bool:
+    """Return True if new memories should consolidate the previous one."""
+    return get_setting("CONTEXT_KEEPER_ROLLING", "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+def load_previous_memory(session_id: str, project_path: str, timestamp: str = None) -> tuple[Optional[str], Optional[str]]:
+    """
+    Load the session's latest memory (or the one saved at `timestamp`) for
+    rolling consolidation.
+
+    Returns (text, memory_timestamp). Text is capped at PREVIOUS_MEMORY_MAX_CHARS
+    by dropping whole trailing sections (Tags etc. come last).
+    """
+    latest_dir = get_memories_dir(project_path) / session_id / (timestamp or "latest")
+    memory_path = latest_dir / "memory.json"
+    if not stored_exists(memory_path):
+        return None, None
+
+    try:
+        text = load_memory_content(memory_path).strip()
+    except (OSError, ValueError) as e:
+        logging.warning(f"Failed to load previous memory for rolling summary: {e}")
+        return None, None
+    if not text:
+        return None, None
+
+    if len(text) > PREVIOUS_MEMORY_MAX_CHARS:
+        kept = []
+        size = 0
+        for section in split_sections(text):
+            if size + len(section) > PREVIOUS_MEMORY_MAX_CHARS:
+                break
+            kept.append(section)
+            size += len(section)
+        text = "".join(kept).strip() if kept else text[:PREVIOUS_MEMORY_MAX_CHARS]
+
+    return text, os.path.basename(os.path.realpath(latest_dir))
+
+
+def _write_memory_file(session_dir: Path, memory_data: dict) -> Path:
+    memory_path, chunk_stats = write_memory(session_dir / "memory.json", memory_data)
+    if chunk_stats["chunks"]:
+        logging.info(
+            f"Memory stored as {chunk_stats['chunks']} chunks "
+            f"({chunk_stats['chunks'] - chunk_stats['new_chunks']} unchanged, skipped)"
+        )
+    return memory_path
+
+
+def _update_latest_link(memories_dir: Path, session_id: str, timestamp: str):
+    latest_link = memories_dir / session_id / "latest"
+    if latest_link.is_symlink():
+        latest_link.unlink()
+    elif latest_link.exists():
+        latest_link.unlink()
+
+    try:
+        latest_link.symlink_to(timestamp)
+    except OSError as e:
+        logging.error(f"Failed to create latest symlink: {e}")
+
+
+def _write_session_start_payload(memories_dir: Path, session_id: str, timestamp: str, full_memory: str, metadata: dict,
+                                 project_wide: bool = True) -> int:
+    """Pre-render the SessionStart payload; returns bytes of earlier memories composed in."""
+    # Composed with earlier compactions of this session within the token budget;
+    # a rolled memory already folds them in
+    earlier = []
+    try:
+        if not metadata.get("rolled_from"):
+            earlier = load_earlier_memories(memories_dir / session_id, timestamp)
+        write_session_start(memories_dir, session_id, full_memory, metadata, earlier, context_token_budget(), project_wide)
+    except OSError as e:
+        logging.error(f"Failed to pre-render SessionStart payload: {e}")
+    return sum(len(text) for _, text in earlier)
+
+
+def _update_indexes(memories_dir: Path, session_id: str, timestamp: str, metadata: dict,
+                    memory: dict | str, full_memory: str, project_path: str):
+    with hook_trace.stage("index"):
+        update_index(memories_dir, session_id, timestamp, metadata)
+
+        # Register in the cross-project catalog (best effort, never blocks the save)
+        try:
+            import sqlite3
+            from .memory_catalog import register_memory
+            summary = memory.get("nowledge_summary", "") if isinstance(memory, dict) else ""
+            register_memory(project_path, session_id, timestamp, metadata, summary or full_memory)
+        except (ImportError, OSError, sqlite3.Error) as e:
+            logging.warning(f"Failed to register memory in global catalog: {e}")
+
+
+def save_memory(
+    session_id: str,
+    memory: dict | str,
+    metadata: dict,
+    project_path: str,
+    timestamp: str = None,
+    session_start: Optional[str] = "project",
+) -> Path:
+    """
+    Save memory and metadata to file system with timestamp versioning.
+
+    The local sinks are written concurrently: memory.json, metadata.json and
+    the SessionStart payload first, then, once the memory is on disk, the
+    latest symlink and the indexes that point to it; this returns once all
+    of them are done. session_start selects the payloads written: "project"
+    (the session's and the project-wide one), "session", or None.
+    """
+    
+    # Extract actual memory content for file storage
+    if isinstance(memory, dict):
+        full_memory = memory.get("full_memory", "")
+    else:
+        full_memory = memory
+
+    memories_dir = get_memories_dir(project_path)
+    timestamp = timestamp or datetime.now().strftime("%Y%m%d_%H%M%S")
+    save_stage = hook_trace.begin("save")
+    save_stage.records = 1
+
+    # Create session/timestamp directory
+    session_dir = memories_dir / session_id / timestamp
+    session_dir.mkdir(parents=True, exist_ok=True)
+
+    memory_data = {
+        "content": full_memory,
+        "timestamp": timestamp,
+        "session_id": session_id
+    }
+    metadata['memory_timestamp'] = timestamp
+
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=LOCAL_WRITE_WORKERS, thread_name_prefix="context-keeper-save") as pool:
+        memory_future = pool.submit(_write_memory_file, session_dir, memory_data)
+        metadata_future = pool.submit(write_json, session_dir / "metadata.json", metadata)
+        payload_future = session_start and pool.submit(
+            _write_session_start_payload, memories_dir, session_id, timestamp, full_memory, metadata,
+            session_start == "project",
+        )
+
+        # The latest link and the indexes point readers at the memory: publish
+        # them only once it is on disk (result() re-raises a failed write)
+        memory_path = memory_future.result()
+        metadata_future.result()
+        latest_future = pool.submit(_update_latest_link, memories_dir, session_id, timestamp)
+        index_future = pool.submit(
+            _update_indexes, memories_dir, session_id, timestamp, metadata, memory, full_memory, project_path
+        )
+
+    # Leaving the pool waited for every sink; result() re-raises failures
+    for future in (latest_future, index_future):
+        future.result()
+    save_stage.bytes_read = payload_future.result() if payload_future else 0
+    save_stage.end()
+
+    return memory_path
+
+
+def update_index(memories_dir: Path, session_id: str, timestamp: str, metadata: dict):
+    """Update the memories index files (recent index.json and the ordered index)."""
+    index_path = memories_dir / "index.json"
+
+    if index_path.exists():
+        try:
+            index = json.loads(index_path.read_text(encoding='utf-8'))
+        except json.JSONDecodeError:
+            index = {"memories": [], "last_session": None}
+    else:
+        index = {"memories": [], "last_session": None}
+
+    # Add new entry at the beginning
+    entry = make_index_entry(session_id, timestamp, metadata)
+
+    index["memories"].insert(0, entry)
+    index["last_session"] = session_id
+
+    # Keep only last 100 entries
+    index["memories"] = index["memories"][:100]
+
+    # Ensure directory exists
+    memories_dir.mkdir(parents=True, exist_ok=True)
+    index_path.write_text(json.dumps(index, indent=2, ensure_ascii=False), encoding='utf-8')
+
+    # The ordered index keeps the full history for paginated listing
+    if (memories_dir / ORDERED_INDEX).exists():
+        append_ordered_index(memories_dir, entry)
+        update_session_aggregates(memories_dir, entry)
+    else:
+        # First save since the ordered index was introduced: backfill from
+        # disk, which already includes this memory
+        ensure_ordered_index(memories_dir)
+
+
+def extract_topics_from_memory(memory: dict | str) -> list[str]:
+    """Extract topic tags from memory."""
+    # Look for hashtags in full content
+    if isinstance(memory, dict):
+        text_content = memory.get("full_memory", "")
+    else:
+        text_content = memory
+        
+    hashtags = re.findall(r'#(\w+)', text_content)
+    return list(set(hashtags))[:10]
+
+
+# ============================================================================
+# Nowledge REST API Integration
+# ============================================================================
+
+def nowledge_payload(memory: dict | str, metadata: dict) -> dict:
+    """Body of the Nowledge REST API request for a memory."""
+    # Determine content to send
+    if isinstance(memory, dict):
+        memory_content_to_send = memory.get("nowledge_summary", "")
+        if not memory_content_to_send:
+            full = memory.get("full_memory", "")
+            logging.warning("No 'nowledge_summary' found in memory dict, falling back to truncated full memory")
+            memory_content_to_send = full
+    else:
+        memory_content_to_send = memory
+
+    # Prepare data for payload
+    session_id = metadata.get("session_id", "unknown")
+    project = metadata.get("cwd", "unknown")
+    project_name = os.path.basename(project) if project != "unknown" else "unknown-project"
+    
+    # Ensure lists
+    topics = metadata.get("topics", [])
+    if not isinstance(topics, list):
+        topics = []
+        
+    # Construct labels as list (REST API usually expects array)
+    labels = list(filter(None, ["claude-context", "session-summary", project_name] + (topics[:5])))
+    
+    # Construct payload
+    payload = {
+        "content": memory_content_to_send,
+        "title": f"Session {session_id}: {', '.join(topics[:3]) if topics else 'Update'}",
+        "importance": 0.7,
+        "confidence": 1.0, # High confidence as this is a direct record
+        "labels": labels,  # Sending as list/array
+        "event_start": metadata.get("event_start"),
+        "event_end": metadata.get("event_end"),
+        "metadata": metadata
+    }
+    return payload
+
+
+def persist_to_nowledge(memory: dict | str, metadata: dict, content: dict) -> bool:
+    """
+    Persist memory to Nowledge via direct REST API call.
+    Target: http://127.0.0.1:14242/memories
+    """
+    logging.debug("=== persist_to_nowledge() START (REST API) ===")
+    return post_to_nowledge(nowledge_payload(memory, metadata))
+
+
+def post_to_nowledge(payload: dict) -> bool:
+    """POST one payload to the Nowledge REST API."""
+    url = NOWLEDGE_URL
+
+    try:
+        import urllib.request
+        import urllib.error
+
+        data = json.dumps(payload).encode('utf-8')
+        req = urllib.request.Request(url, data=data, headers={'Content-Type': 'application/json'})
+        
+        logging.debug(f"Sending POST to {url}")
+        
+        with urllib.request.urlopen(req, timeout=5) as response:
+            if 200 <= response.status < 300:
+                logging.info(f"Successfully created memory via REST API. Status: {response.status}")
+                logging.debug("=== persist_to_nowledge() END (success) ===")
+                return True
+            else:
+                logging.error(f"Failed to create memory. Status: {response.status}")
+                return False
+                
+    except Exception as e:
+        logging.error(f"persist_to_nowledge failed: {e}")
+        # Only print specific error if it's connection related to avoid noise
+        print(f"❌ [context-keeper] Nowledge Connection Failed: {e}", file=sys.stderr)
+        return False
+
+
+def get_nowledge_outbox() -> Path:
+    return get_state_dir() / NOWLEDGE_OUTBOX
+
+
+def defer_nowledge_push(memory: dict | str, metadata: dict):
+    """Queue the Nowledge payload of a memory for the next run that has time to send it."""
+    outbox = get_nowledge_outbox()
+    outbox.mkdir(parents=True, exist_ok=True)
+    queued = sorted(outbox.glob("*.json"))
+    for stale in queued[:max(0, len(queued) - NOWLEDGE_OUTBOX_MAX + 1)]:
+        logging.warning(f"Nowledge outbox full, dropping {stale.name}")
+        stale.unlink(missing_ok=True)
+    name = f"{metadata.get('memory_timestamp')}_{metadata.get('session_id', 'unknown')}.json"
+    write_json(outbox / name, nowledge_payload(memory, metadata), "json")
+
+
+def flush_nowledge_outbox() -> int:
+    """Send the queued payloads, oldest first, until one fails. Returns the number sent."""
+    sent = 0
+    for path in sorted(get_nowledge_outbox().glob("*.json")):
+        try:
+            payload = read_json(path)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Dropping unreadable Nowledge outbox entry {path.name}: {e}")
+            path.unlink(missing_ok=True)
+            continue
+        if not post_to_nowledge(payload):
+            break
+        path.unlink(missing_ok=True)
+        sent += 1
+    return sent
+
+
+def start_nowledge_push(memory: dict | str, metadata: dict, content: dict):
+    """
+    Run persist_to_nowledge() on a daemon thread and return the thread.
+    Once it succeeds, the pushes earlier runs deferred are sent too.
+    """
+    import threading
+
+    def push():
+        try:
+            with hook_trace.stage("nowledge") as stage:
+                if persist_to_nowledge(memory, metadata, content):
+                    logging.info("[context-keeper] Persisted to nowledge")
+                    stage.records = 1 + flush_nowledge_outbox()
+        except Exception as e:
+            logging.error(f"Nowledge push failed: {e}")  # Non-blocking
+
+    thread = threading.Thread(target=push, name="context-keeper-nowledge", daemon=True)
+    thread.start()
+    return thread
+
+
+# ============================================================================
+# Main Execution
+# ============================================================================
+
+def new_memory_timestamp(session_dir: Path) -> str:
+    """Timestamp (directory name) for a new memory of the session; later than any taken one."""
+    moment = datetime.now()
+    timestamp = moment.strftime("%Y%m%d_%H%M%S")
+    while (session_dir / timestamp).exists():
+        moment += timedelta(seconds=1)
+        timestamp = moment.strftime("%Y%m%d_%H%M%S")
+    return timestamp
+
+
+def resumed_session_start(memories_dir: Path, session_id: str, created_at: str) -> Optional[str]:
+    """
+    SessionStart payloads a resumed memory created at `created_at` may write
+    (see save_memory()): none if its session has a newer memory, only the
+    session's if another session does, else both.
+    """
+    when = entry_time({"created_at": created_at or ""})
+    sessions = load_session_aggregates(memories_dir)
+    if sessions.get(session_id, {}).get("latest_time", 0.0) > when:
+        logging.info("[context-keeper] The session has a newer memory, keeping its SessionStart payload")
+        return None
+    if any(agg.get("latest_time", 0.0) > when for agg in sessions.values()):
+        return "session"
+    return "project"
+
+
+def store_memory(session_id: str, cwd: str, memory: dict | str, content: dict, session_info: dict,
+                 rolled_from: Optional[str], deadline: Deadline, nowledge: bool = True, resumed: bool = False,
+                 **extra_metadata) -> tuple[Path, dict]:
+    """
+    Save a generated memory with its metadata and push it to Nowledge (unless
+    `nowledge` is False). A resumed memory (of an interrupted job) replaces
+    only the SessionStart payloads no newer memory has written
+    (resumed_session_start()). Returns (memory path, metadata).
+    """
+    # Prepare metadata
+    metadata = {
+        **session_info,
+        "topics": extract_topics_from_memory(memory),
+        "files_modified": content.get("files_modified", []),
+        "message_count": content.get("message_count", 0),
+        "tool_call_count": len(content.get("tool_calls", [])),
+        "event_start": content.get("start_time"),
+        "event_end": content.get("end_time"),
+        **extra_metadata,
+    }
+    if rolled_from:
+        metadata["rolled_from"] = rolled_from
+    if isinstance(memory, dict) and memory.get("llm_usage"):
+        metadata["llm_usage"] = memory.pop("llm_usage")
+    if isinstance(memory, dict) and memory.get("summary_source"):
+        metadata["summary_source"] = memory.pop("summary_source")
+
+    # Push to Nowledge in the background while the local writes run
+    timestamp = new_memory_timestamp(get_memories_dir(cwd) / session_id)
+    metadata['memory_timestamp'] = timestamp
+    nowledge_thread = None
+    if not nowledge:
+        pass
+    elif deadline.budget("nowledge") >= NOWLEDGE_WAIT_SECONDS:
+        nowledge_thread = start_nowledge_push(memory, dict(metadata), content)
+    else:
+        deadline.fallback("nowledge", "push deferred to the next run")
+        try:
+            defer_nowledge_push(memory, dict(metadata))
+        except OSError as e:
+            logging.warning(f"Failed to queue the Nowledge push: {e}")
+
+    # Save to project directory
+    logging.info("[context-keeper] Saving memory...")
+    session_start = resumed_session_start(get_memories_dir(cwd), session_id, metadata.get("timestamp")) if resumed else "project"
+    memory_path = save_memory(session_id, memory, metadata, cwd, timestamp, session_start)  # Traces "save" and "index"
+    
+    logging.info(f"Summary saved: {memory_path}")
+    logging.info(f"Files modified: {len(metadata['files_modified'])}")
+    logging.info(f"Topics: {', '.join(metadata['topics'][:5]) if metadata['topics'] else 'none extracted'}")
+
+    # Bounded wait for the Nowledge push (optional, never blocks the save)
+    if nowledge_thread is not None:
+        wait = min(NOWLEDGE_WAIT_SECONDS, deadline.budget("nowledge"))
+        nowledge_thread.join(timeout=wait)
+        if nowledge_thread.is_alive():
+            logging.warning(f"[context-keeper] Nowledge push still running after {wait:.0f}s, not waiting")
+    return memory_path, metadata
+
+
+def record_trivial_delta(session_id: str, cwd: str, content: dict, session_info: dict, previous_memory: str,
+                         previous_timestamp: str, deadline: Deadline) -> Optional[Path]:
+    """
+    Record a compaction that adds too little to summarize (change_detector.py)
+    without the LLM. Returns the memory path, or None if the delta needs the LLM.
+    """
+    memories_dir = get_memories_dir(cwd)
+    memory_dir = memories_dir / session_id / previous_timestamp
+    try:
+        previous_metadata = read_json(memory_dir / "metadata.json")
+    except (OSError, ValueError):
+        previous_metadata = {}
+    delta = measure_delta(content, previous_memory, previous_metadata.get("files_modified") or [])
+    hook_trace.annotate(delta_score=delta["score"])
+    if not is_trivial(delta):
+        return None
+
+    with hook_trace.stage("trivial") as stage:
+        full_memory = load_memory_content(memory_dir / "memory.json")
+        if delta["score"] == 0:
+            # Nothing new: the latest memory stands, it only learns about this compaction
+            logging.info(f"[context-keeper] Nothing new since memory {previous_timestamp}, keeping it")
+            previous_metadata["event_end"] = content.get("end_time") or previous_metadata.get("event_end")
+            previous_metadata["trivial_compactions"] = previous_metadata.get("trivial_compactions", 0) + 1
+            previous_metadata["last_compaction"] = session_info["timestamp"]
+            write_json(memory_dir / "metadata.json", previous_metadata)
+            # Injected after this compaction too: the expiry counts from now
+            _write_session_start_payload(memories_dir, session_id, previous_timestamp, full_memory,
+                                         dict(previous_metadata, timestamp=session_info["timestamp"]))
+            hook_trace.annotate(summary_source="unchanged")
+            return memory_dir / "memory.json"
+
+        logging.info(f"[context-keeper] Small delta (score {delta['score']}), appending a note to memory {previous_timestamp}")
+        memory = {
+            "nowledge_summary": "",
+            "full_memory": append_note(full_memory, delta_note(content)),
+            "summary_source": DELTA_NOTE_SOURCE,
+        }
+        memory_path, _ = store_memory(session_id, cwd, memory, content, session_info, previous_timestamp, deadline,
+                                      nowledge=False, delta=delta)
+        stage.bytes_read = len(memory["full_memory"])
+    hook_trace.annotate(summary_source=DELTA_NOTE_SOURCE)
+    return memory_path
+
+
+def parse_arguments():
+    """Parse command line arguments (optional overrides)."""
+    parser = argparse.ArgumentParser(
+        description="Save Claude Code session memory"
+    )
+    parser.add_argument("--session-id", help="Session ID")
+    parser.add_argument("--project-path", help="Project path (cwd)")
+    parser.add_argument("--transcript-path", help="Path to transcript file")
+    return parser.parse_known_args()  # Using parse_known_args to be safe against extra flags
+
+def main():
+    # Every stage below gets its share of this (see deadline.py)
+    deadline = Deadline()
+
+    # Print visible banner to stderr (using logging now)
+    logging.info("\n" + "=" * 60)
+    logging.info("[context-keeper] PreCompact Hook Running...")
+    logging.info("=" * 60)
+
+    try:
+        # 1. Try to read from stdin (Hook mode)
+        hook_input = {}
+        try:
+             # Check if stdin has data
+             if not sys.stdin.isatty():
+                 stdin_content = sys.stdin.read()
+                 hook_input = json.loads(stdin_content) if stdin_content else {}
+             else:
+                 hook_input = {}
+        except Exception:
+             hook_input = {}
+
+        # 2. Parse args (CLI mode overrides)
+        args, unknown = parse_arguments()
+
+        # 3. Resolve final values (Args > Stdin)
+        # Extract session information (all available fields)
+        session_id = args.session_id or hook_input.get("session_id", "unknown")
+        transcript_path = args.transcript_path or hook_input.get("transcript_path", "")
+        # For project path, prefer args.project_path, then hook cwd, then os.getcwd()
+        cwd = args.project_path or hook_input.get("cwd", os.getcwd())
+        
+        trigger = hook_input.get("trigger", "unknown")
+        permission_mode = hook_input.get("permission_mode", "default")
+        hook_event_name = hook_input.get("hook_event_name", "PreCompact")
+        custom_instructions = hook_input.get("custom_instructions", "")
+
+        logging.info(f"[context-keeper] Processing session {session_id[:8]}... (trigger: {trigger})")
+        hook_trace.annotate(project=cwd, session_id=session_id, trigger=trigger)
+
+        # Parse transcript
+        if not transcript_path:
+            logging.error("No transcript path provided")
+            logging.info("=" * 60 + "\n")
+            sys.exit(1)
+
+        # Get last compaction time (incremental update)
+        with hook_trace.stage("boundary") as stage:
+            last_compact_time = get_last_compact_time(session_id, cwd, transcript_path, deadline)
+            stage.bytes_read = decoded_bytes(transcript_path)
+        if last_compact_time:
+            logging.info(f"[context-keeper] Incremental summary starting from {last_compact_time}")
+
+        # Chunks the watcher already summarized since then (see presummarizer.py)
+        chunks = load_chunks(session_id, cwd, last_compact_time) if presummarize_enabled() else []
+        after = chunks[-1]["end_time"] if chunks else last_compact_time
+        if chunks:
+            logging.info(f"[context-keeper] {len(chunks)} pre-summarized chunks up to {after}")
+            hook_trace.annotate(presummarized_chunks=len(chunks))
+
+        # After a compaction (or the last chunk) only the lines past it are decoded (line index + mmap slices)
+        logging.info("[context-keeper] Parsing transcript...")
+        with hook_trace.stage("parse") as stage:
+            already_read = decoded_bytes(transcript_path)
+            messages = parse_within_deadline(transcript_path, after, deadline)
+            stage.bytes_read = decoded_bytes(transcript_path) - already_read
+            stage.records = len(messages)
+        # Nothing after the last compaction still makes a memory; an empty transcript does not
+        index = load_index(transcript_path, 0)  # Loaded by now, unless the deadline ruled it out
+        if not messages and not chunks and not (last_compact_time and (index is None or len(index))):
+            logging.info("[context-keeper] No messages in transcript, skipping")
+            logging.info("=" * 60 + "\n")
+            sys.exit(0)
+
+        logging.info(f"[context-keeper] Found {len(messages)} messages")
+        
+        # Extract content
+        logging.debug("[DEBUG] Starting extract_conversation_content...")
+        with hook_trace.stage("extract") as stage:
+            content = extract_conversation_content(messages, start_cutoff=after)
+            stage.records = content.get("message_count", 0)
+
+        # Drop acknowledgements, near-duplicates and log noise before the prompt is packed
+        if filter_enabled():
+            with hook_trace.stage("reduce") as stage:
+                content = reduce_content(content, prompt_message_tokens)
+                reduction = content["reduction"]
+                stage.records = reduction["acknowledgements"] + reduction["duplicates"] + reduction["condensed_logs"]
+            hook_trace.annotate(tokens_saved=reduction["tokens_saved"])
+            logging.info(
+                f"[context-keeper] Noise filter: {reduction['acknowledgements']} acknowledgements, "
+                f"{reduction['duplicates']} duplicates dropped, {reduction['condensed_logs']} logs condensed "
+                f"(~{reduction['tokens_saved']} of {reduction['tokens_before']} tokens saved)"
+            )
+        content = add_chunks(content, chunks)
+        logging.debug(f"[DEBUG] Extracted content type: {type(content)}")
+        logging.debug(f"[DEBUG] Extracted content keys: {list(content.keys()) if isinstance(content, dict) else 'Not a dict'}")
+
+        # Prepare session info (include all available fields)
+        session_info = {
+            "session_id": session_id,
+            "trigger": trigger,
+            "cwd": cwd,
+            "timestamp": datetime.now().astimezone().isoformat(),
+            "permission_mode": permission_mode,
+            "hook_event_name": hook_event_name,
+            "custom_instructions": custom_instructions
+        }
+
+        # Show custom instructions if provided
+        if custom_instructions:
+            logging.info(f"[context-keeper] Custom instructions: {custom_instructions[:50]}{'...' if len(custom_instructions) > 50 else ''}")
+
+        # Finish what killed or failed runs of this session left (see summary_jobs.py)
+        merged_jobs = []
+        if checkpoints_enabled():
+            content, merged_jobs = resume_open_jobs(session_id, cwd, content, deadline)
+
+        # Rolling mode: the new memory consolidates the previous one with the delta
+        previous_memory, previous_timestamp = (None, None)
+        if last_compact_time and rolling_enabled():
+            with hook_trace.stage("previous") as stage:
+                previous_memory, previous_timestamp = load_previous_memory(session_id, cwd)
+                stage.bytes_read = len(previous_memory or "")
+            if previous_memory:
+                logging.info(f"[context-keeper] Rolling summary from memory {previous_timestamp} ({len(previous_memory)} chars)")
+
+        # Too little new for the LLM: keep or annotate the latest memory (see change_detector.py)
+        if previous_memory and not (custom_instructions or merged_jobs or chunks):
+            memory_path = record_trivial_delta(session_id, cwd, content, session_info, previous_memory,
+                                               previous_timestamp, deadline)
+            if memory_path is not None:
+                logging.info(f"[context-keeper] Recorded without the LLM: {memory_path}")
+                logging.info("=" * 60 + "\n")
+                sys.exit(0)
+
+        # Checkpoint this run, so a kill from here on loses nothing
+        job = None
+        if checkpoints_enabled():
+            with hook_trace.stage("checkpoint"):
+                try:
+                    job = SummaryJob.create(get_memories_dir(cwd) / session_id, session_info, content, last_compact_time,
+                                            previous_timestamp if previous_memory else None,
+                                            [pending.job_id for pending in merged_jobs])
+                except OSError as e:
+                    logging.warning(f"Failed to checkpoint the summary job: {e}")
+            if job is not None:
+                for pending in merged_jobs:
+                    pending.close()
+
+        # Generate memory
+        logging.info("[context-keeper] Generating memory with AI...")
+        memory = generate_memory(content, session_info, previous_memory, deadline, job)
+        
+        if not memory:
+            logging.warning("Failed to generate memory (LLM likely failed). Exiting.")
+            sys.exit(0)
+
+        extra = {"presummarized_chunks": len(content["chunk_summaries"])} if content.get("chunk_summaries") else {}
+        memory_path, metadata = store_memory(session_id, cwd, memory, content, session_info,
+                                             previous_timestamp if previous_memory else None, deadline, **extra)
+        if chunks:
+            discard_chunks(session_id, cwd)
+
+        # Done with the checkpoints, unless only an extractive summary could be saved
+        # while an LLM is configured: the next run (or `resume`) summarizes the delta again
+        if job is not None:
+            if metadata.get("summary_source") == "extractive" and get_summary_config()[0]:
+                job.keep_for_llm(metadata["memory_timestamp"])
+            else:
+                job.close()
+
+        # Print visible completion message
+        logging.info("[context-keeper] Session context saved successfully!")
+        logging.info("=" * 60 + "\n")
+        sys.exit(0)
+
+    except Exception as e:
+        logging.error(f"Unexpected error: {e}")
+        logging.error(traceback.format_exc())
+        logging.info("=" * 60 + "\n")
+        sys.exit(1)
+
+
+def resume_job(job: SummaryJob, session_id: str, cwd: str, deadline: Deadline) -> Optional[Path]:
+    """Continue an open job from its last completed step. Returns the saved memory's path, or None."""
+    content = job.content()
+    upgraded_from = job.memory_timestamp if job.step == "extractive" else None
+    memory = job.response() if job.step == "summarized" else None
+    if not memory:
+        previous_memory = None
+        if job.prompt() is None and job.previous_timestamp:
+            previous_memory, _ = load_previous_memory(session_id, cwd, job.previous_timestamp)
+        memory = generate_memory_with_llm(content, job.session_info, previous_memory, deadline, job)
+        if not memory:
+            return None
+
+    extra = {"upgraded_from": upgraded_from} if upgraded_from else {}
+    memory_path, _ = store_memory(session_id, cwd, memory, content, job.session_info, job.previous_timestamp,
+                                  deadline, resumed=True, **extra)
+    job.close()
+    return memory_path
+
+
+def resume_main():
+    """`context_keeper resume`: continue the summary jobs killed or failed PreCompact runs left."""
+    parser = argparse.ArgumentParser(description="Continue interrupted memory summaries")
+    parser.add_argument("--project-path", default=os.getcwd(), help="Project path (default: cwd)")
+    parser.add_argument("--session-id", help="Only this session")
+    args = parser.parse_args()
+
+    memories_dir = get_memories_dir(args.project_path)
+    if args.session_id:
+        sessions = [args.session_id]
+    else:
+        try:
+            sessions = sorted(d.name for d in memories_dir.iterdir() if (d / JOBS_DIR).is_dir())
+        except OSError:
+            sessions = []
+
+    resumed = 0
+    for session_id in sessions:
+        for job in iter_open_jobs(memories_dir / session_id):
+            label = f"{session_id[:8]} job {job.job_id} ({job.step})"
+            try:
+                memory_path = resume_job(job, session_id, args.project_path, Deadline())
+            except (OSError, ValueError) as e:
+                logging.error(f"Failed to resume {label}: {e}")
+                memory_path = None
+            if memory_path:
+                print(f"✅ {label}: saved {memory_path}")
+            else:
+                print(f"❌ {label}: not resumed, still open")
+            resumed += 1
+
+    if not resumed:
+        print("No interrupted summaries to resume.")
+
+
+def run_hook():
+    """PreCompact hook entry point."""
+    configure_logging()
+    with hook_trace.run("save_memory"):
+        main()
+
+
+if __name__ == "__main__":
+    run_hook()
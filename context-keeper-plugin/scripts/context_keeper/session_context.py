@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Session Context: Render and pre-render the SessionStart context payload.
+
+save_memory.py writes a ready-to-emit `session_start.txt` next to each saved
+memory (per session and per project). Its first line holds the expiry as a
+Unix timestamp, the rest is the output of format_context() with placeholders
+for the values only known at SessionStart (reload source, permission mode).
+load_memory.py can then answer the SessionStart hook with a single file read
+and no JSON work.
+
+The injected memory is composed by compose_memory(): the latest memory plus
+sections from earlier compactions of the same session, ranked by priority
+(errors, pending work, architecture and decisions first) and trimmed to a
+token budget measured with a local estimator.
+
+This module is imported on the SessionStart fast path, so it must stay
+dependency-free (no json, no memory_store).
+"""
+
+import os
+import re
+import time
+from datetime import datetime
+from pathlib import Path
+
+# ============================================================================
+# Configuration
+# ============================================================================
+
+SESSION_START_FILE = "session_start.txt"
+EXPIRY_PREFIX = "#expires "
+MAX_AGE_HOURS = 24
+
+# Section ranking by heading keywords; lower is kept first
+SECTION_PRIORITIES = (
+    (("error", "bug", "fail", "issue", "problem"), 0),
+    (("continuation", "pending", "next step", "todo", "remaining"), 1),
+    (("architecture", "decision", "design"), 2),
+    (("specification", "code change", "ui/ux", "outcome"), 3),
+    (("topic",), 4),
+    (("tag",), 6),
+)
+DEFAULT_SECTION_PRIORITY = 5
+MIN_TRIMMED_TOKENS = 120
+EARLIER_HEADING = "## Earlier in This Session"
+
+_SECTION_RE = re.compile(r'^## ', re.MULTILINE)
+
+SOURCE_PLACEHOLDER = "@@CONTEXT_KEEPER_SOURCE@@"
+PERMISSION_PLACEHOLDER = "@@CONTEXT_KEEPER_PERMISSION_MODE@@"
+
+
+# ============================================================================
+# Rendering
+# ============================================================================
+
+def format_context(memory: str, metadata: dict, source: str, permission_mode: str = "default") -> str:
+    """Format memory for context injection (automatic mode)."""
+
+    timestamp = metadata.get('timestamp', metadata.get('created_at', 'unknown'))
+    session_id = metadata.get('session_id', 'unknown')
+    trigger = metadata.get('trigger', 'unknown')
+    message_count = metadata.get('message_count', 0)
+
+    # Create context wrapper
+    context = f"""<previous-session-context>
+## Session Continuity Notice
+
+This context was automatically loaded from a previous session memory.
+- **Previous Session ID:** {session_id[:16]}...
+- **Summary Created:** {timestamp}
+- **Compaction Trigger:** {trigger}
+- **Message Count:** {message_count}
+- **Reload Source:** {source}
+- **Permission Mode:** {permission_mode}
+
+---
+
+{memory}
+
+---
+
+*Use this context to maintain continuity with the previous conversation. The above memory captures what was discussed and accomplished before context compaction.*
+</previous-session-context>"""
+
+    return context
+
+
+def estimate_tokens(text: str) -> int:
+    """Local token estimate: ~4 ASCII characters per token, 1 per other character."""
+    ascii_chars = len(text.encode('ascii', 'ignore'))
+    return (ascii_chars + 3) // 4 + (len(text) - ascii_chars)
+
+
+def _sections(text: str) -> list[str]:
+    """Split memory markdown at `## ` headings (a leading preamble is its own section)."""
+    starts = [m.start() for m in _SECTION_RE.finditer(text)]
+    if not starts or starts[0] != 0:
+        starts.insert(0, 0)
+    bounds = starts + [len(text)]
+    return [text[bounds[i]:bounds[i + 1]].strip() for i in range(len(starts)) if text[bounds[i]:bounds[i + 1]].strip()]
+
+
+def section_priority(section: str) -> int:
+    heading = section.split("\n", 1)[0].lower() if section.startswith("## ") else ""
+    for keywords, priority in SECTION_PRIORITIES:
+        if any(keyword in heading for keyword in keywords):
+            return priority
+    return DEFAULT_SECTION_PRIORITY
+
+
+def _line_key(line: str) -> str:
+    return line.strip().lstrip("-*").strip().lower()
+
+
+def _trim_section(section: str, budget: int) -> str:
+    """Keep whole leading lines of a section within budget tokens."""
+    kept, used = [], 0
+    for line in section.split("\n"):
+        cost = estimate_tokens(line) + 1
+        if used + cost > budget:
+            break
+        kept.append(line)
+        used += cost
+    return "\n".join(kept + ["- ... (trimmed)"]) if len(kept) > 1 else ""
+
+
+def compose_memory(latest: str, earlier: list[tuple[str, str]] = (), budget: int = 0) -> str:
+    """
+    Compose the memory injected at SessionStart.
+
+    latest is the newest memory; earlier holds (timestamp, text) of previous
+    compactions of the session, newest first. Lines of earlier sections that
+    the latest memory already contains are dropped. Sections are then taken
+    by (priority, age) until budget tokens are used (0 = unlimited) and
+    emitted in document order, earlier ones under EARLIER_HEADING.
+    """
+    seen = set()
+    candidates = []  # (priority, age, order, label, section)
+    for order, section in enumerate(_sections(latest)):
+        candidates.append((section_priority(section), 0, order, None, section))
+        seen.update(_line_key(line) for line in section.split("\n")[1:])
+
+    for age, (label, text) in enumerate(earlier, 1):
+        for order, section in enumerate(_sections(text)):
+            if not section.startswith("## "):
+                continue
+            heading, _, body = section.partition("\n")
+            fresh = [line for line in body.split("\n") if _line_key(line) and _line_key(line) not in seen]
+            if not fresh:
+                continue
+            seen.update(_line_key(line) for line in fresh)
+            candidates.append((section_priority(section), age, order, label, heading + "\n" + "\n".join(fresh)))
+
+    if not budget:
+        chosen = candidates
+    else:
+        chosen, remaining = [], budget
+        earlier_overhead = estimate_tokens(EARLIER_HEADING) + 1
+        for candidate in sorted(candidates, key=lambda c: (c[0], c[1], c[2])):
+            section = candidate[4]
+            cost = estimate_tokens(section) + 1
+            if candidate[1] and not any(c[1] for c in chosen):
+                cost += earlier_overhead
+            if cost > remaining:
+                if candidate[1] or remaining < MIN_TRIMMED_TOKENS:
+                    continue
+                section = _trim_section(section, remaining - estimate_tokens("- ... (trimmed)") - 1)
+                if not section:
+                    continue
+                cost = estimate_tokens(section) + 1
+            chosen.append(candidate[:4] + (section,))
+            remaining -= cost
+
+    chosen.sort(key=lambda c: (c[1], c[2]))
+    parts = [c[4] for c in chosen if not c[1]]
+    earlier_parts = [c for c in chosen if c[1]]
+    if earlier_parts:
+        parts.append(EARLIER_HEADING)
+        for _, _, _, label, section in earlier_parts:
+            heading, _, body = section.partition("\n")
+            parts.append(f"#{heading} (compaction {label})\n{body}")
+    return "\n\n".join(parts)
+
+
+def memory_expiry(metadata: dict) -> float | None:
+    """Unix time after which a memory is too old to inject, or None if unknown."""
+    created_at = metadata.get('timestamp', metadata.get('created_at', ''))
+    if not created_at:
+        return None
+    try:
+        memory_time = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
+    except (ValueError, TypeError, AttributeError):
+        return None
+    # Naive timestamps are local time, matching the original age check
+    return memory_time.timestamp() + MAX_AGE_HOURS * 3600
+
+
+# ============================================================================
+# Pre-rendered Payload
+# ============================================================================
+
+def write_session_start(
+    memories_dir: Path,
+    session_id: str,
+    memory: str,
+    metadata: dict,
+    earlier: list[tuple[str, str]] = (),
+    budget: int = 0,
+    project_wide: bool = True,
+) -> list[Path]:
+    """
+    Pre-render the SessionStart payload for a freshly saved memory.
+
+    The memory is composed with earlier compactions of the session within
+    budget tokens (see compose_memory). Writes
+    {memories_dir}/{session_id}/session_start.txt and, unless project_wide
+    is False, the project-wide {memories_dir}/session_start.txt. Returns the
+    written paths.
+    """
+    expiry = memory_expiry(metadata)
+    memory = compose_memory(memory, earlier, budget)
+    body = format_context(memory, metadata, SOURCE_PLACEHOLDER, PERMISSION_PLACEHOLDER)
+    payload = f"{EXPIRY_PREFIX}{expiry if expiry is not None else 'never'}\n{body}".encode('utf-8')
+
+    written = []
+    targets = [Path(memories_dir) / session_id / SESSION_START_FILE]
+    if project_wide:
+        targets.append(Path(memories_dir) / SESSION_START_FILE)
+    for target in targets:
+        tmp_path = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+        tmp_path.write_bytes(payload)
+        os.replace(tmp_path, target)
+        written.append(target)
+    return written
+
+
+def read_session_start(memories_dir: Path, session_id: str = None) -> tuple[str | None, float | None]:
+    """
+    Read a pre-rendered payload, preferring the session's own file.
+
+    Returns (template, expiry); template is None when nothing was pre-rendered.
+    expiry is None for memories without a usable timestamp.
+    """
+    candidates = []
+    if session_id:
+        candidates.append(Path(memories_dir) / session_id / SESSION_START_FILE)
+    candidates.append(Path(memories_dir) / SESSION_START_FILE)
+
+    for path in candidates:
+        try:
+            raw = path.read_bytes()
+        except OSError:
+            continue
+        header, _, body = raw.decode('utf-8').partition("\n")
+        if not header.startswith(EXPIRY_PREFIX):
+            continue
+        try:
+            expiry = float(header[len(EXPIRY_PREFIX):])
+        except ValueError:
+            expiry = None
+        return body, expiry
+
+    return None, None
+
+
+def fill_session_start(template: str, source: str, permission_mode: str) -> str:
+    """Substitute the SessionStart-time values into a pre-rendered payload."""
+    return (
+        template
+        .replace(SOURCE_PLACEHOLDER, source, 1)
+        .replace(PERMISSION_PLACEHOLDER, permission_mode, 1)
+    )
+
+
+def is_expired(expiry: float | None, now: float | None = None) -> bool:
+    """Return True if a payload with this expiry should no longer be injected."""
+    if expiry is None:
+        return False
+    return (now if now is not None else time.time()) > expiry
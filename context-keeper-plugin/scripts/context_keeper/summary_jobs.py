@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Summary Jobs: Checkpoints of a PreCompact run, so a killed or failed run can be resumed.
+
+save_memory.main() opens a job per run and checkpoints each step of it
+under the session directory:
+
+  .claude/memories/<session_id>/jobs/<job_id>/
+    job.json       - {"job_id", "step", "created", "session_info", "last_compact_time",
+                      "previous_timestamp", "memory_timestamp", "resumed_from"}
+    content.json   - the extracted (noise-filtered) delta, with its pre-summarized chunks
+    prompt.txt     - the packed prompt
+    stream.txt     - the LLM output streamed so far
+    response.json  - the memory parsed from the LLM output
+
+Steps, in order: "extracted", "prompted", "summarized". A job is removed once
+its LLM memory is saved. When the run had to save an extractive summary
+instead, the job stays open at step "extractive" (memory_timestamp names
+that memory), so the LLM can still summarize its delta later.
+
+The next PreCompact of the session resumes its open jobs: the memory of a
+"summarized" job is saved without calling the LLM; the delta of any other
+job is merged in front of the new delta, so the messages of the killed run
+are summarized together with the new ones.
+`context_keeper resume` continues open jobs without waiting for a
+compaction: the checkpointed prompt is sent again with the streamed output
+as the start of the reply, so only the rest is generated, and extractive
+memories are replaced by LLM ones.
+
+Environment variables:
+  CONTEXT_KEEPER_CHECKPOINTS - 1 (default) to checkpoint runs, 0 to start every run over
+"""
+
+import logging
+import os
+import shutil
+from datetime import datetime
+from pathlib import Path
+
+from .conversation import ToolCall
+from .memory_store import get_setting, read_json, write_json
+
+# ============================================================================
+# Configuration
+# ============================================================================
+
+JOBS_DIR = "jobs"
+JOB_FILE = "job.json"
+CONTENT_FILE = "content.json"
+PROMPT_FILE = "prompt.txt"
+STREAM_FILE = "stream.txt"
+RESPONSE_FILE = "response.json"
+
+# Streamed output is appended to stream.txt in pieces of about this size
+STREAM_FLUSH_CHARS = 2000
+
+# Checkpointed (and merged) deltas keep only their newest entries per list,
+# more than the prompt, the noise filter or the extractive summary use
+CHECKPOINT_MAX_ITEMS = 500
+
+CONTENT_LISTS = ("user_messages", "assistant_messages", "tool_calls")
+
+
+def checkpoints_enabled() -> bool:
+    value = get_setting("CONTEXT_KEEPER_CHECKPOINTS", "1") or "1"
+    return value.strip().lower() not in ("0", "false", "no", "off")
+
+
+# ============================================================================
+# Content
+# ============================================================================
+
+def content_to_json(content: dict) -> dict:
+    """extract_conversation_content() output as JSON (ToolCall records as [tool, input, timestamp]), capped."""
+    data = dict(content)
+    for key in CONTENT_LISTS:
+        data[key] = list(content.get(key) or [])[-CHECKPOINT_MAX_ITEMS:]
+    data["tool_calls"] = [[call.tool, call.input, call.timestamp] for call in data["tool_calls"]]
+    return data
+
+
+def content_from_json(data: dict) -> dict:
+    content = dict(data)
+    content["tool_calls"] = [ToolCall(*call) for call in data.get("tool_calls") or []]
+    return content
+
+
+def merge_content(earlier: dict, later: dict) -> dict:
+    """One delta of two consecutive ones."""
+    merged = dict(later)
+    for key in CONTENT_LISTS:
+        merged[key] = (list(earlier.get(key) or []) + list(later.get(key) or []))[-CHECKPOINT_MAX_ITEMS:]
+    merged["chunk_summaries"] = list(dict.fromkeys((earlier.get("chunk_summaries") or []) + (later.get("chunk_summaries") or [])))
+    merged["files_modified"] = list(dict.fromkeys((earlier.get("files_modified") or []) + (later.get("files_modified") or [])))
+    merged["message_count"] = earlier.get("message_count", 0) + later.get("message_count", 0)
+    merged["start_time"] = earlier.get("start_time") or later.get("start_time")
+    merged["end_time"] = later.get("end_time") or earlier.get("end_time")
+    return merged
+
+
+# ============================================================================
+# Jobs
+# ============================================================================
+
+class SummaryJob:
+    """One checkpointed run (see the module docstring)."""
+
+    __slots__ = ("path", "state", "pending")
+
+    def __init__(self, path: Path, state: dict):
+        self.path = path
+        self.state = state
+        self.pending = []  # Streamed text not yet appended to stream.txt
+
+    def __repr__(self):
+        return f"SummaryJob({self.job_id!r}, {self.step!r})"
+
+    @classmethod
+    def create(cls, session_dir: Path, session_info: dict, content: dict, last_compact_time: str = None,
+               previous_timestamp: str = None, resumed_from: list[str] = ()) -> "SummaryJob":
+        job_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.getpid()}"
+        path = Path(session_dir) / JOBS_DIR / job_id
+        path.mkdir(parents=True, exist_ok=True)
+        # The content first: a job.json always has its content
+        write_json(path / CONTENT_FILE, content_to_json(content), "json")
+        job = cls(path, {
+            "job_id": job_id,
+            "step": "extracted",
+            "created": datetime.now().astimezone().isoformat(),
+            "session_info": session_info,
+            "last_compact_time": last_compact_time,
+            "previous_timestamp": previous_timestamp,
+            "memory_timestamp": None,
+            "resumed_from": list(resumed_from),
+        })
+        job._update()
+        return job
+
+    @classmethod
+    def load(cls, path: Path) -> "SummaryJob":
+        return cls(Path(path), read_json(Path(path) / JOB_FILE))
+
+    @property
+    def job_id(self) -> str:
+        return self.state["job_id"]
+
+    @property
+    def step(self) -> str:
+        return self.state["step"]
+
+    @property
+    def session_info(self) -> dict:
+        return self.state.get("session_info") or {}
+
+    @property
+    def last_compact_time(self) -> str | None:
+        return self.state.get("last_compact_time")
+
+    @property
+    def previous_timestamp(self) -> str | None:
+        return self.state.get("previous_timestamp")
+
+    @property
+    def memory_timestamp(self) -> str | None:
+        return self.state.get("memory_timestamp")
+
+    @property
+    def resumed_from(self) -> list[str]:
+        return self.state.get("resumed_from") or []
+
+    def _update(self, **fields):
+        self.state.update(fields)
+        write_json(self.path / JOB_FILE, self.state, "json")
+
+    # Checkpointed artefacts
+
+    def content(self) -> dict:
+        return content_from_json(read_json(self.path / CONTENT_FILE))
+
+    def prompt(self) -> str | None:
+        try:
+            return (self.path / PROMPT_FILE).read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
+
+    def streamed(self) -> str:
+        try:
+            return (self.path / STREAM_FILE).read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return ""
+
+    def response(self) -> dict | None:
+        try:
+            return read_json(self.path / RESPONSE_FILE)
+        except FileNotFoundError:
+            return None
+
+    # Steps
+
+    def save_prompt(self, prompt: str):
+        (self.path / PROMPT_FILE).write_text(prompt, encoding="utf-8")
+        self.restart_stream()
+        self._update(step="prompted")
+
+    def stream(self, text: str):
+        """Add streamed output; appended to stream.txt every STREAM_FLUSH_CHARS."""
+        self.pending.append(text)
+        if sum(len(piece) for piece in self.pending) >= STREAM_FLUSH_CHARS:
+            self.flush()
+
+    def flush(self):
+        if self.pending:
+            with open(self.path / STREAM_FILE, "a", encoding="utf-8") as f:
+                f.write("".join(self.pending))
+            self.pending.clear()
+
+    def restart_stream(self, text: str = ""):
+        """Start stream.txt over, from `text`."""
+        self.pending.clear()
+        if text:
+            (self.path / STREAM_FILE).write_text(text, encoding="utf-8")
+        else:
+            (self.path / STREAM_FILE).unlink(missing_ok=True)
+
+    def save_response(self, memory: dict):
+        write_json(self.path / RESPONSE_FILE, memory, "json")
+        self._update(step="summarized")
+
+    def keep_for_llm(self, memory_timestamp: str):
+        """The run saved an extractive summary (memory_timestamp); keep the job for an LLM one."""
+        self._update(step="extractive", memory_timestamp=memory_timestamp)
+
+    def close(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+        try:
+            self.path.parent.rmdir()  # The last job of the session
+        except OSError:
+            pass
+
+
+def iter_open_jobs(session_dir: Path):
+    """Open jobs of a session, oldest first; jobs another job was resumed from are removed."""
+    jobs = []
+    try:
+        paths = sorted(p for p in (Path(session_dir) / JOBS_DIR).iterdir() if p.is_dir())
+    except OSError:
+        return
+    for path in paths:
+        try:
+            jobs.append(SummaryJob.load(path))
+        except (OSError, ValueError) as e:
+            # Killed before its first checkpoint
+            logging.warning(f"Removing incomplete summary job {path.name}: {e}")
+            shutil.rmtree(path, ignore_errors=True)
+
+    # A run killed between merging jobs and removing them leaves both
+    merged = {job_id for job in jobs for job_id in job.resumed_from}
+    for job in jobs:
+        if job.job_id in merged:
+            job.close()
+        else:
+            yield job
@@ -0,0 +1,755 @@
+#!/usr/bin/env python3
+"""
+Transcript Cache: Parsed transcripts shared between the context-keeper hooks.
+
+save_memory.py (PreCompact) and save_thread.py (SessionEnd) read the same
+append-only transcript JSONL. parse_transcript() keeps a persisted cache of
+the normalized messages per transcript under
+$CONTEXT_KEEPER_HOME/cache/transcripts/ (default ~/.claude/context-keeper),
+so each hook only decodes the lines appended since the last run.
+
+The cache file is a sequence of marshal segments, one per extension:
+
+  {"version", "python", "dev", "inode", "start", "end", "size", "mtime_ns",
+   "tail", "messages", "offsets", "compact_times"}
+
+`messages` are normalized records that keep only what the extractors read
+(type, role, timestamps, text and tool_use blocks, short tool inputs);
+tool results, thinking blocks and long tool input values such as file bodies
+are dropped. Record types, roles and tool names are interned, so the
+parsed messages (and the marshal segments) share one copy of each.
+`offsets` is an array("Q") of the byte offset of every line,
+`compact_times` the timestamps of compaction boundaries found in the segment.
+Segments are contiguous byte ranges of the transcript [start, end), ending
+at a newline; `tail` holds the last bytes before `end` so a rewritten
+transcript is detected and the cache rebuilt. A transcript with a different
+inode, a smaller size or a changed tail starts a new cache.
+
+Next to it, a sidecar index (<digest>.idx, same segment scheme) holds only
+per-line data, as arrays:
+
+  {"version", ..., "lines", "offsets", "max_times", "untimed", "compact_times"}
+
+`max_times` is the running maximum of the line timestamps (epoch seconds),
+so "the lines after time T" is a binary search; `untimed` lists the lines
+without a timestamp. load_index() extends the index with the lines appended
+since it was written, and messages_after() decodes only the lines after a
+cutoff, as slices of the memory-mapped transcript. The PreCompact hook
+reads the compaction boundaries and the messages since the last compaction
+that way, without loading the cached messages of the whole transcript.
+When its time budget is short it passes `max_bytes` (decode_budget()):
+load_index() then gives up rather than index more than that, and
+messages_after() or read_tail() decode only the newest lines.
+
+Set CONTEXT_KEEPER_TRANSCRIPT_CACHE=0 to always parse the full transcript.
+"""
+
+import hashlib
+import json
+import logging
+import marshal
+import math
+import mmap
+import os
+import sys
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from contextlib import nullcontext
+from datetime import datetime, timezone
+from pathlib import Path
+
+from .memory_store import get_setting, get_state_dir
+
+# ============================================================================
+# Configuration
+# ============================================================================
+
+CACHE_VERSION = 1
+INDEX_VERSION = 1
+CACHE_DIR = "cache/transcripts"
+TAIL_BYTES = 64
+
+# Lines this close before a cutoff are still decoded (the extractor filters
+# them exactly); covers timestamps written in different ISO forms
+CUTOFF_SLACK_SECONDS = 1.0
+
+# Rewrite the cache as one segment once it has this many
+MAX_SEGMENTS = 32
+# Cache files of transcripts not seen for this long are removed
+MAX_AGE_SECONDS = 14 * 24 * 3600
+
+KEPT_FIELDS = ("type", "subtype", "timestamp", "created_at", "name")
+KEPT_MESSAGE_FIELDS = ("role", "created_at", "timestamp")
+INTERNED_FIELDS = ("type", "subtype", "name")
+# Tool input values longer than this (file bodies, edit strings) are dropped
+MAX_INPUT_VALUE_CHARS = 512
+
+# Conservative decode rate (json.loads + normalize_message) for deciding how
+# much of a transcript fits in a time budget
+DECODE_BYTES_PER_SECOND = 50 * 1024 * 1024
+# ... but at least this much, however little time is left
+MIN_DECODE_BYTES = 4 * 1024 * 1024
+
+
+def cache_enabled() -> bool:
+    value = get_setting("CONTEXT_KEEPER_TRANSCRIPT_CACHE", "1") or "1"
+    return value.strip().lower() not in ("0", "false", "no", "off")
+
+
+def get_cache_path(transcript_path: Path, suffix: str = ".bin") -> Path:
+    digest = hashlib.sha1(str(transcript_path.resolve()).encode("utf-8")).hexdigest()
+    return get_state_dir() / CACHE_DIR / f"{digest}{suffix}"
+
+
+def get_index_path(transcript_path: Path) -> Path:
+    return get_cache_path(transcript_path, ".idx")
+
+
+def decode_budget(seconds: float) -> int:
+    """Transcript bytes that can be decoded in `seconds`."""
+    return max(MIN_DECODE_BYTES, int(seconds * DECODE_BYTES_PER_SECOND))
+
+
+# ============================================================================
+# Normalization
+# ============================================================================
+
+def _tool_input(tool_input):
+    if not isinstance(tool_input, dict):
+        return {}
+    return {
+        key: value for key, value in tool_input.items()
+        if not isinstance(value, (str, list, dict)) or len(value) <= MAX_INPUT_VALUE_CHARS
+    }
+
+
+def _interned(value):
+    # Types, roles and tool names repeat on every record; marshal keeps them shared
+    return sys.intern(value) if type(value) is str else value
+
+
+def _content(content):
+    """Keep string content and the text/tool_use blocks of list content."""
+    if not isinstance(content, list):
+        return content
+    blocks = []
+    for block in content:
+        if not isinstance(block, dict):
+            continue
+        block_type = block.get("type")
+        if block_type == "text":
+            blocks.append({"type": "text", "text": block.get("text", "")})
+        elif block_type == "tool_use":
+            blocks.append({"type": "tool_use", "name": _interned(block.get("name")), "input": _tool_input(block.get("input"))})
+    return blocks
+
+
+def normalize_message(msg):
+    """Reduce a transcript record to the fields extract_*_content() read."""
+    if not isinstance(msg, dict):
+        return msg
+    record = {key: msg[key] for key in KEPT_FIELDS if key in msg}
+    for key in INTERNED_FIELDS:
+        if key in record:
+            record[key] = _interned(record[key])
+    if "input" in msg:
+        record["input"] = _tool_input(msg["input"])
+
+    nested = msg.get("message")
+    if isinstance(nested, dict):
+        record["message"] = {key: nested[key] for key in KEPT_MESSAGE_FIELDS if key in nested}
+        if "role" in record["message"]:
+            record["message"]["role"] = _interned(record["message"]["role"])
+        if "content" in nested:
+            record["message"]["content"] = _content(nested["content"])
+    else:
+        # Flat records: role/content live at the top level
+        if "message" in msg:
+            record["message"] = None
+        for key in ("role", "content"):
+            if key in msg:
+                record[key] = _content(msg[key]) if key == "content" else msg[key]
+    return record
+
+
+def is_compact_boundary(line: bytes) -> bool:
+    return (
+        b'"subtype":"compact_boundary"' in line or b'"subtype": "compact_boundary"' in line
+        or (b"Compacted" in line and b"<local-command-stdout>" in line)
+    )
+
+
+# ============================================================================
+# Timestamps
+# ============================================================================
+
+def parse_time(value) -> float:
+    """Epoch seconds of an ISO timestamp (naive ones are taken as UTC); NaN if it is not one."""
+    if not isinstance(value, str) or not value:
+        return math.nan
+    try:
+        parsed = datetime.fromisoformat(value[:-1] + "+00:00" if value.endswith("Z") else value)
+    except ValueError:
+        return math.nan
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def message_time(msg) -> float:
+    """Epoch seconds of the timestamp the extractors filter a record on (NaN without one)."""
+    if not isinstance(msg, dict):
+        return math.nan
+    nested = msg.get("message")
+    if not isinstance(nested, dict):
+        nested = {}
+    return parse_time(msg.get("created_at") or msg.get("timestamp") or nested.get("created_at") or nested.get("timestamp"))
+
+
+# ============================================================================
+# Segments
+# ============================================================================
+
+CACHE_FIELDS = ("messages", "offsets", "compact_times")
+INDEX_FIELDS = ("offsets", "max_times", "untimed", "compact_times")
+# Fields stored as the bytes of an array of this type code
+ARRAY_FIELDS = {"offsets": "Q", "max_times": "d", "untimed": "Q"}
+
+
+def _map(f, size: int):
+    # mmap refuses empty files; bytes has the find() and slicing the decoder uses
+    if not size:
+        return nullcontext(b"")
+    return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _tail_matches(mm, segment: dict) -> bool:
+    end, tail = segment["end"], segment["tail"]
+    return end <= len(mm) and mm[end - len(tail):end] == tail
+
+
+def _decode_lines(mm, start: int, segment: dict, times: array, compacts: list) -> int:
+    """
+    Decode the complete lines of a mapped transcript from `start` into
+    `segment`, their timestamps into `times` and (offset, timestamp) of the
+    compaction boundaries into `compacts`. Returns the end of the last
+    complete line.
+    """
+    find = mm.find
+    size = len(mm)
+    position = start
+    while position < size:
+        newline = find(b"\n", position)
+        if newline < 0:
+            break
+        line = mm[position:newline]
+        offset = position
+        position = newline + 1
+        if not line or line.isspace():
+            continue
+        try:
+            msg = json.loads(line)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            logging.error(f"Failed to parse transcript line at byte {offset}")
+            continue
+        segment["messages"].append(normalize_message(msg))
+        segment["offsets"].append(offset)
+        times.append(message_time(msg))
+        if is_compact_boundary(line) and isinstance(msg, dict) and msg.get("timestamp"):
+            segment["compact_times"].append(msg["timestamp"])
+            compacts.append((offset, msg["timestamp"]))
+    segment["end"] = position
+    segment["tail"] = mm[max(0, position - TAIL_BYTES):position]
+    return position
+
+
+def _decode_remainder(mm, end: int):
+    """
+    The final line after `end` if it is complete JSON without its newline,
+    as (record, is compaction boundary); None otherwise.
+    """
+    remainder = mm[end:len(mm)]
+    if not remainder.strip():
+        return None
+    try:
+        return json.loads(remainder), is_compact_boundary(remainder)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return None  # Partially written line
+
+
+def _load_segments(cache_path: Path, stat, version: int = CACHE_VERSION) -> tuple[list[dict], bool]:
+    """Valid, contiguous segments of the cache for this transcript file, and whether it can be appended to."""
+    segments = []
+    try:
+        with open(cache_path, "rb") as f:
+            cache_size = os.fstat(f.fileno()).st_size
+            while f.tell() < cache_size:
+                try:
+                    segment = marshal.load(f)
+                except (EOFError, ValueError, TypeError):
+                    return segments, False  # Torn final write; keep the valid prefix
+                if not isinstance(segment, dict) or segment.get("version") != version:
+                    return [], False
+                if segment.get("python") != list(sys.version_info[:2]):
+                    return [], False
+                if (segment.get("dev"), segment.get("inode")) != (stat.st_dev, stat.st_ino):
+                    return [], False
+                expected = segments[-1]["end"] if segments else 0
+                if segment["start"] < expected and segment["end"] <= expected:
+                    continue  # Same range appended by a concurrent hook
+                if segment["start"] != expected:
+                    return [], False
+                for key, typecode in ARRAY_FIELDS.items():
+                    if key in segment:
+                        segment[key] = array(typecode, segment[key])
+                segments.append(segment)
+    except OSError:
+        return [], False
+    return segments, True
+
+
+def _new_segment(stat, start: int) -> dict:
+    return {
+        "version": CACHE_VERSION,
+        "python": list(sys.version_info[:2]),
+        "dev": stat.st_dev,
+        "inode": stat.st_ino,
+        "start": start,
+        "end": start,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "tail": b"",
+        "messages": [],
+        "offsets": array("Q"),
+        "compact_times": [],
+    }
+
+
+def _index_segment(segment: dict, times: array, compacts: list, since: int, lines: int, max_time: float) -> dict:
+    """
+    Index segment of the lines a decoded cache segment holds at or after
+    byte `since`, continuing an index of `lines` lines whose running maximum
+    timestamp is `max_time`.
+    """
+    first = bisect_left(segment["offsets"], since)
+    max_times = array("d")
+    untimed = array("Q")
+    for position in range(first, len(times)):
+        value = times[position]
+        if value != value:  # NaN: no timestamp
+            untimed.append(lines + position - first)
+        elif value > max_time:
+            max_time = value
+        max_times.append(max_time)
+    return {
+        **{key: segment[key] for key in ("python", "dev", "inode", "end", "size", "mtime_ns", "tail")},
+        "version": INDEX_VERSION,
+        "start": since,
+        "lines": lines,
+        "offsets": segment["offsets"][first:],
+        "max_times": max_times,
+        "untimed": untimed,
+        "compact_times": [timestamp for offset, timestamp in compacts if offset >= since],
+    }
+
+
+def _serialized(segment: dict) -> dict:
+    return {key: value.tobytes() if isinstance(value, array) else value for key, value in segment.items()}
+
+
+def _store_segments(cache_path: Path, segments: list[dict], append: bool, fields: tuple = CACHE_FIELDS):
+    """Append the last segment, or rewrite the cache as one merged segment."""
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    if append:
+        # Single O_APPEND write so concurrent hooks never interleave segments
+        fd = os.open(cache_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o600)
+        try:
+            os.write(fd, marshal.dumps(_serialized(segments[-1])))
+        finally:
+            os.close(fd)
+        return
+
+    merged = dict(segments[-1], start=0)
+    if "lines" in merged:
+        merged["lines"] = 0
+    for key in fields:
+        merged[key] = array(ARRAY_FIELDS[key]) if key in ARRAY_FIELDS else []
+        for segment in segments:
+            merged[key].extend(segment[key])
+    tmp_path = cache_path.with_name(f".{cache_path.name}.{os.getpid()}.tmp")
+    tmp_path.write_bytes(marshal.dumps(_serialized(merged)))
+    os.replace(tmp_path, cache_path)
+    _prune_cache(cache_path.parent)
+
+
+def _prune_cache(cache_dir: Path):
+    cutoff = time.time() - MAX_AGE_SECONDS
+    try:
+        with os.scandir(cache_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith((".bin", ".idx")) and entry.stat().st_mtime < cutoff:
+                    os.unlink(entry.path)
+    except OSError:
+        pass
+
+
+def _append_segment(cache_path: Path, segments: list[dict], segment: dict, appendable: bool, fields: tuple = CACHE_FIELDS):
+    segments.append(segment)
+    try:
+        _store_segments(cache_path, segments, appendable and 1 < len(segments) <= MAX_SEGMENTS, fields)
+    except OSError as e:
+        logging.warning(f"Failed to update transcript cache: {e}")
+
+
+# Bytes of JSON decoded in this process, by transcript path
+_decoded = {}
+
+
+def _count_decoded(path: Path, size: int):
+    _decoded[str(path)] = _decoded.get(str(path), 0) + size
+
+
+# ============================================================================
+# Line Index
+# ============================================================================
+
+class TranscriptIndex:
+    """Line offsets and timestamps of a transcript (see the module docstring)."""
+
+    __slots__ = ("path", "offsets", "max_times", "untimed", "compact_times", "end", "size",
+                 "bytes_decoded", "fresh", "fresh_start", "fresh_from", "pending")
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.offsets = array("Q")
+        self.max_times = array("d")
+        self.untimed = array("Q")
+        self.compact_times = []
+        self.end = 0
+        self.size = 0
+        self.bytes_decoded = 0
+        # Normalized messages of the lines from fresh_start (at byte
+        # fresh_from) on, decoded while loading the index; messages_after()
+        # does not decode them again
+        self.fresh = []
+        self.fresh_start = 0
+        self.fresh_from = 0
+        # Final line without its newline, if it is complete JSON (not indexed)
+        self.pending = None
+
+    def __len__(self):
+        return len(self.offsets)
+
+    @property
+    def last_compact_time(self):
+        return max(self.compact_times) if self.compact_times else None
+
+    def first_after(self, cutoff: str) -> int:
+        """
+        First line that may be newer than `cutoff`: every later line has a
+        timestamp past it or none. Lines without a timestamp before it are in
+        `untimed`.
+        """
+        value = parse_time(cutoff)
+        if value != value:
+            return 0
+        return bisect_right(self.max_times, value - CUTOFF_SLACK_SECONDS)
+
+    def bytes_after(self, cutoff: str) -> int:
+        """Bytes messages_after(cutoff) decodes (lines without a timestamp before the cutoff aside)."""
+        first = self.first_after(cutoff)
+        return self.fresh_from - self.offsets[first] if first < self.fresh_start else 0
+
+
+def _index_from_segments(index: TranscriptIndex, segments: list[dict]):
+    for segment in segments:
+        index.offsets.extend(segment["offsets"])
+        index.max_times.extend(segment["max_times"])
+        index.untimed.extend(segment["untimed"])
+        index.compact_times.extend(segment["compact_times"])
+
+
+def read_index(transcript_path: str, max_bytes: int = None) -> TranscriptIndex | None:
+    """
+    Line index of a transcript, decoding only the lines the persisted index
+    lacks; None if that is more than `max_bytes`.
+    """
+    path = Path(transcript_path).expanduser()
+    index = TranscriptIndex(path)
+    use_cache = cache_enabled()
+    index_path = get_index_path(path) if use_cache else None
+
+    with open(path, "rb") as f:
+        stat = os.fstat(f.fileno())
+        with _map(f, stat.st_size) as mm:
+            index.size = len(mm)
+            segments, appendable = _load_segments(index_path, stat, INDEX_VERSION) if use_cache else ([], False)
+            if segments and not _tail_matches(mm, segments[-1]):
+                logging.info("Transcript was rewritten, rebuilding line index")
+                segments, appendable = [], False
+            indexed_end = segments[-1]["end"] if segments else 0
+            if max_bytes is not None and index.size - indexed_end > max_bytes:
+                return None
+            _index_from_segments(index, segments)
+
+            segment = _new_segment(stat, indexed_end)
+            times, compacts = array("d"), []
+            index.end = _decode_lines(mm, indexed_end, segment, times, compacts)
+            index.pending = _decode_remainder(mm, index.end)
+
+    index.bytes_decoded = index.size - indexed_end
+    _count_decoded(path, index.bytes_decoded)
+    added = _index_segment(segment, times, compacts, indexed_end, len(index), index.max_times[-1] if index.max_times else -math.inf)
+    index.fresh = segment["messages"]
+    index.fresh_start = len(index)
+    index.fresh_from = indexed_end
+    _index_from_segments(index, [added])
+    if use_cache and index.end > indexed_end:
+        _append_segment(index_path, segments, added, appendable, INDEX_FIELDS)
+    return index
+
+
+def _extend_index(path: Path, stat, mm, segment: dict, times: array, compacts: list):
+    """Index the lines read_transcript() decoded, if they continue the persisted index."""
+    index_path = get_index_path(path)
+    segments, appendable = _load_segments(index_path, stat, INDEX_VERSION)
+    if segments and not _tail_matches(mm, segments[-1]):
+        segments, appendable = [], False
+    indexed_end = segments[-1]["end"] if segments else 0
+    if not segment["start"] <= indexed_end < segment["end"]:
+        return
+    lines = sum(len(s["offsets"]) for s in segments)
+    max_time = segments[-1]["max_times"][-1] if lines else -math.inf
+    _append_segment(index_path, segments, _index_segment(segment, times, compacts, indexed_end, lines, max_time), appendable, INDEX_FIELDS)
+
+
+# ============================================================================
+# Parsed Transcripts
+# ============================================================================
+
+class ParsedTranscript:
+    """Normalized messages of a transcript plus what it took to get them."""
+
+    __slots__ = ("messages", "offsets", "compact_times", "size", "bytes_decoded", "cache_hit")
+
+    def __init__(self):
+        self.messages = []
+        self.offsets = array("Q")
+        self.compact_times = []
+        self.size = 0
+        self.bytes_decoded = 0
+        self.cache_hit = False
+
+    @property
+    def last_compact_time(self):
+        return max(self.compact_times) if self.compact_times else None
+
+    def add_pending(self, pending: tuple, offset: int):
+        """Add a complete final line that has no newline yet (not cached)."""
+        msg, compact = pending
+        self.messages.append(normalize_message(msg))
+        self.offsets.append(offset)
+        if compact and isinstance(msg, dict) and msg.get("timestamp"):
+            self.compact_times.append(msg["timestamp"])
+
+
+def read_transcript(transcript_path: str) -> ParsedTranscript:
+    """
+    Normalized messages of a transcript, decoding only what the cache lacks.
+
+    A final line without a newline (still being written) is decoded for the
+    result when it is complete JSON, but not cached. Decoded lines also
+    extend the line index.
+    """
+    result = ParsedTranscript()
+    path = Path(transcript_path).expanduser()
+    use_cache = cache_enabled()
+    cache_path = get_cache_path(path) if use_cache else None
+
+    with open(path, "rb") as f:
+        stat = os.fstat(f.fileno())
+        with _map(f, stat.st_size) as mm:
+            result.size = len(mm)
+            segments, appendable = _load_segments(cache_path, stat) if use_cache else ([], False)
+            if segments and not _tail_matches(mm, segments[-1]):
+                logging.info("Transcript was rewritten, rebuilding parse cache")
+                segments, appendable = [], False
+            cached_end = segments[-1]["end"] if segments else 0
+
+            segment = _new_segment(stat, cached_end)
+            times, compacts = array("d"), []
+            end = _decode_lines(mm, cached_end, segment, times, compacts)
+            pending = _decode_remainder(mm, end)
+            if use_cache and end > cached_end:
+                _extend_index(path, stat, mm, segment, times, compacts)
+
+    result.bytes_decoded = result.size - cached_end
+    result.cache_hit = bool(segments)
+    _count_decoded(path, result.bytes_decoded)
+
+    for cached in segments:
+        result.messages.extend(cached["messages"])
+        result.offsets.extend(cached["offsets"])
+        result.compact_times.extend(cached["compact_times"])
+    result.messages.extend(segment["messages"])
+    result.offsets.extend(segment["offsets"])
+    result.compact_times.extend(segment["compact_times"])
+    if pending is not None:
+        result.add_pending(pending, end)
+
+    if use_cache and end > cached_end:
+        _append_segment(cache_path, segments, segment, appendable)
+    return result
+
+
+def _from_index(index: TranscriptIndex) -> ParsedTranscript:
+    """ParsedTranscript of an index that decoded the whole transcript; seeds the parse cache."""
+    result = ParsedTranscript()
+    result.messages = list(index.fresh)
+    result.offsets = array("Q", index.offsets)
+    result.compact_times = list(index.compact_times)
+    result.size = index.size
+
+    if cache_enabled() and index.end:
+        with open(index.path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            with _map(f, stat.st_size) as mm:
+                segment = _new_segment(stat, 0)
+                segment.update(messages=result.messages, offsets=result.offsets, compact_times=result.compact_times,
+                               end=index.end, tail=mm[max(0, index.end - TAIL_BYTES):index.end])
+        _append_segment(get_cache_path(index.path), [], segment, False)
+
+    if index.pending is not None:
+        result.add_pending(index.pending, index.end)
+    return result
+
+
+# Loaded in this process, by (path, inode, size, mtime): the hooks ask more than once
+_parsed = {}
+_indexes = {}
+
+
+def _memo_key(transcript_path: str) -> tuple:
+    path = Path(transcript_path).expanduser()
+    stat = path.stat()
+    return (str(path), stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+def load_index(transcript_path: str, max_bytes: int = None) -> TranscriptIndex | None:
+    """read_index() memoized for the life of the process."""
+    key = _memo_key(transcript_path)
+    if key not in _indexes:
+        index = read_index(transcript_path, max_bytes)
+        if index is None:
+            return None
+        _indexes.clear()
+        _indexes[key] = index
+    return _indexes[key]
+
+
+def load_transcript(transcript_path: str) -> ParsedTranscript:
+    """read_transcript() memoized for the life of the process."""
+    key = _memo_key(transcript_path)
+    if key not in _parsed:
+        _parsed.clear()
+        index = _indexes.get(key)
+        if index is not None and index.fresh_from == 0:
+            _parsed[key] = _from_index(index)  # The index already decoded every line
+        else:
+            _parsed[key] = read_transcript(transcript_path)
+    return _parsed[key]
+
+
+def messages_after(transcript_path: str, cutoff: str, max_bytes: int = None) -> list[dict]:
+    """
+    Normalized messages of the lines that may be newer than `cutoff` (all
+    lines if it is None), in transcript order, decoding only those lines
+    from the mapped transcript.
+
+    Lines without a timestamp are always included, and lines up to
+    CUTOFF_SLACK_SECONDS before the cutoff may be; extract_*_content()
+    filters on the exact cutoff. With `max_bytes`, only the newest of those
+    lines that fit in it are decoded (lines the index just read are kept).
+    """
+    index = load_index(transcript_path)
+    first = index.first_after(cutoff)
+    oldest = 0
+    if max_bytes is not None and index.bytes_after(cutoff) > max_bytes:
+        # At least the newest line, however long
+        oldest = min(bisect_left(index.offsets, index.fresh_from - max_bytes, first, index.fresh_start),
+                     index.fresh_start - 1)
+    lines = list(index.untimed[bisect_left(index.untimed, oldest):bisect_left(index.untimed, first)])
+    lines.extend(range(max(first, oldest), index.fresh_start))
+
+    messages = []
+    if lines:
+        offsets = index.offsets
+        decoded = 0
+        with open(index.path, "rb") as f, _map(f, os.fstat(f.fileno()).st_size) as mm:
+            for line in lines:
+                start = offsets[line]
+                data = mm[start:mm.find(b"\n", start)]
+                decoded += len(data)
+                try:
+                    messages.append(normalize_message(json.loads(data)))
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    logging.error(f"Failed to parse transcript line at byte {start}")
+        _count_decoded(index.path, decoded)
+
+    messages.extend(index.fresh[max(0, first - index.fresh_start):])
+    if index.pending is not None:
+        messages.append(normalize_message(index.pending[0]))
+    return messages
+
+
+def read_tail(transcript_path: str, max_bytes: int) -> list[dict]:
+    """
+    Normalized messages of the lines that start in the last `max_bytes` of a
+    transcript, or at least its final line (neither cached nor indexed).
+    """
+    path = Path(transcript_path).expanduser()
+    with open(path, "rb") as f:
+        stat = os.fstat(f.fileno())
+        with _map(f, stat.st_size) as mm:
+            start = max(0, len(mm) - max_bytes)
+            if start:
+                # First line that starts inside the window, else the line the window is in
+                newline = mm.find(b"\n", start - 1, len(mm) - 1)
+                start = newline + 1 if newline >= 0 else mm.rfind(b"\n", 0, start) + 1
+            segment = _new_segment(stat, start)
+            end = _decode_lines(mm, start, segment, array("d"), [])
+            pending = _decode_remainder(mm, end)
+    _count_decoded(path, stat.st_size - start)
+
+    messages = segment["messages"]
+    if pending is not None:
+        messages.append(normalize_message(pending[0]))
+    return messages
+
+
+def decoded_bytes(transcript_path: str) -> int:
+    """Bytes of this transcript decoded so far by this process (callers take the difference)."""
+    return _decoded.get(str(Path(transcript_path).expanduser()), 0)
+
+
+def parse_transcript(transcript_path: str, after: str = None) -> list[dict]:
+    """
+    Parse JSONL transcript file into (normalized) messages.
+
+    With `after`, only the messages that may be newer than that timestamp
+    (see messages_after()).
+    """
+    path = Path(transcript_path).expanduser()
+
+    if not path.exists():
+        logging.error(f"Transcript file not found: {transcript_path}")
+        return []
+
+    try:
+        if after:
+            return messages_after(transcript_path, after)
+        return load_transcript(transcript_path).messages
+    except Exception as e:
+        logging.error(f"Failed to read transcript: {e}")
+        return []
@@ -0,0 +1,8 @@
+#!/usr/bin/env python3
+"""Shim for `context_keeper stats`, kept for existing hook and command paths."""
+
+import sys
+
+from context_keeper.cli import main
+
+sys.exit(main(["stats", *sys.argv[1:]]))